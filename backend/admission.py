@@ -0,0 +1,252 @@
+"""
+Admission control
+Per-endpoint concurrency limits with a bounded priority wait queue and load shedding
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+
+# Lower value is served first
+PRIORITY_CLASSES = {"interactive": 0, "default": 1, "bulk": 2}
+
+# Request header naming the priority class; browser extension origins
+# default to "interactive" when it is absent
+PRIORITY_HEADER = "x-request-priority"
+EXTENSION_ORIGINS = ("chrome-extension://", "moz-extension://", "safari-web-extension://")
+
+# Seconds a request may wait for a slot before it is rejected
+ADMISSION_QUEUE_TIMEOUT = 10.0
+
+# Limit -> (concurrent requests, queued requests)
+ADMISSION_LIMITS = {
+    "scan-url": (8, 32),
+    "scan-html": (8, 32),
+    "upload": (4, 16),
+    "batch-fix": (2, 8),
+}
+
+# POST path -> limit; streamed variants share the limit of the plain endpoint.
+# Bulk scan items and background scan jobs take "scan-url" / "scan-html"
+# slots themselves, at "bulk" priority (see AdmissionLimit.slot)
+ADMISSION_PATHS = {
+    "/scan-url": "scan-url",
+    "/scan-url/stream": "scan-url",
+    "/scan-html": "scan-html",
+    "/scan-html/stream": "scan-html",
+    "/upload-file": "upload",
+    "/batch-fix": "batch-fix",
+    "/batch-fix/stream": "batch-fix",
+}
+
+# Weight of the latest request in the service-time average used for Retry-After
+SERVICE_TIME_SMOOTHING = 0.2
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted"""
+    
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def request_priority(headers: Headers) -> str:
+    """Priority class of a request (see PRIORITY_CLASSES)"""
+    requested = (headers.get(PRIORITY_HEADER) or "").strip().lower()
+    if requested in PRIORITY_CLASSES:
+        return requested
+    if (headers.get("origin") or "").startswith(EXTENSION_ORIGINS):
+        return "interactive"
+    return "default"
+
+
+class AdmissionLimit:
+    """
+    Concurrency limit shared by the endpoints and background work of one kind
+    
+    Up to max_concurrent requests run at once; further requests wait in a
+    priority queue of at most max_queued entries, ordered by class and then
+    arrival. A full queue sheds its lowest-priority waiter in favour of a
+    more important arrival, otherwise the arrival is rejected. Waiting
+    longer than queue_timeout is a rejection as well.
+    """
+    
+    def __init__(self, max_concurrent: int, max_queued: int, queue_timeout: float = ADMISSION_QUEUE_TIMEOUT):
+        """
+        Args:
+            max_concurrent: Requests served at once
+            max_queued: Requests waiting for a slot
+            queue_timeout: Seconds a request may wait
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._service_time = 1.0
+        self.counts: Dict[str, Dict[str, int]] = {
+            name: {"admitted": 0, "rejected": 0, "timed_out": 0, "shed": 0} for name in PRIORITY_CLASSES
+        }
+    
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free, from the average service time"""
+        backlog = (len(self._waiters) + 1) / self.max_concurrent
+        return max(1, math.ceil(self._service_time * backlog))
+    
+    async def acquire(self, priority_class: str):
+        """
+        Wait for a slot
+        
+        Raises:
+            Overloaded: The queue is full, the wait timed out or the request was shed
+        """
+        counts = self.counts[priority_class]
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            counts["admitted"] += 1
+            return
+        
+        priority = PRIORITY_CLASSES[priority_class]
+        if len(self._waiters) >= self.max_queued:
+            worst = max(self._waiters, default=None)
+            if worst is None or worst[0] <= priority:
+                counts["rejected"] += 1
+                raise Overloaded("Server busy, queue full", self.retry_after())
+            self._remove(worst)
+            worst[2].set_exception(Overloaded("Server busy, displaced by higher-priority requests", self.retry_after()))
+        
+        entry = (priority, next(self._sequence), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiters, entry)
+        future = entry[2]
+        try:
+            await asyncio.wait({future}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            # Client went away while queued; hand back a slot granted meanwhile
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self.release()
+            else:
+                self._remove(entry)
+                future.cancel()
+            raise
+        
+        if not future.done():
+            self._remove(entry)
+            future.cancel()
+            counts["timed_out"] += 1
+            raise Overloaded(f"Server busy, no slot within {self.queue_timeout:g}s", self.retry_after())
+        if future.exception() is not None:
+            counts["shed"] += 1
+            raise future.exception()
+        counts["admitted"] += 1
+    
+    @asynccontextmanager
+    async def slot(self, priority_class: str, wait: bool = False) -> AsyncIterator[None]:
+        """
+        Hold a slot for the duration of a with-block
+        
+        Args:
+            priority_class: See PRIORITY_CLASSES
+            wait: Sleep for Retry-After and try again when rejected, instead of
+                raising Overloaded (background work that has no client to answer)
+        """
+        while True:
+            try:
+                await self.acquire(priority_class)
+                break
+            except Overloaded as e:
+                if not wait:
+                    raise
+                await asyncio.sleep(e.retry_after)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - start)
+    
+    def release(self, service_time: Optional[float] = None):
+        """Free a slot, handing it straight to the best waiter if there is one"""
+        if service_time is not None:
+            self._service_time += SERVICE_TIME_SMOOTHING * (service_time - self._service_time)
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+    
+    def _remove(self, entry):
+        try:
+            self._waiters.remove(entry)
+        except ValueError:
+            return
+        heapq.heapify(self._waiters)
+    
+    def stats(self) -> Dict[str, object]:
+        """Slot and queue occupancy, plus outcomes per priority class"""
+        return {
+            "active": self.active,
+            "max_concurrent": self.max_concurrent,
+            "queued": len(self._waiters),
+            "max_queued": self.max_queued,
+            "avg_service_seconds": round(self._service_time, 3),
+            "classes": self.counts
+        }
+
+
+def default_limits() -> Dict[str, AdmissionLimit]:
+    """One AdmissionLimit per entry in ADMISSION_LIMITS"""
+    return {
+        name: AdmissionLimit(max_concurrent, max_queued)
+        for name, (max_concurrent, max_queued) in ADMISSION_LIMITS.items()
+    }
+
+
+class AdmissionMiddleware:
+    """
+    Applies AdmissionLimits to POST requests on the limited paths (ADMISSION_PATHS)
+    
+    Rejected requests get 429 with a Retry-After header. Add it before
+    CORSMiddleware so the 429 responses still carry CORS headers.
+    """
+    
+    def __init__(self, app, limits: Dict[str, AdmissionLimit], paths: Dict[str, str] = ADMISSION_PATHS):
+        """
+        Args:
+            app: ASGI app
+            limits: Limit name -> AdmissionLimit (see default_limits); the caller
+                keeps the dict to report stats and to share with background work
+            paths: POST path -> limit name
+        """
+        self.app = app
+        self.limits = limits
+        self.paths = paths
+    
+    async def __call__(self, scope, receive, send):
+        limit = None
+        if scope["type"] == "http" and scope["method"] == "POST":
+            limit = self.limits.get(self.paths.get(scope["path"]))
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+        
+        try:
+            async with limit.slot(request_priority(Headers(scope=scope))):
+                # Streamed responses keep the slot until the last event is sent
+                await self.app(scope, receive, send)
+        except Overloaded as e:
+            response = JSONResponse(
+                {"detail": e.reason, "retry_after": e.retry_after},
+                status_code=429,
+                headers={"Retry-After": str(e.retry_after)}
+            )
+            await response(scope, receive, send)
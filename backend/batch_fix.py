@@ -0,0 +1,135 @@
+"""
+Batch fixing
+Generates fixes for many issues concurrently, parsing each distinct snippet once
+"""
+
+import asyncio
+import copy
+import time
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+import httpx
+
+from services.auto_fixer import IMAGE_FIX_TYPES
+
+# Issues accepted per batch request
+BATCH_FIX_MAX_ITEMS = 1000
+
+# Image downloads (alt-text fixes) in flight at once per batch
+BATCH_FIX_CONCURRENCY = 8
+
+
+async def batch_fix_events(
+    fixer,
+    issues: List[Dict[str, Any]],
+    concurrency: int = BATCH_FIX_CONCURRENCY
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Fix issues and yield (event, data) pairs as fixes complete
+    
+    Issues are grouped by (issue_type, original_code): each group is fixed
+    once and the result is sent for every issue in it. Each distinct snippet
+    is parsed once; groups sharing it fix copies of the tree, except the
+    last one, which gets the parsed tree itself.
+    Image fixes run concurrently under a semaphore with one pooled HTTP
+    client, the other (CPU-only) fixes run as they are scheduled.
+    
+    Events: one "fix" per issue (in completion order, with its input index
+    and timing_ms), then a final "summary".
+    
+    Args:
+        fixer: AutoFixer instance
+        issues: Dicts with issue_id, issue_type and original_code
+        concurrency: Image fixes run at once
+    """
+    start = time.perf_counter()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    
+    groups: Dict[Tuple[str, str], List[Tuple[int, Dict[str, Any]]]] = {}
+    for index, issue in enumerate(issues):
+        groups.setdefault((issue["issue_type"], issue["original_code"]), []).append((index, issue))
+    
+    # Solve all contrast color pairs in one batch before fixing
+    contrast_codes = [code for issue_type, code in groups if issue_type == "contrast_ratio"]
+    if contrast_codes:
+        fixer.prepare_contrast_fixes(contrast_codes)
+    
+    # Fixes modify the tree they get, so the parsed tree is copied for every
+    # group but the last to ask for it (copying costs about as much as parsing)
+    unclaimed = Counter(code for _, code in groups)
+    parsed: Dict[str, Any] = {}
+    parse_count = 0
+    
+    def tree_for(code: str):
+        nonlocal parse_count
+        if code not in parsed:
+            parsed[code] = fixer.parse_snippet(code)
+            parse_count += 1
+        unclaimed[code] -= 1
+        if unclaimed[code] == 0:
+            return parsed.pop(code)
+        return copy.copy(parsed[code])
+    
+    async def fix_group(issue_type: str, code: str, client: httpx.AsyncClient) -> Tuple[str, str, Dict[str, Any], float]:
+        fix_start = time.perf_counter()
+        try:
+            if issue_type in IMAGE_FIX_TYPES:
+                async with semaphore:
+                    fix_start = time.perf_counter()
+                    result = await fixer.apply_fix(issue_type, tree_for(code), code, client=client)
+            else:
+                result = await fixer.apply_fix(issue_type, tree_for(code), code)
+            if not isinstance(result, dict):
+                raise ValueError("Invalid fix result format")
+            outcome = {
+                "success": True,
+                "fixed_code": str(result.get("fixed_code") or code),
+                "explanation": str(result.get("explanation") or "Fix applied for accessibility improvement.")
+            }
+        except Exception as e:
+            outcome = {"success": False, "error": str(e)}
+        return issue_type, code, outcome, round((time.perf_counter() - fix_start) * 1000, 2)
+    
+    by_type: Dict[str, Dict[str, Any]] = {}
+    succeeded = 0
+    async with httpx.AsyncClient(follow_redirects=True, limits=httpx.Limits(max_connections=concurrency)) as client:
+        tasks = [asyncio.create_task(fix_group(issue_type, code, client)) for issue_type, code in groups]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                issue_type, code, outcome, timing_ms = await next_done
+                members = groups[(issue_type, code)]
+                totals = by_type.setdefault(issue_type, {"issues": 0, "unique": 0, "ms": 0.0})
+                totals["issues"] += len(members)
+                totals["unique"] += 1
+                totals["ms"] = round(totals["ms"] + timing_ms, 2)
+                if outcome["success"]:
+                    succeeded += len(members)
+                for index, issue in members:
+                    yield "fix", dict(
+                        outcome, index=index, issue_id=issue["issue_id"], issue_type=issue_type, timing_ms=timing_ms
+                    )
+        finally:
+            # Client went away: stop fixes that have not finished
+            for task in tasks:
+                task.cancel()
+    
+    elapsed = time.perf_counter() - start
+    yield "summary", {
+        "total": len(issues),
+        "succeeded": succeeded,
+        "failed": len(issues) - succeeded,
+        "unique_fixes": len(groups),
+        "parsed_snippets": parse_count,
+        "by_type": by_type,
+        "elapsed_ms": round(elapsed * 1000, 1)
+    }
+
+
+async def batch_fix(fixer, issues: List[Dict[str, Any]], concurrency: int = BATCH_FIX_CONCURRENCY) -> List[Dict[str, Any]]:
+    """Run batch_fix_events to completion; fixes are returned in input order"""
+    fixes: List[Dict[str, Any]] = [{} for _ in issues]
+    async for event, data in batch_fix_events(fixer, issues, concurrency):
+        if event == "fix":
+            fixes[data.pop("index")] = data
+    return fixes
@@ -0,0 +1,191 @@
+"""
+Database throughput benchmark
+Mixed read/write load against pooled WAL connections vs. a connection per call
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager, redirect_stdout
+
+from database import Database, ReportWriter
+
+
+class PerCallDatabase(Database):
+    """Baseline: opens a default (rollback journal) connection for every call"""
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def _read(self):
+        conn = self._open()
+        try:
+            yield conn.cursor()
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _write(self):
+        conn = self._open()
+        try:
+            yield conn.cursor()
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def make_issues(count: int):
+    """Synthetic issue list shaped like scanner output"""
+    severities = ["critical", "high", "medium", "low"]
+    types = ["missing_alt_text", "low_contrast", "missing_label", "heading_order", "empty_link"]
+    return [
+        {
+            "type": random.choice(types),
+            "severity": random.choice(severities),
+            "wcag_rule": "1.1.1",
+            "message": f"Synthetic issue {i}",
+            "element": "<img src='x.png'>",
+        }
+        for i in range(count)
+    ]
+
+
+def run_load(database: Database, threads: int, operations: int, write_ratio: float):
+    """
+    Run a mixed workload across worker threads
+
+    Returns:
+        Tuple of (elapsed seconds, reads, writes, errors)
+    """
+    counters = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    issues = make_issues(20)
+    per_thread = operations // threads
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        reads = writes = errors = 0
+        for i in range(per_thread):
+            try:
+                if rng.random() < write_ratio:
+                    database.save_report(
+                        url=f"https://site{rng.randint(0, 50)}.example.com/page{i}",
+                        score=rng.uniform(40, 100),
+                        wcag_level="AA",
+                        total_issues=len(issues),
+                        issues=issues,
+                        scan_duration=0.5
+                    )
+                    writes += 1
+                else:
+                    op = rng.random()
+                    if op < 0.5:
+                        database.get_report(rng.randint(1, 200))
+                    elif op < 0.8:
+                        database.get_all_reports(limit=20)
+                    else:
+                        database.get_statistics()
+                    reads += 1
+            except sqlite3.Error:
+                errors += 1
+        with lock:
+            counters["reads"] += reads
+            counters["writes"] += writes
+            counters["errors"] += errors
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return elapsed, counters["reads"], counters["writes"], counters["errors"]
+
+
+def benchmark(label: str, factory, args) -> float:
+    """Run the workload on a fresh database and print its throughput"""
+    # The database layer logs every saved report; keep the output readable
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as quiet, redirect_stdout(quiet):
+        database = factory(os.path.join(tmp, "bench.db"))
+        # Seed so reads hit real rows
+        run_load(database, 1, 200, 1.0)
+        elapsed, reads, writes, errors = run_load(database, args.threads, args.operations, args.write_ratio)
+        database.close()
+
+    ops = reads + writes
+    print(f"\n{label}")
+    print(f"   Operations: {ops} ({reads} reads, {writes} writes, {errors} errors)")
+    print(f"   Elapsed:    {elapsed:.2f}s")
+    print(f"   Throughput: {ops / elapsed:,.0f} ops/s")
+    return ops / elapsed
+
+
+def benchmark_inserts(label: str, args, write_behind: bool) -> float:
+    """Insert reports from worker threads, directly or through the write-behind queue"""
+    issues = make_issues(20)
+    per_thread = args.inserts // args.threads
+
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as quiet, redirect_stdout(quiet):
+        database = Database(os.path.join(tmp, "bench.db"), pool_size=args.threads)
+        writer = ReportWriter(database) if write_behind else None
+        
+        def worker(n: int):
+            for i in range(per_thread):
+                report = (f"https://site{n}.example.com/page{i}", 80.0, "AA", len(issues), issues)
+                if writer:
+                    writer.submit(database.prepare_report(*report))
+                else:
+                    database.save_report(*report)
+        
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(args.threads)]
+        start = time.perf_counter()
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        accepted = time.perf_counter() - start
+        if writer:
+            writer.close()
+        elapsed = time.perf_counter() - start
+        batches = writer.batches_written if writer else per_thread * args.threads
+        database.close()
+
+    inserts = per_thread * args.threads
+    print(f"\n{label}")
+    print(f"   Reports:      {inserts} in {batches} transactions")
+    print(f"   Accepted in:  {accepted:.2f}s")
+    print(f"   Durable in:   {elapsed:.2f}s")
+    print(f"   Throughput:   {inserts / elapsed:,.0f} reports/s")
+    return inserts / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--operations", type=int, default=4000)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--inserts", type=int, default=2000)
+    args = parser.parse_args()
+
+    print("📊 Database benchmark")
+    print(f"   Threads: {args.threads}, operations: {args.operations}, write ratio: {args.write_ratio}")
+
+    baseline = benchmark("Connection per call", PerCallDatabase, args)
+    pooled = benchmark("Pooled WAL connections", lambda path: Database(path, pool_size=args.threads), args)
+    print(f"\n✅ Speedup: {pooled / baseline:.2f}x")
+
+    direct = benchmark_inserts("Report inserts, one transaction each", args, write_behind=False)
+    batched = benchmark_inserts("Report inserts, write-behind batches", args, write_behind=True)
+    print(f"\n✅ Speedup: {batched / direct:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
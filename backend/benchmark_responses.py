@@ -0,0 +1,120 @@
+"""
+Scan response benchmark
+Response time and bytes on the wire for a large scan result: pydantic ScanResponse +
+stdlib JSON vs. the orjson path with gzip / brotli negotiation
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+from benchmark_storage import make_page
+from compression import CompressionMiddleware, brotli
+from fast_json import scan_response
+from services.scanner import AccessibilityScanner
+
+
+class ScanResponse(BaseModel):
+    success: bool
+    url: Optional[str] = None
+    issues: List[Dict[str, Any]]
+    total_issues: int
+    wcag_level: str
+    score: float
+
+
+def build_apps(issues: List[Dict[str, Any]]):
+    """The same endpoint before (validated model, no compression) and after"""
+    before = FastAPI()
+    after = FastAPI()
+    after.add_middleware(CompressionMiddleware)
+    
+    @before.get("/scan", response_model=ScanResponse)
+    async def scan_before():
+        return ScanResponse(success=True, issues=issues, total_issues=len(issues), wcag_level="A", score=42.0)
+    
+    @after.get("/scan", response_model=ScanResponse)
+    async def scan_after():
+        return scan_response(issues, "A", 42.0)
+    
+    return before, after
+
+
+async def measure(app, accept_encoding: str, requests: int):
+    """Mean / p50 / max request time and wire size of one response"""
+    transport = httpx.ASGITransport(app=app)
+    timings = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        headers = {"Accept-Encoding": accept_encoding}
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.get("/scan", headers=headers)
+            timings.append(time.perf_counter() - start)
+            response.raise_for_status()
+        wire_bytes = len(response.content) if not response.headers.get("content-encoding") else int(response.headers["content-length"])
+        body = response.json()
+    timings.sort()
+    return {
+        "mean_ms": sum(timings) / len(timings) * 1000,
+        "p50_ms": timings[len(timings) // 2] * 1000,
+        "max_ms": timings[-1] * 1000,
+        "bytes": wire_bytes,
+        "encoding": response.headers.get("content-encoding", "identity"),
+        "total_issues": body["total_issues"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=40, help="Storefront pages concatenated into the scanned document")
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--bandwidth-mbps", type=float, default=50.0, help="Client link speed used to estimate transfer time")
+    args = parser.parse_args()
+    
+    rng = random.Random(7)
+    html = "\n".join(make_page(rng, "bench.example.com", f"page{i}") for i in range(args.pages))
+    issues = asyncio.run(AccessibilityScanner().scan_comprehensive(html, "", "", "https://bench.example.com"))
+    before, after = build_apps(issues)
+    
+    print("📊 Scan response benchmark")
+    print(f"   {len(issues)} issues from a {len(html) / 1000:.0f}k-char document, {args.requests} requests per case")
+    
+    if brotli is None:
+        raise SystemExit("❌ brotli is not installed (pip install -r requirements.txt)")
+    
+    cases = [
+        ("Before: ScanResponse + json", before, "gzip, br"),
+        ("After: orjson, identity", after, "identity"),
+        ("After: orjson + gzip", after, "gzip"),
+        ("After: orjson + brotli", after, "br, gzip"),
+    ]
+    
+    results = {}
+    for name, app, accept_encoding in cases:
+        result = asyncio.run(measure(app, accept_encoding, args.requests))
+        results[name] = result
+        print(f"\n{name}")
+        print(f"   mean {result['mean_ms']:.1f} ms, p50 {result['p50_ms']:.1f} ms, max {result['max_ms']:.1f} ms")
+        result["transfer_ms"] = result["bytes"] * 8 / (args.bandwidth_mbps * 1e6) * 1000
+        print(f"   {result['bytes'] / 1024:.0f} KiB on the wire ({result['encoding']}), "
+              f"~{result['transfer_ms']:.1f} ms at {args.bandwidth_mbps:.0f} Mbit/s")
+    
+    baseline = results[cases[0][0]]
+    print()
+    for name, _, _ in cases[1:]:
+        result = results[name]
+        total = result["mean_ms"] + result["transfer_ms"]
+        baseline_total = baseline["mean_ms"] + baseline["transfer_ms"]
+        print(f"✅ {name}: server {baseline['mean_ms'] / result['mean_ms']:.1f}x, "
+              f"bytes {baseline['bytes'] / result['bytes']:.1f}x fewer, "
+              f"server + transfer {baseline_total:.1f} -> {total:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
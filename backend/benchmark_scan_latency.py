@@ -0,0 +1,117 @@
+"""
+Scan latency benchmark
+p50/p99 latency of small /scan-html requests while large pages are being scanned,
+with scan_comprehensive on the event loop vs. in the scan process pool
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from contextlib import redirect_stdout
+
+import httpx
+
+from benchmark_storage import make_page
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run_load(app, small_html: str, large_html: str, large_clients: int, small_rate: float, seconds: float):
+    """
+    Large scans from closed-loop clients; small scans arrive at a fixed rate
+    
+    Small-request latency is measured from the scheduled arrival time, so
+    time spent waiting for a blocked event loop is counted (no coordinated
+    omission). Requests go through httpx.ASGITransport on the benchmark's
+    event loop, like connections handled by one uvicorn worker.
+    """
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    large_done = 0
+    loop = asyncio.get_running_loop()
+    begin = loop.time()
+    deadline = begin + seconds
+    
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300.0) as client:
+        async def large_client():
+            nonlocal large_done
+            while loop.time() < deadline:
+                response = await client.post("/scan-html", json={"html": large_html})
+                response.raise_for_status()
+                large_done += 1
+                # The in-memory transport never suspends on its own; a real
+                # connection yields to the loop between requests
+                await asyncio.sleep(0)
+        
+        async def small_request(arrival: float):
+            response = await client.post("/scan-html", json={"html": small_html})
+            response.raise_for_status()
+            latencies.append(loop.time() - arrival)
+        
+        async def small_arrivals():
+            requests = []
+            arrival = begin + 0.1  # let the large scans start first
+            while arrival < deadline:
+                await asyncio.sleep(max(0.0, arrival - loop.time()))
+                requests.append(asyncio.create_task(small_request(arrival)))
+                arrival += 1 / small_rate
+            await asyncio.gather(*requests)
+        
+        await asyncio.gather(*[large_client() for _ in range(large_clients)], small_arrivals())
+    return latencies, large_done
+
+
+def report(name: str, latencies, large_done: int, seconds: float):
+    print(f"\n{name}")
+    print(f"   Small requests: {len(latencies)} ({len(latencies) / seconds:.1f}/s)")
+    print(f"   p50: {percentile(latencies, 0.50) * 1000:.1f} ms")
+    print(f"   p99: {percentile(latencies, 0.99) * 1000:.1f} ms")
+    print(f"   max: {max(latencies) * 1000:.1f} ms")
+    print(f"   Large scans completed: {large_done}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=max(2, os.cpu_count() or 2))
+    parser.add_argument("--large-clients", type=int, default=2)
+    parser.add_argument("--small-rate", type=float, default=50.0, help="Small requests per second")
+    parser.add_argument("--large-pages", type=int, default=12, help="Storefront pages concatenated into one large document")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+    
+    with open(os.devnull, "w") as quiet, redirect_stdout(quiet):
+        import main as server
+        from scan_pool import PooledScanner
+        from services.scanner import AccessibilityScanner
+    
+    rng = random.Random(11)
+    small_html = '<html lang="en"><body><h1>Sign in</h1><img src="logo.png"><input type="text" placeholder="Email"></body></html>'
+    large_html = "\n".join(make_page(rng, "bench.example.com", f"page{i}") for i in range(args.large_pages))
+    
+    print("📊 Scan latency benchmark")
+    print(f"   Small page: {len(small_html)} chars, large page: {len(large_html) / 1000:.0f}k chars")
+    print(f"   Load: {args.small_rate:.0f} small requests/s, {args.large_clients} large-page clients, {args.seconds:.0f}s per mode")
+    
+    results = {}
+    for name, processes in (("Event loop (no pool)", 0), (f"Process pool ({args.processes} workers)", args.processes)):
+        scanner = PooledScanner(AccessibilityScanner(), processes=processes)
+        scanner.start()
+        server.scanner = scanner
+        with open(os.devnull, "w") as quiet, redirect_stdout(quiet):
+            latencies, large_done = asyncio.run(run_load(
+                server.app, small_html, large_html, args.large_clients, args.small_rate, args.seconds
+            ))
+        scanner.shutdown()
+        report(name, latencies, large_done, args.seconds)
+        results[processes] = percentile(latencies, 0.99)
+    
+    print(f"\n✅ Small-request p99 {results[0] / results[args.processes]:.1f}x lower with the process pool")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Report storage benchmark
+Database size of inline issues_json / truncated HTML vs. the compressed blob store
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+import blob_store
+from database import Database
+from services.scanner import AccessibilityScanner
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><title>{site} - {page}</title>
+<style>.muted {{ color: #999; background: #fff; }} .hero {{ color: #777; background-color: #eee; }}</style>
+</head>
+<body>
+<div class="nav">{nav}</div>
+<div class="hero"><span>{site} {page}</span></div>
+<div class="grid">{products}</div>
+<form>{fields}<div onclick="submit()">Submit</div></form>
+<p class="muted">{copy}</p>
+<div class="footer">{footer}</div>
+</body>
+</html>"""
+
+WORDS = ("accessible", "catalog", "shipping", "account", "offers", "support", "delivery",
+         "returns", "checkout", "featured", "collection", "newsletter", "privacy", "contact")
+
+
+def make_page(rng: random.Random, site: str, page: str) -> str:
+    """Synthetic storefront page with a realistic mix of accessibility problems"""
+    nav = "".join(f'<a href="/{w}">{w.title()}</a>' for w in rng.sample(WORDS, 8))
+    products = "".join(
+        f'<div class="card"><img src="/img/{site}/{page}/{i}.jpg">'
+        f'<a href="#">{" ".join(rng.sample(WORDS, 3))}</a><span>${rng.randint(5, 500)}</span></div>'
+        for i in range(rng.randint(10, 40))
+    )
+    fields = "".join(f'<input type="text" name="{w}" placeholder="{w}">' for w in rng.sample(WORDS, 4))
+    copy = " ".join(rng.choice(WORDS) for _ in range(rng.randint(200, 800)))
+    footer = "".join(f'<a href="/{w}"><img src="/icons/{w}.svg"></a>' for w in rng.sample(WORDS, 6))
+    return PAGE_TEMPLATE.format(
+        site=site, page=page, nav=nav, products=products, fields=fields, copy=copy, footer=footer
+    )
+
+
+def legacy_database(path: str) -> sqlite3.Connection:
+    """The original reports schema: inline issues_json and HTML truncated to 10,000 chars"""
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE reports (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT NOT NULL,
+            domain TEXT,
+            scan_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            score REAL NOT NULL,
+            wcag_level TEXT NOT NULL,
+            total_issues INTEGER NOT NULL,
+            issues_json TEXT NOT NULL,
+            severity_breakdown TEXT,
+            scan_duration REAL,
+            html_content TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    return conn
+
+
+def file_size(path: str) -> int:
+    """Size after folding the WAL back into the main file and vacuuming"""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("VACUUM")
+    conn.close()
+    return os.path.getsize(path)
+
+
+async def build_corpus(sites: int, pages: int, rescans: int, seed: int):
+    """Scan every page; unchanged pages are re-scanned like a scheduled monitor would"""
+    rng = random.Random(seed)
+    scanner = AccessibilityScanner()
+    corpus = []
+    for s in range(sites):
+        site = f"shop{s}.example.com"
+        for p in range(pages):
+            html = make_page(rng, site, f"page{p}")
+            url = f"https://{site}/page{p}"
+            issues = await scanner.scan_comprehensive(html, "", "", url)
+            score = scanner.calculate_accessibility_score(issues)
+            level = scanner.determine_wcag_level(issues)
+            corpus.extend([(url, score, level, issues, html)] * rescans)
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sites", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--rescans", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if blob_store.zstandard is None:
+        raise SystemExit("❌ zstandard is not installed (pip install -r requirements.txt)")
+
+    print("📊 Storage benchmark")
+    print(f"   Sites: {args.sites}, pages per site: {args.pages}, scans per page: {args.rescans}")
+
+    with open(os.devnull, "w") as quiet, redirect_stdout(quiet):
+        corpus = asyncio.run(build_corpus(args.sites, args.pages, args.rescans, args.seed))
+    issues_total = sum(len(item[3]) for item in corpus)
+    html_total = sum(len(item[4]) for item in corpus)
+    print(f"   Reports: {len(corpus)}, issues: {issues_total}, HTML: {html_total / 1e6:.1f} MB")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy.db")
+        conn = legacy_database(legacy_path)
+        start = time.perf_counter()
+        for url, score, level, issues, html in corpus:
+            conn.execute("""
+                INSERT INTO reports (url, domain, score, wcag_level, total_issues, issues_json, html_content)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (url, url.split("/")[2], score, level, len(issues), json.dumps(issues), html[:10000]))
+        conn.commit()
+        conn.close()
+        legacy_seconds = time.perf_counter() - start
+        legacy_bytes = file_size(legacy_path)
+
+        blob_path = os.path.join(tmp, "blobs.db")
+        with open(os.devnull, "w") as quiet, redirect_stdout(quiet):
+            database = Database(blob_path)
+            start = time.perf_counter()
+            for url, score, level, issues, html in corpus:
+                database.save_report(url, score, level, len(issues), issues, html_content=html)
+            blob_seconds = time.perf_counter() - start
+            storage = database.get_storage_statistics()
+            database.close()
+        blob_bytes = file_size(blob_path)
+
+    print("\nInline issues_json, HTML truncated to 10,000 chars")
+    print(f"   Size:  {legacy_bytes / 1e6:.2f} MB")
+    print(f"   Write: {legacy_seconds:.2f}s")
+    print(f"\nBlob store ({storage['codec']}), full HTML, interned rule texts")
+    print(f"   Size:  {blob_bytes / 1e6:.2f} MB (includes the issues, rollup and search tables)")
+    print(f"   Write: {blob_seconds:.2f}s")
+    print(f"   Blobs: {storage['blobs']}, {storage['referenced_bytes'] / 1e6:.2f} MB referenced, "
+          f"{storage['unique_bytes'] / 1e6:.2f} MB unique, {storage['stored_bytes'] / 1e6:.2f} MB stored")
+    print(f"   Rule texts: {storage['rule_texts']}")
+    print(f"\n✅ {legacy_bytes / blob_bytes:.1f}x smaller while keeping untruncated snapshots")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Content-addressed blob storage
+Compressed, deduplicated storage for HTML/CSS snapshots and issue payloads
+"""
+
+import hashlib
+import json
+import sqlite3
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # Pinned in requirements.txt; zlib is a degraded fallback
+    zstandard = None
+
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 9
+
+# Long, repeated issue texts stored once in the rule_texts catalog
+INTERNED_ISSUE_FIELDS = ("description", "fix_suggestion")
+
+
+def compress(data: bytes) -> Tuple[str, bytes]:
+    """
+    Compress with zstd (zlib on installs missing zstandard)
+    
+    Returns:
+        Tuple of (codec, payload); codec is "raw" if compression does not help
+    """
+    if zstandard is not None:
+        codec, payload = "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    else:
+        codec, payload = "zlib", zlib.compress(data, ZLIB_LEVEL)
+    if len(payload) >= len(data):
+        return "raw", data
+    return codec, payload
+
+
+def decompress(codec: str, payload: bytes) -> bytes:
+    """Inverse of compress"""
+    if codec == "raw":
+        return payload
+    if codec == "zlib":
+        return zlib.decompress(payload)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Blob is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    raise ValueError(f"Unknown blob codec: {codec}")
+
+
+class BlobStore:
+    """Blob and rule-text catalog operations on a caller-provided cursor"""
+    
+    @staticmethod
+    def create_schema(cursor: sqlite3.Cursor):
+        """Create the blobs and rule_texts tables"""
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_size INTEGER NOT NULL,
+                refcount INTEGER NOT NULL DEFAULT 0,
+                data BLOB NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS rule_texts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                text TEXT NOT NULL UNIQUE
+            )
+        """)
+    
+    def __init__(self):
+        # Committed catalog entries; ids are never reused
+        self._text_ids: Dict[str, int] = {}
+        self._texts: Dict[int, str] = {}
+        # Entries interned by the open write transaction
+        self._pending: Dict[str, int] = {}
+    
+    def commit(self):
+        """Publish catalog entries interned by the transaction that just committed"""
+        for text, text_id in self._pending.items():
+            self._text_ids[text] = text_id
+            self._texts[text_id] = text
+        self._pending.clear()
+    
+    def rollback(self):
+        """Forget catalog entries interned by a rolled-back transaction"""
+        self._pending.clear()
+    
+    def put(self, cursor: sqlite3.Cursor, data: bytes) -> str:
+        """
+        Store bytes (or add a reference to an identical existing blob)
+        
+        Returns:
+            The blob hash
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        cursor.execute("UPDATE blobs SET refcount = refcount + 1 WHERE hash = ?", (digest,))
+        if cursor.rowcount == 0:
+            codec, payload = compress(data)
+            cursor.execute("""
+                INSERT INTO blobs (hash, codec, size, stored_size, refcount, data)
+                VALUES (?, ?, ?, ?, 1, ?)
+            """, (digest, codec, len(data), len(payload), payload))
+        return digest
+    
+    def put_text(self, cursor: sqlite3.Cursor, text: Optional[str]) -> Optional[str]:
+        """Store a text snapshot; None/empty stores nothing"""
+        if not text:
+            return None
+        return self.put(cursor, text.encode("utf-8"))
+    
+    def get(self, cursor: sqlite3.Cursor, digest: Optional[str]) -> Optional[bytes]:
+        """Load and decompress a blob"""
+        if not digest:
+            return None
+        row = cursor.execute("SELECT codec, data FROM blobs WHERE hash = ?", (digest,)).fetchone()
+        if not row:
+            return None
+        return decompress(row[0], row[1])
+    
+    def get_text(self, cursor: sqlite3.Cursor, digest: Optional[str]) -> Optional[str]:
+        data = self.get(cursor, digest)
+        return data.decode("utf-8") if data is not None else None
+    
+    def release(self, cursor: sqlite3.Cursor, digests: Iterable[Optional[str]]):
+        """Drop one reference to each blob, deleting blobs that are no longer used"""
+        for digest in digests:
+            if digest:
+                cursor.execute("UPDATE blobs SET refcount = refcount - 1 WHERE hash = ?", (digest,))
+                cursor.execute("DELETE FROM blobs WHERE hash = ? AND refcount <= 0", (digest,))
+    
+    def text_id(self, cursor: sqlite3.Cursor, text: str) -> int:
+        """Catalog id for a rule text, interning it on first use"""
+        text_id = self._text_ids.get(text) or self._pending.get(text)
+        if text_id is not None:
+            return text_id
+        cursor.execute("INSERT OR IGNORE INTO rule_texts (text) VALUES (?)", (text,))
+        text_id = cursor.execute("SELECT id FROM rule_texts WHERE text = ?", (text,)).fetchone()[0]
+        self._pending[text] = text_id
+        return text_id
+    
+    def text(self, cursor: sqlite3.Cursor, text_id: int) -> str:
+        """Rule text by catalog id"""
+        text = self._texts.get(text_id)
+        if text is None:
+            text = cursor.execute("SELECT text FROM rule_texts WHERE id = ?", (text_id,)).fetchone()[0]
+            self._texts[text_id] = text
+            self._text_ids[text] = text_id
+        return text
+    
+    def put_issues(self, cursor: sqlite3.Cursor, issues: List[Dict[str, Any]]) -> str:
+        """
+        Store an issue list with rule texts replaced by catalog ids
+        
+        Returns:
+            The blob hash
+        """
+        compact = []
+        for issue in issues:
+            if isinstance(issue, dict):
+                issue = dict(issue)
+                for field in INTERNED_ISSUE_FIELDS:
+                    value = issue.get(field)
+                    if isinstance(value, str) and value:
+                        issue["$" + field] = self.text_id(cursor, issue.pop(field))
+            compact.append(issue)
+        return self.put(cursor, json.dumps(compact, separators=(",", ":")).encode("utf-8"))
+    
+    def get_issues(self, cursor: sqlite3.Cursor, digest: str) -> List[Dict[str, Any]]:
+        """Load an issue list stored by put_issues"""
+        data = self.get(cursor, digest)
+        if data is None:
+            return []
+        issues = json.loads(data)
+        for issue in issues:
+            if isinstance(issue, dict):
+                for field in INTERNED_ISSUE_FIELDS:
+                    text_id = issue.pop("$" + field, None)
+                    if text_id is not None:
+                        issue[field] = self.text(cursor, text_id)
+        return issues
+    
+    def stats(self, cursor: sqlite3.Cursor) -> Dict[str, Any]:
+        """Blob count, logical and stored bytes, and rule catalog size"""
+        row = cursor.execute("""
+            SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0),
+                   COALESCE(SUM(size * refcount), 0)
+            FROM blobs
+        """).fetchone()
+        rule_texts = cursor.execute("SELECT COUNT(*) FROM rule_texts").fetchone()[0]
+        return {
+            "blobs": row[0],
+            "unique_bytes": row[1],
+            "stored_bytes": row[2],
+            "referenced_bytes": row[3],
+            "rule_texts": rule_texts,
+            "codec": "zstd" if zstandard is not None else "zlib"
+        }
@@ -0,0 +1,213 @@
+"""
+Bulk scanning
+Scans many URLs or HTML documents concurrently and yields per-item results as they finish
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+from admission import AdmissionLimit
+from scan_pool import PooledScanner
+
+# Items accepted per bulk request
+BULK_MAX_ITEMS = 500
+
+# Items in flight at once (fetch + scan)
+BULK_DEFAULT_CONCURRENCY = 8
+BULK_MAX_CONCURRENCY = 32
+
+# Threads running rule checks that the process pool (see scan_pool) would run
+# in-process, shared by bulk and streaming scans
+CPU_WORKERS = os.cpu_count() or 2
+
+_cpu_pool: Optional[ThreadPoolExecutor] = None
+
+
+def cpu_pool() -> ThreadPoolExecutor:
+    """Shared worker pool for scan CPU work (created on first use)"""
+    global _cpu_pool
+    if _cpu_pool is None:
+        _cpu_pool = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="scan-cpu")
+    return _cpu_pool
+
+
+def shutdown_cpu_pool():
+    """Stop the worker pool (server shutdown)"""
+    global _cpu_pool
+    if _cpu_pool is not None:
+        _cpu_pool.shutdown(wait=False, cancel_futures=True)
+        _cpu_pool = None
+
+
+def scan_sync(scanner, html: str, css: str, js: str, source_url: str) -> List[Dict[str, Any]]:
+    """Run scan_comprehensive to completion in a worker thread"""
+    return asyncio.run(scanner.scan_comprehensive(html, css, js, source_url))
+
+
+def normalize_url(url: str) -> str:
+    """Add a missing scheme; raises ValueError for empty or host-less URLs"""
+    url = (url or "").strip()
+    if not url:
+        raise ValueError("URL cannot be empty")
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    if not urlparse(url).netloc:
+        raise ValueError("Invalid URL format")
+    return url
+
+
+async def bulk_scan_events(
+    scanner,
+    items: List[Dict[str, Any]],
+    concurrency: int = BULK_DEFAULT_CONCURRENCY,
+    include_issues: bool = True,
+    save_report: Optional[Callable[..., Awaitable[int]]] = None,
+    limits: Optional[Dict[str, AdmissionLimit]] = None
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Scan items concurrently and yield (event, data) pairs in completion order
+    
+    Events: "item" for each scanned item, "error" for each failed item, then
+    a final "summary". Fetches share one pooled HTTP client; rule checks run
+    in the scanner's process pool (large documents) or the shared CPU thread
+    pool, never on the event loop, so it keeps fetching.
+    
+    Args:
+        scanner: Scanner instance (fetch_website must accept a client)
+        items: Dicts with either "url" or "html" (plus optional "css", "js", "id")
+        concurrency: Items processed at once (capped at BULK_MAX_CONCURRENCY)
+        include_issues: Include each item's issue list in its event
+        save_report: Optional AsyncDatabase.save_report; report ids are sent with items
+        limits: Optional admission limits (see admission.default_limits); each item
+            holds a "scan-url" or "scan-html" slot at "bulk" priority while it is
+            fetched and scanned, waiting rather than failing when they are full
+    """
+    concurrency = max(1, min(concurrency, BULK_MAX_CONCURRENCY))
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    
+    def admitted(name: str):
+        limit = (limits or {}).get(name)
+        return limit.slot("bulk", wait=True) if limit is not None else nullcontext()
+    
+    async def scan_item(index: int, item: Dict[str, Any], client: httpx.AsyncClient) -> Tuple[str, Dict[str, Any]]:
+        label = {"index": index, "id": item.get("id")}
+        stage = "validate"
+        async with semaphore:
+            item_start = time.perf_counter()
+            try:
+                if item.get("html") is not None:
+                    source = item.get("id") or f"document-{index}"
+                    limit_name = "scan-html"
+                else:
+                    source = normalize_url(item.get("url"))
+                    label["url"] = source
+                    limit_name = "scan-url"
+                
+                async with admitted(limit_name):
+                    if limit_name == "scan-html":
+                        html, css, js = item["html"], item.get("css") or "", item.get("js") or ""
+                        fetch_ms = 0.0
+                    else:
+                        stage = "fetch"
+                        html, css, js = await scanner.fetch_website(source, client=client)
+                        fetch_ms = round((time.perf_counter() - item_start) * 1000, 1)
+                    
+                    stage = "scan"
+                    scan_start = time.perf_counter()
+                    if isinstance(scanner, PooledScanner) and not scanner.runs_inline(html, css):
+                        issues = await scanner.scan_comprehensive(html, css, js, source)
+                    else:
+                        # Small documents (or no process pool): many of them back to back
+                        # would still hold the event loop, so they go to the thread pool
+                        issues = await loop.run_in_executor(cpu_pool(), scan_sync, scanner, html, css, js, source)
+                scan_ms = round((time.perf_counter() - scan_start) * 1000, 1)
+                
+                stage = "score"
+                score = scanner.calculate_accessibility_score(issues)
+                wcag_level = scanner.determine_wcag_level(issues)
+                result = dict(label, **{
+                    "url": source,
+                    "score": score,
+                    "wcag_level": wcag_level,
+                    "total_issues": len(issues),
+                    "severity": _count_severities(issues),
+                    "fetch_ms": fetch_ms,
+                    "scan_ms": scan_ms
+                })
+                if save_report is not None:
+                    stage = "save"
+                    result["report_id"] = await save_report(
+                        url=source,
+                        score=score,
+                        wcag_level=wcag_level,
+                        total_issues=len(issues),
+                        issues=issues,
+                        scan_duration=round(time.perf_counter() - item_start, 3),
+                        html_content=html,
+                        css_content=css
+                    )
+                if include_issues:
+                    result["issues"] = issues
+                return "item", result
+            except Exception as e:
+                return "error", dict(label, stage=stage, detail=str(e))
+    
+    client_limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=30.0, follow_redirects=True, limits=client_limits) as client:
+        tasks = [asyncio.create_task(scan_item(i, item, client)) for i, item in enumerate(items)]
+        results = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                event, data = await next_done
+                results.append((event, data))
+                yield event, data
+        finally:
+            # Client went away: stop items that have not finished
+            for task in tasks:
+                task.cancel()
+    
+    yield "summary", _summarize(results, time.perf_counter() - start, concurrency)
+
+
+def _count_severities(issues: List[Dict[str, Any]]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for issue in issues:
+        severity = issue.get("severity", "unknown")
+        counts[severity] = counts.get(severity, 0) + 1
+    return counts
+
+
+def _summarize(results: List[Tuple[str, Dict[str, Any]]], elapsed: float, concurrency: int) -> Dict[str, Any]:
+    """Aggregate of all item results"""
+    scanned = [data for event, data in results if event == "item"]
+    failed = [data for event, data in results if event == "error"]
+    scores = [data["score"] for data in scanned]
+    severity: Dict[str, int] = {}
+    wcag_levels: Dict[str, int] = {}
+    for data in scanned:
+        for name, count in data["severity"].items():
+            severity[name] = severity.get(name, 0) + count
+        wcag_levels[data["wcag_level"]] = wcag_levels.get(data["wcag_level"], 0) + 1
+    return {
+        "total": len(results),
+        "scanned": len(scanned),
+        "failed": len(failed),
+        "average_score": round(sum(scores) / len(scores), 2) if scores else None,
+        "min_score": min(scores) if scores else None,
+        "total_issues": sum(data["total_issues"] for data in scanned),
+        "severity": severity,
+        "wcag_levels": wcag_levels,
+        "failures": [{"index": data["index"], "url": data.get("url"), "stage": data["stage"]} for data in failed],
+        "concurrency": concurrency,
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "items_per_second": round(len(results) / elapsed, 2) if elapsed > 0 else None
+    }
@@ -0,0 +1,128 @@
+"""
+Response compression
+ASGI middleware negotiating brotli / gzip for complete (non-streamed) responses
+"""
+
+import gzip
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # Pinned in requirements.txt; without it only gzip is offered
+    brotli = None
+
+# Bodies smaller than this go out uncompressed (headers + framing outweigh the gain)
+COMPRESS_MIN_BYTES = 1024
+
+# Bodies at least this large are compressed in a worker thread, off the event loop
+COMPRESS_THREAD_MIN_BYTES = 512 * 1024
+
+# Speed-oriented levels for dynamic responses: on scan results gzip level 3 is
+# within ~20% of level 9's size at a fifth of the CPU time
+GZIP_LEVEL = 3
+BROTLI_QUALITY = 4
+
+COMPRESSIBLE_TYPES = ("application/json", "text/html", "text/plain", "text/css", "application/javascript")
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick "br" or "gzip" from an Accept-Encoding header
+    
+    Returns:
+        The best supported encoding the client accepts, or None for identity
+    """
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip()] = quality
+    
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_quality = None, 0.0
+    for name in candidates:
+        quality = weights.get(name, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a response body with a negotiated encoding"""
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware:
+    """
+    Compresses single-message responses above a size threshold
+    
+    Streamed responses (SSE / NDJSON scans, file exports) send several body
+    messages and pass through untouched, so events are never held back in
+    a compressor buffer.
+    """
+    
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        start_message = None
+        
+        async def send_compressed(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # Hold the headers until the first body message shows whether to compress
+                start_message = message
+                return
+            if start_message is None:
+                await send(message)
+                return
+            
+            start, start_message = start_message, None
+            headers = MutableHeaders(raw=list(start["headers"]))
+            body = message.get("body", b"")
+            content_type = headers.get("content-type", "")
+            if (
+                message["type"] != "http.response.body"
+                or message.get("more_body", False)
+                or "content-encoding" in headers
+                or len(body) < self.minimum_size
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                await send(start)
+                await send(message)
+                return
+            
+            if len(body) >= COMPRESS_THREAD_MIN_BYTES:
+                compressed = await run_in_threadpool(compress, body, encoding)
+            else:
+                compressed = compress(body, encoding)
+            
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send({**start, "headers": headers.raw})
+            await send({**message, "body": compressed})
+        
+        await self.app(scope, receive, send_compressed)
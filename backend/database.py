@@ -2,34 +2,328 @@
 Database setup and models for storing accessibility scan reports
 """
 
+import asyncio
+import base64
+import hashlib
 import sqlite3
 import json
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import partial
+from typing import List, Dict, Any, Optional, Callable, Tuple
 from pathlib import Path
 
+from blob_store import BlobStore
+from job_store import FINISHED_STATUSES, JobStore
+from score_history import SEVERITIES, ScoreHistory
+from services.metrics import stage_timer
+from services.tracing import span
+
 # Database file path
 DB_PATH = Path(__file__).parent / "accessibility_reports.db"
 
+# Connection pool settings
+DEFAULT_POOL_SIZE = 8
+BUSY_TIMEOUT_SECONDS = 5.0
+STATEMENT_CACHE_SIZE = 256
+WRITE_RETRIES = 5
+
+# Write-behind queue for report inserts (see ReportWriter)
+WRITE_BATCH_SIZE = 100
+WRITE_MAX_LATENCY_SECONDS = 0.05
+WRITE_QUEUE_SIZE = 1000
+
+# Report ids reserved per round trip to the shared id sequence; ids left
+# unused when a process exits are skipped
+REPORT_ID_BLOCK_SIZE = 64
+
+# Failed report writes remembered so reads can report them
+FAILED_REPORTS_KEPT = 1000
+
+# Reports migrated per transaction when backfilling derived tables
+MIGRATION_BATCH_SIZE = 500
+
+# The trigram tokenizer cannot match terms shorter than three characters
+FTS_MIN_QUERY_LENGTH = 3
+
+# Columns added after the original schema, created on older databases at startup
+REPORT_ADDED_COLUMNS = {
+    "top_issues": "TEXT",    # Summary computed at write time
+    "issues_blob": "TEXT",   # Blob hashes (see blob_store)
+    "html_blob": "TEXT",
+    "css_blob": "TEXT",
+}
+
+# Columns read for report listings; never includes issues_json or html_content
+REPORT_LISTING_COLUMNS = (
+    "id, url, domain, scan_date, score, wcag_level, total_issues, "
+    "severity_breakdown, top_issues, scan_duration, created_at"
+)
+
+# Listing sort column -> sort key. Nullable columns sort and page on
+# COALESCE(column, ''): a keyset comparison against a NULL value is never true
+REPORT_ORDER_COLUMNS = {
+    "scan_date": "COALESCE(scan_date, '')",
+    "score": "score",
+    "total_issues": "total_issues",
+    "domain": "COALESCE(domain, '')",
+    "created_at": "COALESCE(created_at, '')",
+}
+
+TOP_ISSUE_TYPES = 5
+
+# Issue columns queryable through find_issues / count_issues
+ISSUE_FILTER_COLUMNS = ("type", "severity", "wcag_rule", "wcag_level")
+ISSUE_GROUP_COLUMNS = {
+    "type": "i.type",
+    "severity": "i.severity",
+    "wcag_rule": "i.wcag_rule",
+    "wcag_level": "i.wcag_level",
+    "domain": "r.domain",
+    "url": "r.url",
+}
+
+# Applied to every new pooled connection
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA mmap_size=268435456",  # 256 MB
+    "PRAGMA cache_size=-16000",    # ~16 MB page cache per connection
+    f"PRAGMA busy_timeout={int(BUSY_TIMEOUT_SECONDS * 1000)}",
+)
+
+
+def fts_phrase(text: str, column: Optional[str] = None) -> str:
+    """Quote user input as a single FTS5 phrase (substring match under the trigram tokenizer)"""
+    phrase = '"' + text.replace('"', '""') + '"'
+    return f"{column} : {phrase}" if column else phrase
+
+
+def summarize_issue_types(issues: List[Dict[str, Any]], limit: int = TOP_ISSUE_TYPES) -> List[Dict[str, Any]]:
+    """Most frequent issue types, as stored in the top_issues summary column"""
+    issue_counts = {}
+    for issue in issues:
+        issue_type = issue.get("type", "unknown")
+        issue_counts[issue_type] = issue_counts.get(issue_type, 0) + 1
+    
+    return [
+        {"type": issue_type, "count": count}
+        for issue_type, count in sorted(issue_counts.items(), key=lambda x: x[1], reverse=True)[:limit]
+    ]
+
+
+def encode_page_cursor(value: Any, report_id: int) -> str:
+    """Opaque keyset cursor for the (sort value, id) of the last row on a page"""
+    raw = json.dumps([value, report_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_page_cursor(cursor: str) -> Tuple[Any, int]:
+    """Inverse of encode_page_cursor; raises ValueError on malformed input"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, report_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return value, int(report_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid page cursor: {cursor}") from e
+
+
+def issue_fingerprint(issue: Dict[str, Any]) -> str:
+    """
+    Stable identity of an issue across scans
+    
+    Built from the rule and the element it was found on, so the same
+    problem on the same element hashes identically in every report.
+    """
+    target = issue.get("selector") or str(issue.get("element") or "")[:200]
+    key = "|".join((
+        str(issue.get("type") or ""),
+        str(issue.get("wcag_rule") or ""),
+        str(target)
+    ))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+class ConnectionPool:
+    """Thread-safe pool of persistent, pre-configured SQLite connections"""
+    
+    def __init__(self, db_path: str, size: int = DEFAULT_POOL_SIZE):
+        self.db_path = db_path
+        self.size = max(1, size)
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with WAL journaling and the tuned pragmas"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT_SECONDS,
+            check_same_thread=False,  # Connections move between threads through the pool
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
+        conn.row_factory = sqlite3.Row  # Enable column access by name
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    def acquire(self, timeout: float = BUSY_TIMEOUT_SECONDS) -> sqlite3.Connection:
+        """Take an idle connection, opening a new one while the pool is not full"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            can_open = self._opened < self.size
+            if can_open:
+                self._opened += 1
+        if can_open:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+        
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError("Timed out waiting for a pooled database connection")
+    
+    def release(self, conn: sqlite3.Connection, discard: bool = False):
+        """Return a connection to the pool, or close it if it is no longer usable"""
+        if not discard:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.put(conn)
+                return
+            except sqlite3.Error:
+                pass
+        
+        with self._lock:
+            self._opened -= 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a with-block"""
+        conn = self.acquire()
+        discard = False
+        try:
+            yield conn
+        except sqlite3.DatabaseError as e:
+            # Lock contention is transient; anything else may have left the connection broken
+            discard = not isinstance(e, sqlite3.OperationalError)
+            raise
+        finally:
+            self.release(conn, discard=discard)
+    
+    def stats(self) -> Dict[str, int]:
+        """Pool utilization counters"""
+        idle = self._idle.qsize()
+        return {
+            "size": self.size,
+            "open": self._opened,
+            "idle": idle,
+            "in_use": self._opened - idle
+        }
+    
+    def close(self):
+        """Close all idle connections"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self.release(conn, discard=True)
+
 
 class Database:
     """SQLite database manager for accessibility reports"""
     
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, pool_size: int = DEFAULT_POOL_SIZE):
         self.db_path = db_path or str(DB_PATH)
+        self.pool = ConnectionPool(self.db_path, size=pool_size)
+        self.search_enabled = False  # Set once the FTS5 index exists
+        self.blobs = BlobStore()
+        self.history = ScoreHistory()
+        self.jobs = JobStore(self.blobs)
+        self._id_lock = threading.Lock()
+        self._next_report_id = 1
+        self._report_id_limit = 0  # Last id of the reserved block
+        # SQLite allows a single writer; serializing writers in-process avoids
+        # spinning on the file lock (readers are not blocked under WAL)
+        self._write_lock = threading.Lock()
         self.init_database()
     
     def get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Enable column access by name
-        return conn
+        """Borrow a pooled database connection (use as a context manager)"""
+        return self.pool.connection()
+    
+    @contextmanager
+    def _read(self):
+        """Cursor on a pooled connection for read-only queries"""
+        with self.pool.connection() as conn:
+            yield conn.cursor()
+    
+    @contextmanager
+    def _write(self):
+        """Cursor on a pooled connection holding the write lock; commits on success"""
+        with self._write_lock, self.pool.connection() as conn:
+            try:
+                yield conn.cursor()
+                conn.commit()
+                self.blobs.commit()
+            except Exception:
+                conn.rollback()
+                self.blobs.rollback()
+                raise
+    
+    def _run_write(self, operation: Callable[[sqlite3.Cursor], Any]) -> Any:
+        """
+        Run a write transaction, retrying with backoff while the database is locked
+        
+        Another process may hold the write lock longer than busy_timeout
+        (e.g. a second server instance); in that case the whole transaction
+        is retried rather than failing the request.
+        """
+        delay = 0.05
+        for attempt in range(WRITE_RETRIES):
+            try:
+                with self._write() as cursor:
+                    return operation(cursor)
+            except sqlite3.OperationalError as e:
+                message = str(e).lower()
+                if attempt == WRITE_RETRIES - 1 or ("locked" not in message and "busy" not in message):
+                    raise
+                time.sleep(delay)
+                delay *= 2
+    
+    def close(self):
+        """Close pooled connections"""
+        self.pool.close()
     
     def init_database(self):
         """Initialize database tables"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
+        with self._write() as cursor:
+            self._create_schema(cursor)
+        self._migrate()
+        print(f"✅ Database initialized at {self.db_path}")
+    
+    def _create_schema(self, cursor: sqlite3.Cursor):
+        """Create tables and indexes"""
         # Create reports table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS reports (
@@ -59,9 +353,389 @@ class Database:
             CREATE INDEX IF NOT EXISTS idx_url ON reports(url)
         """)
         
-        conn.commit()
-        conn.close()
-        print(f"✅ Database initialized at {self.db_path}")
+        # Columns absent from databases created before they existed
+        existing = {row["name"] for row in cursor.execute("PRAGMA table_info(reports)")}
+        for column, declaration in REPORT_ADDED_COLUMNS.items():
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE reports ADD COLUMN {column} {declaration}")
+        
+        # Keyset pagination over the default sort key (see REPORT_ORDER_COLUMNS)
+        cursor.execute("DROP INDEX IF EXISTS idx_scan_date_id")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_scan_date_key ON reports(COALESCE(scan_date, ''), id)
+        """)
+        
+        # Normalized issues, one row per issue in a report's issues_json
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS issues (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                report_id INTEGER NOT NULL REFERENCES reports(id) ON DELETE CASCADE,
+                position INTEGER NOT NULL,
+                type TEXT,
+                severity TEXT,
+                wcag_rule TEXT,
+                wcag_level TEXT,
+                selector TEXT,
+                message TEXT,
+                fingerprint TEXT NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_issues_type ON issues(type, severity, report_id)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_issues_severity ON issues(severity, report_id)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_issues_wcag_rule ON issues(wcag_rule, severity, report_id)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_issues_report ON issues(report_id)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_issues_fingerprint ON issues(fingerprint, report_id)
+        """)
+        
+        # Statistics rollups, maintained in the same transaction as report writes
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS stats_global (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                reports INTEGER NOT NULL DEFAULT 0,
+                score_sum REAL NOT NULL DEFAULT 0,
+                total_issues INTEGER NOT NULL DEFAULT 0,
+                domains INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        cursor.execute("INSERT OR IGNORE INTO stats_global (id) VALUES (1)")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS stats_domain (
+                domain TEXT PRIMARY KEY,
+                reports INTEGER NOT NULL DEFAULT 0,
+                score_sum REAL NOT NULL DEFAULT 0,
+                total_issues INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS stats_daily (
+                day TEXT PRIMARY KEY,
+                reports INTEGER NOT NULL DEFAULT 0,
+                score_sum REAL NOT NULL DEFAULT 0,
+                total_issues INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        
+        # Compressed snapshots / issue payloads and the rule text catalog
+        BlobStore.create_schema(cursor)
+        
+        # Per-URL score time series
+        ScoreHistory.create_schema(cursor)
+        
+        # Background scan jobs
+        JobStore.create_schema(cursor)
+        
+        self.search_enabled = self._create_search_index(cursor)
+    
+    def _create_search_index(self, cursor: sqlite3.Cursor) -> bool:
+        """
+        Create trigram FTS5 indexes over report domain/URL and issue messages
+        
+        Both are external-content tables kept in sync by triggers. Returns
+        False if this SQLite build lacks FTS5 (searches then fall back to LIKE).
+        """
+        try:
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5(
+                    domain, url,
+                    content='reports', content_rowid='id', tokenize='trigram'
+                )
+            """)
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS issues_fts USING fts5(
+                    message,
+                    content='issues', content_rowid='id', tokenize='trigram'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            print(f"⚠️  Full-text search unavailable ({e}); falling back to LIKE queries")
+            return False
+        
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS reports_fts_insert AFTER INSERT ON reports BEGIN
+                INSERT INTO reports_fts (rowid, domain, url) VALUES (new.id, new.domain, new.url);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS reports_fts_delete AFTER DELETE ON reports BEGIN
+                INSERT INTO reports_fts (reports_fts, rowid, domain, url)
+                VALUES ('delete', old.id, old.domain, old.url);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS reports_fts_update AFTER UPDATE OF domain, url ON reports BEGIN
+                INSERT INTO reports_fts (reports_fts, rowid, domain, url)
+                VALUES ('delete', old.id, old.domain, old.url);
+                INSERT INTO reports_fts (rowid, domain, url) VALUES (new.id, new.domain, new.url);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS issues_fts_insert AFTER INSERT ON issues BEGIN
+                INSERT INTO issues_fts (rowid, message) VALUES (new.id, new.message);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS issues_fts_delete AFTER DELETE ON issues BEGIN
+                INSERT INTO issues_fts (issues_fts, rowid, message) VALUES ('delete', old.id, old.message);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS issues_fts_update AFTER UPDATE OF message ON issues BEGIN
+                INSERT INTO issues_fts (issues_fts, rowid, message) VALUES ('delete', old.id, old.message);
+                INSERT INTO issues_fts (rowid, message) VALUES (new.id, new.message);
+            END
+        """)
+        return True
+    
+    def rebuild_search_index(self):
+        """Re-index all reports and issues from their content tables"""
+        if not self.search_enabled:
+            return
+        
+        def rebuild(cursor: sqlite3.Cursor):
+            cursor.execute("INSERT INTO reports_fts (reports_fts) VALUES ('rebuild')")
+            cursor.execute("INSERT INTO issues_fts (issues_fts) VALUES ('rebuild')")
+        
+        self._run_write(rebuild)
+    
+    def _migrate(self):
+        """Bring an existing database up to SCHEMA_VERSION"""
+        with self._read() as cursor:
+            version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        
+        for target, step in enumerate(self._migrations(), start=1):
+            if version < target:
+                step()
+                with self._write() as cursor:
+                    cursor.execute(f"PRAGMA user_version = {target}")
+                version = target
+    
+    def _migrations(self) -> List[Callable[[], None]]:
+        """Ordered migration steps; step N upgrades user_version N-1 to N"""
+        return [
+            self._backfill_issues,
+            self.rebuild_rollups,
+            self.rebuild_search_index,
+            self._backfill_summaries,
+            self._move_payloads_to_blobs,
+            self.rebuild_score_history,
+        ]
+    
+    def _backfill_issues(self):
+        """Populate the issues table from issues_json, one batch of reports per transaction"""
+        last_id = 0
+        migrated = 0
+        while True:
+            with self._read() as cursor:
+                cursor.execute("""
+                    SELECT id, issues_json FROM reports
+                    WHERE id > ?
+                    ORDER BY id
+                    LIMIT ?
+                """, (last_id, MIGRATION_BATCH_SIZE))
+                rows = cursor.fetchall()
+            if not rows:
+                break
+            
+            def copy_batch(cursor: sqlite3.Cursor):
+                # Re-running an interrupted backfill replaces rather than duplicates
+                cursor.execute(
+                    "DELETE FROM issues WHERE report_id BETWEEN ? AND ?",
+                    (rows[0]["id"], rows[-1]["id"])
+                )
+                parsed = []
+                for row in rows:
+                    try:
+                        parsed.append((row["id"], json.loads(row["issues_json"] or "[]")))
+                    except ValueError:
+                        pass
+                self._insert_issues(cursor, parsed)
+            
+            self._run_write(copy_batch)
+            migrated += len(rows)
+            last_id = rows[-1]["id"]
+        
+        if migrated:
+            print(f"✅ Backfilled issues for {migrated} reports")
+    
+    def _backfill_summaries(self):
+        """Compute top_issues for existing reports from the issues table, in batches"""
+        last_id = 0
+        while True:
+            with self._read() as cursor:
+                cursor.execute("""
+                    SELECT id FROM reports
+                    WHERE id > ? AND top_issues IS NULL
+                    ORDER BY id
+                    LIMIT ?
+                """, (last_id, MIGRATION_BATCH_SIZE))
+                ids = [row["id"] for row in cursor.fetchall()]
+                if not ids:
+                    break
+                # Ties keep first-seen order, matching summarize_issue_types
+                cursor.execute("""
+                    SELECT report_id, COALESCE(type, 'unknown') AS type, COUNT(*) AS count
+                    FROM issues
+                    WHERE report_id BETWEEN ? AND ?
+                    GROUP BY report_id, COALESCE(type, 'unknown')
+                    ORDER BY report_id, count DESC, MIN(position)
+                """, (ids[0], ids[-1]))
+                counts = cursor.fetchall()
+            
+            top = {report_id: [] for report_id in ids}
+            for row in counts:
+                entries = top.get(row["report_id"])
+                if entries is not None and len(entries) < TOP_ISSUE_TYPES:
+                    entries.append({"type": row["type"], "count": row["count"]})
+            
+            self._run_write(lambda cursor: cursor.executemany(
+                "UPDATE reports SET top_issues = ? WHERE id = ?",
+                [(json.dumps(entries), report_id) for report_id, entries in top.items()]
+            ))
+            last_id = ids[-1]
+    
+    def _move_payloads_to_blobs(self):
+        """Move inline issues_json / html_content into the blob store, in batches"""
+        moved = 0
+        while True:
+            with self._read() as cursor:
+                cursor.execute("""
+                    SELECT id, issues_json, html_content FROM reports
+                    WHERE issues_blob IS NULL
+                    ORDER BY id
+                    LIMIT ?
+                """, (MIGRATION_BATCH_SIZE,))
+                rows = cursor.fetchall()
+            if not rows:
+                break
+            
+            def move_batch(cursor: sqlite3.Cursor):
+                for row in rows:
+                    try:
+                        issues = json.loads(row["issues_json"] or "[]")
+                    except ValueError:
+                        issues = []
+                    cursor.execute("""
+                        UPDATE reports
+                        SET issues_blob = ?, html_blob = ?, issues_json = '', html_content = NULL
+                        WHERE id = ?
+                    """, (
+                        self.blobs.put_issues(cursor, issues),
+                        self.blobs.put_text(cursor, row["html_content"]),
+                        row["id"]
+                    ))
+            
+            self._run_write(move_batch)
+            moved += len(rows)
+        
+        if moved:
+            print(f"✅ Moved payloads of {moved} reports to the blob store")
+    
+    def _apply_rollups(
+        self,
+        cursor: sqlite3.Cursor,
+        domain: str,
+        day: str,
+        score: float,
+        total_issues: int,
+        sign: int
+    ):
+        """
+        Add (sign=1) or remove (sign=-1) one report from the statistics rollups
+        
+        Must run inside the transaction that inserts or deletes the report.
+        """
+        for table, key_column, key in (("stats_domain", "domain", domain), ("stats_daily", "day", day)):
+            cursor.execute(f"""
+                INSERT INTO {table} ({key_column}, reports, score_sum, total_issues)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT({key_column}) DO UPDATE SET
+                    reports = reports + excluded.reports,
+                    score_sum = score_sum + excluded.score_sum,
+                    total_issues = total_issues + excluded.total_issues
+            """, (key, sign, sign * score, sign * total_issues))
+        
+        remaining = cursor.execute(
+            "SELECT reports FROM stats_domain WHERE domain = ?", (domain,)
+        ).fetchone()["reports"]
+        domain_delta = 1 if sign > 0 and remaining == 1 else -1 if sign < 0 and remaining <= 0 else 0
+        cursor.execute("DELETE FROM stats_domain WHERE reports <= 0 AND domain = ?", (domain,))
+        cursor.execute("DELETE FROM stats_daily WHERE reports <= 0 AND day = ?", (day,))
+        
+        cursor.execute("""
+            UPDATE stats_global SET
+                reports = reports + ?,
+                score_sum = score_sum + ?,
+                total_issues = total_issues + ?,
+                domains = domains + ?
+            WHERE id = 1
+        """, (sign, sign * score, sign * total_issues, domain_delta))
+    
+    def rebuild_rollups(self) -> Dict[str, Any]:
+        """
+        Recompute every statistics rollup from the reports table
+        
+        Repairs drift (e.g. rows edited outside this class) in one transaction.
+        
+        Returns:
+            The rebuilt global statistics
+        """
+        def rebuild(cursor: sqlite3.Cursor):
+            cursor.execute("DELETE FROM stats_domain")
+            cursor.execute("""
+                INSERT INTO stats_domain (domain, reports, score_sum, total_issues)
+                SELECT COALESCE(domain, ''), COUNT(*), SUM(score), SUM(total_issues)
+                FROM reports
+                GROUP BY COALESCE(domain, '')
+            """)
+            cursor.execute("DELETE FROM stats_daily")
+            cursor.execute("""
+                INSERT INTO stats_daily (day, reports, score_sum, total_issues)
+                SELECT date(scan_date), COUNT(*), SUM(score), SUM(total_issues)
+                FROM reports
+                GROUP BY date(scan_date)
+            """)
+            cursor.execute("""
+                INSERT OR REPLACE INTO stats_global (id, reports, score_sum, total_issues, domains)
+                SELECT 1, COUNT(*), COALESCE(SUM(score), 0), COALESCE(SUM(total_issues), 0),
+                       (SELECT COUNT(*) FROM stats_domain)
+                FROM reports
+            """)
+        
+        self._run_write(rebuild)
+        return self.get_statistics()
+    
+    def _insert_issues(self, cursor: sqlite3.Cursor, reports: List[Tuple[int, List[Dict[str, Any]]]]):
+        """Write the normalized issue rows for (report_id, issues) pairs in one executemany"""
+        cursor.executemany("""
+            INSERT INTO issues (
+                report_id, position, type, severity, wcag_rule,
+                wcag_level, selector, message, fingerprint
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (
+                report_id,
+                position,
+                issue.get("type"),
+                issue.get("severity"),
+                issue.get("wcag_rule"),
+                issue.get("wcag_level"),
+                issue.get("selector"),
+                issue.get("message"),
+                issue_fingerprint(issue)
+            )
+            for report_id, issues in reports
+            for position, issue in enumerate(issues)
+            if isinstance(issue, dict)
+        ])
     
     def save_report(
         self,
@@ -71,17 +745,88 @@ class Database:
         total_issues: int,
         issues: List[Dict[str, Any]],
         scan_duration: Optional[float] = None,
-        html_content: Optional[str] = None
+        html_content: Optional[str] = None,
+        css_content: Optional[str] = None
     ) -> int:
         """
         Save a scan report to the database
         
+        The issue list and the full HTML/CSS snapshots are stored as
+        compressed, deduplicated blobs.
+        
         Returns:
             Report ID
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        report = self.prepare_report(
+            url, score, wcag_level, total_issues, issues,
+            scan_duration=scan_duration,
+            html_content=html_content,
+            css_content=css_content
+        )
+        self._run_write(lambda cursor: self._write_reports(cursor, [report]))
+        
+        print(f"✅ Report saved to database (ID: {report['id']})")
+        return report["id"]
+    
+    def _reserve_report_ids(self, cursor: sqlite3.Cursor) -> int:
+        """
+        Advance the reports AUTOINCREMENT sequence by a block of ids
+        
+        The sequence row lives in the database file, so every process (and
+        any plain INSERT relying on AUTOINCREMENT) draws from the same
+        counter. The UPDATE runs first so the transaction holds the write lock
+        before reading.
+        
+        Returns:
+            The last id of the reserved block
+        """
+        cursor.execute("""
+            UPDATE sqlite_sequence
+            SET seq = MAX(seq, (SELECT COALESCE(MAX(id), 0) FROM reports)) + ?
+            WHERE name = 'reports'
+        """, (REPORT_ID_BLOCK_SIZE,))
+        if cursor.rowcount == 0:
+            cursor.execute("""
+                INSERT INTO sqlite_sequence (name, seq)
+                SELECT 'reports', COALESCE(MAX(id), 0) + ? FROM reports
+            """, (REPORT_ID_BLOCK_SIZE,))
+        return cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'reports'").fetchone()[0]
+    
+    def has_reserved_report_id(self) -> bool:
+        """Whether the next prepare_report can assign an id without a database write"""
+        with self._id_lock:
+            return self._next_report_id <= self._report_id_limit
+    
+    def _allocate_report_id(self) -> int:
+        with self._id_lock:
+            if self._next_report_id > self._report_id_limit:
+                last = self._run_write(self._reserve_report_ids)
+                self._next_report_id = last - REPORT_ID_BLOCK_SIZE + 1
+                self._report_id_limit = last
+            report_id = self._next_report_id
+            self._next_report_id += 1
+            return report_id
+    
+    def prepare_report(
+        self,
+        url: str,
+        score: float,
+        wcag_level: str,
+        total_issues: int,
+        issues: List[Dict[str, Any]],
+        scan_duration: Optional[float] = None,
+        html_content: Optional[str] = None,
+        css_content: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Assign an id and compute the derived fields of a report
+        
+        Ids come from a block reserved in the database; only the first report
+        of each block writes (see _reserve_report_ids).
         
+        Returns:
+            Prepared report for _write_reports / ReportWriter.submit
+        """
         # Extract domain from URL
         from urllib.parse import urlparse
         parsed = urlparse(url)
@@ -95,51 +840,187 @@ class Database:
             "low": len([i for i in issues if i.get("severity") == "low"])
         }
         
-        # Convert issues and severity breakdown to JSON
-        issues_json = json.dumps(issues)
-        severity_json = json.dumps(severity_breakdown)
-        
-        # Insert report
-        cursor.execute("""
+        return {
+            "id": self._allocate_report_id(),
+            "url": url,
+            "domain": domain,
+            # Same format as CURRENT_TIMESTAMP; records scan time, not write time
+            "scan_date": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+            "score": score,
+            "wcag_level": wcag_level,
+            "total_issues": total_issues,
+            "issues": issues,
+            "severity": severity_breakdown,
+            "severity_json": json.dumps(severity_breakdown),
+            "top_issues_json": json.dumps(summarize_issue_types(issues)),
+            "scan_duration": scan_duration,
+            "html_content": html_content,
+            "css_content": css_content
+        }
+    
+    def _write_reports(self, cursor: sqlite3.Cursor, reports: List[Dict[str, Any]]):
+        """Insert prepared reports in the current transaction, one executemany per table"""
+        cursor.executemany("""
             INSERT INTO reports (
-                url, domain, score, wcag_level, total_issues,
-                issues_json, severity_breakdown, scan_duration, html_content
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            url,
-            domain,
-            score,
-            wcag_level,
-            total_issues,
-            issues_json,
-            severity_json,
-            scan_duration,
-            html_content[:10000] if html_content else None  # Limit HTML size
-        ))
-        
-        report_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        print(f"✅ Report saved to database (ID: {report_id})")
-        return report_id
+                id, url, domain, scan_date, score, wcag_level, total_issues, issues_json,
+                severity_breakdown, top_issues, scan_duration,
+                issues_blob, html_blob, css_blob
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, '', ?, ?, ?, ?, ?, ?)
+        """, [
+            (
+                report["id"],
+                report["url"],
+                report["domain"],
+                report["scan_date"],
+                report["score"],
+                report["wcag_level"],
+                report["total_issues"],
+                report["severity_json"],
+                report["top_issues_json"],
+                report["scan_duration"],
+                self.blobs.put_issues(cursor, report["issues"]),
+                self.blobs.put_text(cursor, report["html_content"]),
+                self.blobs.put_text(cursor, report["css_content"])
+            )
+            for report in reports
+        ])
+        self._insert_issues(cursor, [(report["id"], report["issues"]) for report in reports])
+        
+        for report in reports:
+            self._apply_rollups(
+                cursor, report["domain"], report["scan_date"][:10],
+                report["score"], report["total_issues"], 1
+            )
+        
+        self.history.record(cursor, [self._score_point(report) for report in reports])
+        if self.history.prune_due():
+            self.history.prune(cursor)
     
-    def get_report(self, report_id: int) -> Optional[Dict[str, Any]]:
-        """Get a single report by ID"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def _score_point(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        """Time-series point for a prepared (or stored) report"""
+        point = {
+            "report_id": report["id"],
+            "url": report["url"],
+            "ts": report["scan_date"],
+            "score": report["score"]
+        }
+        for severity in SEVERITIES:
+            point[severity] = report["severity"].get(severity, 0)
+        return point
+    
+    def rebuild_score_history(self):
+        """Recompute the score time series from the reports table and apply retention"""
+        def rebuild(cursor: sqlite3.Cursor):
+            self.history.rebuild(cursor)
+            self.history.prune(cursor)
         
-        cursor.execute("""
-            SELECT * FROM reports WHERE id = ?
-        """, (report_id,))
+        self._run_write(rebuild)
+    
+    def get_score_trend(
+        self,
+        url: str,
+        resolution: str = "auto",
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Score over time for one URL, from the time-series tables only
+        
+        Args:
+            url: Exact report URL
+            resolution: raw, hour, day, or auto
+            since: Inclusive lower bound, 'YYYY-MM-DD[ HH:MM:SS]'
+            until: Exclusive upper bound, same format
+        
+        Returns:
+            Dict with the resolution used, the points and whether older points
+            were left out (see ScoreHistory.trend)
+        """
+        with self._read() as cursor:
+            return self.history.trend(cursor, url, resolution=resolution, since=since, until=until)
+    
+    def create_job(self, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Persist a new queued scan job"""
+        return self._run_write(lambda cursor: self.jobs.create(cursor, kind, params))
+    
+    def update_job(
+        self,
+        job_id: str,
+        result: Optional[Dict[str, Any]] = None,
+        **fields
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Update a scan job's status, stage or progress
         
-        row = cursor.fetchone()
-        conn.close()
+        Args:
+            job_id: Job id
+            result: Final result to store with the job
+            **fields: Column values (see job_store.JOB_UPDATE_COLUMNS)
+        
+        Returns:
+            The updated job, or None if it does not exist
+        """
+        def update(cursor: sqlite3.Cursor) -> Optional[Dict[str, Any]]:
+            job = self.jobs.update(cursor, job_id, fields, result=result)
+            if job and job["status"] in FINISHED_STATUSES and self.jobs.prune_due():
+                self.jobs.prune(cursor)
+            return job
+        
+        return self._run_write(update)
+    
+    def get_job(self, job_id: str, include_result: bool = False) -> Optional[Dict[str, Any]]:
+        """Get a scan job, optionally with its result"""
+        with self._read() as cursor:
+            return self.jobs.get(cursor, job_id, include_result=include_result)
+    
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent scan jobs, optionally filtered by status"""
+        with self._read() as cursor:
+            return self.jobs.list(cursor, status=status, limit=limit)
+    
+    def recover_jobs(self) -> List[str]:
+        """Re-queue jobs interrupted by a restart; returns queued job ids, oldest first"""
+        return self._run_write(self.jobs.recover)
+    
+    def get_report(self, report_id: int) -> Optional[Dict[str, Any]]:
+        """Get a single report by ID"""
+        with self._read() as cursor:
+            cursor.execute("""
+                SELECT * FROM reports WHERE id = ?
+            """, (report_id,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            issues = self.blobs.get_issues(cursor, row["issues_blob"]) if row["issues_blob"] else None
         
-        if not row:
-            return None
+        return self._row_to_dict(row, issues)
+    
+    def get_report_snapshot(self, report_id: int) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Get the stored HTML/CSS a report was produced from, for re-analysis
         
-        return self._row_to_dict(row)
+        Returns:
+            Dict with "html" and "css" (None if not stored), or None if the report does not exist
+        """
+        with self._read() as cursor:
+            row = cursor.execute("""
+                SELECT html_blob, css_blob, html_content FROM reports WHERE id = ?
+            """, (report_id,)).fetchone()
+            if not row:
+                return None
+            return {
+                "html": self.blobs.get_text(cursor, row["html_blob"]) or row["html_content"],
+                "css": self.blobs.get_text(cursor, row["css_blob"])
+            }
+    
+    def get_storage_statistics(self) -> Dict[str, Any]:
+        """Blob store usage and database file size"""
+        with self._read() as cursor:
+            stats = self.blobs.stats(cursor)
+            page_count = cursor.execute("PRAGMA page_count").fetchone()[0]
+            page_size = cursor.execute("PRAGMA page_size").fetchone()[0]
+        stats["database_bytes"] = page_count * page_size
+        return stats
     
     def get_all_reports(
         self,
@@ -154,128 +1035,411 @@ class Database:
         
         Args:
             limit: Maximum number of reports to return
-            offset: Number of reports to skip
+            offset: Number of reports to skip (prefer get_reports_page for deep paging)
             domain: Filter by domain
             order_by: Column to order by
             order_dir: Order direction (ASC/DESC)
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        return self.get_reports_page(
+            limit=limit,
+            domain=domain,
+            order_by=order_by,
+            order_dir=order_dir,
+            offset=offset
+        )["reports"]
+    
+    def get_reports_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        domain: Optional[str] = None,
+        order_by: str = "scan_date",
+        order_dir: str = "DESC",
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Get one page of report summaries using keyset pagination
+        
+        Pages continue from the (sort key, id) of the previous page's last
+        row, so every page costs the same however deep it is; NULL sort
+        values page as empty strings. Listings read only summary columns,
+        never the issues blob.
+        
+        Args:
+            limit: Maximum number of reports to return
+            cursor: next_cursor from the previous page (omit for the first page)
+            domain: Filter by domain
+            order_by: Column to order by
+            order_dir: Order direction (ASC/DESC)
+            offset: Legacy offset paging, ignored when a cursor is given
         
-        query = "SELECT * FROM reports"
+        Returns:
+            Dict with "reports" and "next_cursor" (None on the last page)
+        """
+        clauses = []
         params = []
         
         if domain:
-            query += " WHERE domain LIKE ?"
-            params.append(f"%{domain}%")
+            if self.search_enabled and len(domain) >= FTS_MIN_QUERY_LENGTH:
+                clauses.append("id IN (SELECT rowid FROM reports_fts WHERE reports_fts MATCH ?)")
+                params.append(fts_phrase(domain, "domain"))
+            else:
+                clauses.append("domain LIKE ?")
+                params.append(f"%{domain}%")
         
         # Validate order_by to prevent SQL injection
-        valid_columns = ["scan_date", "score", "total_issues", "domain", "created_at"]
-        if order_by not in valid_columns:
+        if order_by not in REPORT_ORDER_COLUMNS:
             order_by = "scan_date"
         
         order_dir = "DESC" if order_dir.upper() == "DESC" else "ASC"
+        sort_key = REPORT_ORDER_COLUMNS[order_by]
+        
+        if cursor:
+            value, last_id = decode_page_cursor(cursor)
+            comparison = "<" if order_dir == "DESC" else ">"
+            # The redundant first bound lets SQLite seek an expression index,
+            # which it does not do for a row-value comparison on an expression
+            clauses.append(f"{sort_key} {comparison}= ? AND ({sort_key}, id) {comparison} (?, ?)")
+            params.extend([value, value, last_id])
+            offset = 0
         
-        query += f" ORDER BY {order_by} {order_dir} LIMIT ? OFFSET ?"
+        query = f"SELECT {REPORT_LISTING_COLUMNS}, {sort_key} AS sort_key FROM reports"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += f" ORDER BY {sort_key} {order_dir}, id {order_dir} LIMIT ? OFFSET ?"
         params.extend([limit, offset])
         
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
+        with self._read() as db_cursor:
+            db_cursor.execute(query, params)
+            rows = [dict(row) for row in db_cursor.fetchall()]
+        
+        next_cursor = None
+        if rows and len(rows) == limit:
+            next_cursor = encode_page_cursor(rows[-1]["sort_key"], rows[-1]["id"])
+        for row in rows:
+            del row["sort_key"]
         
-        return [self._row_to_dict(row) for row in rows]
+        return {
+            "reports": [self._summary_to_dict(row) for row in rows],
+            "next_cursor": next_cursor
+        }
     
-    def get_reports_by_url(self, url: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get all reports for a specific URL"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def search_reports(self, query: str, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Substring search over report domain, URL and issue messages
         
-        cursor.execute("""
-            SELECT * FROM reports 
-            WHERE url = ? 
-            ORDER BY scan_date DESC 
-            LIMIT ?
-        """, (url, limit))
+        Args:
+            query: Text to find (case-insensitive)
+            limit: Maximum number of reports to return
+            offset: Number of reports to skip
         
-        rows = cursor.fetchall()
-        conn.close()
+        Returns:
+            Matching reports, newest first
+        """
+        query = (query or "").strip()
+        if not query:
+            return []
+        
+        if self.search_enabled and len(query) >= FTS_MIN_QUERY_LENGTH:
+            phrase = fts_phrase(query)
+            matches = """
+                SELECT rowid FROM reports_fts WHERE reports_fts MATCH ?
+                UNION
+                SELECT i.report_id FROM issues_fts f
+                JOIN issues i ON i.id = f.rowid
+                WHERE issues_fts MATCH ?
+            """
+            params = [phrase, phrase]
+        else:
+            pattern = f"%{query}%"
+            matches = """
+                SELECT id FROM reports WHERE domain LIKE ? OR url LIKE ?
+                UNION
+                SELECT report_id FROM issues WHERE message LIKE ?
+            """
+            params = [pattern, pattern, pattern]
+        
+        with self._read() as cursor:
+            cursor.execute(f"""
+                SELECT {REPORT_LISTING_COLUMNS} FROM reports
+                WHERE id IN ({matches})
+                ORDER BY scan_date DESC, id DESC
+                LIMIT ? OFFSET ?
+            """, params + [limit, offset])
+            rows = cursor.fetchall()
+        
+        return [self._summary_to_dict(row) for row in rows]
+    
+    def get_reports_by_url(self, url: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get all reports for a specific URL"""
+        with self._read() as cursor:
+            cursor.execute(f"""
+                SELECT {REPORT_LISTING_COLUMNS} FROM reports 
+                WHERE url = ? 
+                ORDER BY scan_date DESC, id DESC 
+                LIMIT ?
+            """, (url, limit))
+            rows = cursor.fetchall()
         
-        return [self._row_to_dict(row) for row in rows]
+        return [self._summary_to_dict(row) for row in rows]
     
     def get_reports_by_domain(self, domain: str, limit: int = 50) -> List[Dict[str, Any]]:
         """Get all reports for a specific domain"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM reports 
-            WHERE domain = ? 
-            ORDER BY scan_date DESC 
-            LIMIT ?
-        """, (domain, limit))
-        
-        rows = cursor.fetchall()
-        conn.close()
+        with self._read() as cursor:
+            cursor.execute(f"""
+                SELECT {REPORT_LISTING_COLUMNS} FROM reports 
+                WHERE domain = ? 
+                ORDER BY scan_date DESC, id DESC 
+                LIMIT ?
+            """, (domain, limit))
+            rows = cursor.fetchall()
         
-        return [self._row_to_dict(row) for row in rows]
+        return [self._summary_to_dict(row) for row in rows]
     
     def delete_report(self, report_id: int) -> bool:
         """Delete a report by ID"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        def delete(cursor: sqlite3.Cursor) -> bool:
+            row = cursor.execute("""
+                SELECT url, COALESCE(domain, '') AS domain, scan_date, date(scan_date) AS day,
+                       score, total_issues, severity_breakdown, issues_blob, html_blob, css_blob
+                FROM reports WHERE id = ?
+            """, (report_id,)).fetchone()
+            if not row:
+                return False
+            
+            cursor.execute("DELETE FROM issues WHERE report_id = ?", (report_id,))
+            cursor.execute("DELETE FROM reports WHERE id = ?", (report_id,))
+            self.blobs.release(cursor, (row["issues_blob"], row["html_blob"], row["css_blob"]))
+            self._apply_rollups(cursor, row["domain"], row["day"], row["score"], row["total_issues"], -1)
+            self.history.remove(cursor, self._score_point({
+                "id": report_id,
+                "url": row["url"],
+                "scan_date": row["scan_date"],
+                "score": row["score"],
+                "severity": json.loads(row["severity_breakdown"] or "{}")
+            }))
+            return True
         
-        cursor.execute("DELETE FROM reports WHERE id = ?", (report_id,))
-        deleted = cursor.rowcount > 0
+        return self._run_write(delete)
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get database statistics (read from the rollups, independent of table size)"""
+        with self._read() as cursor:
+            totals = cursor.execute("SELECT * FROM stats_global WHERE id = 1").fetchone()
+            
+            # Recent scans (last 24 hours): a range over idx_scan_date, bounded by one day of scans
+            cursor.execute("""
+                SELECT COUNT(*) as recent FROM reports 
+                WHERE scan_date > datetime('now', '-1 day')
+            """)
+            recent = cursor.fetchone()["recent"]
         
-        conn.commit()
-        conn.close()
+        total = totals["reports"] if totals else 0
+        avg_score = totals["score_sum"] / total if total else 0
         
-        return deleted
+        return {
+            "total_reports": total,
+            "average_score": round(avg_score, 2),
+            "total_issues": totals["total_issues"] if totals else 0,
+            "unique_domains": totals["domains"] if totals else 0,
+            "recent_scans_24h": recent
+        }
     
-    def get_statistics(self) -> Dict[str, Any]:
-        """Get database statistics"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def get_domain_statistics(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Per-domain report counts and average scores, most scanned first"""
+        with self._read() as cursor:
+            cursor.execute("""
+                SELECT domain, reports, total_issues,
+                       ROUND(score_sum / reports, 2) AS average_score
+                FROM stats_domain
+                ORDER BY reports DESC, domain
+                LIMIT ?
+            """, (limit,))
+            rows = cursor.fetchall()
         
-        # Total reports
-        cursor.execute("SELECT COUNT(*) as total FROM reports")
-        total = cursor.fetchone()["total"]
+        return [dict(row) for row in rows]
+    
+    def get_daily_statistics(self, days: int = 30) -> List[Dict[str, Any]]:
+        """Per-day report counts and average scores for the last ``days`` days"""
+        with self._read() as cursor:
+            cursor.execute("""
+                SELECT day, reports, total_issues,
+                       ROUND(score_sum / reports, 2) AS average_score
+                FROM stats_daily
+                WHERE day > date('now', ?)
+                ORDER BY day
+            """, (f"-{int(days)} days",))
+            rows = cursor.fetchall()
         
-        # Average score
-        cursor.execute("SELECT AVG(score) as avg_score FROM reports")
-        avg_score = cursor.fetchone()["avg_score"] or 0
+        return [dict(row) for row in rows]
+    
+    def _issue_filters(
+        self,
+        filters: Dict[str, Optional[str]],
+        domain: Optional[str] = None
+    ) -> Tuple[str, List[Any]]:
+        """Build a WHERE clause over issues (aliased i) joined to reports (r)"""
+        clauses = []
+        params = []
+        for column in ISSUE_FILTER_COLUMNS:
+            value = filters.get(column)
+            if value:
+                clauses.append(f"i.{column} = ?")
+                params.append(value)
+        if domain:
+            clauses.append("r.domain = ?")
+            params.append(domain)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+    
+    def find_issues(
+        self,
+        issue_type: Optional[str] = None,
+        severity: Optional[str] = None,
+        wcag_rule: Optional[str] = None,
+        wcag_level: Optional[str] = None,
+        domain: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Search issues across all reports
         
-        # Total issues
-        cursor.execute("SELECT SUM(total_issues) as total_issues FROM reports")
-        total_issues = cursor.fetchone()["total_issues"] or 0
+        Args:
+            issue_type: Issue type (e.g. "missing_lang")
+            severity: critical, high, medium or low
+            wcag_rule: WCAG success criterion (e.g. "1.4.3")
+            wcag_level: A, AA or AAA
+            domain: Exact report domain
+            limit: Maximum number of issues to return
+            offset: Number of issues to skip
         
-        # Unique domains
-        cursor.execute("SELECT COUNT(DISTINCT domain) as unique_domains FROM reports")
-        unique_domains = cursor.fetchone()["unique_domains"]
+        Returns:
+            Issue rows with the URL, domain and scan date of their report
+        """
+        where, params = self._issue_filters({
+            "type": issue_type,
+            "severity": severity,
+            "wcag_rule": wcag_rule,
+            "wcag_level": wcag_level
+        }, domain)
         
-        # Recent scans (last 24 hours)
-        cursor.execute("""
-            SELECT COUNT(*) as recent FROM reports 
-            WHERE scan_date > datetime('now', '-1 day')
-        """)
-        recent = cursor.fetchone()["recent"]
+        with self._read() as cursor:
+            cursor.execute(f"""
+                SELECT i.report_id, i.type, i.severity, i.wcag_rule, i.wcag_level,
+                       i.selector, i.message, i.fingerprint,
+                       r.url, r.domain, r.scan_date
+                FROM issues i
+                JOIN reports r ON r.id = i.report_id
+                {where}
+                ORDER BY i.report_id DESC, i.position
+                LIMIT ? OFFSET ?
+            """, params + [limit, offset])
+            rows = cursor.fetchall()
         
-        conn.close()
+        return [dict(row) for row in rows]
+    
+    def get_reports_with_issue(
+        self,
+        issue_type: Optional[str] = None,
+        wcag_rule: Optional[str] = None,
+        severity: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Reports containing at least one matching issue (e.g. which pages have missing_lang)
         
-        return {
-            "total_reports": total,
-            "average_score": round(avg_score, 2),
-            "total_issues": total_issues,
-            "unique_domains": unique_domains,
-            "recent_scans_24h": recent
-        }
+        Returns:
+            One row per report with its URL, domain, scan date, score and match count
+        """
+        where, params = self._issue_filters({
+            "type": issue_type,
+            "wcag_rule": wcag_rule,
+            "severity": severity
+        })
+        
+        with self._read() as cursor:
+            cursor.execute(f"""
+                SELECT r.id, r.url, r.domain, r.scan_date, r.score,
+                       COUNT(*) AS matching_issues
+                FROM issues i
+                JOIN reports r ON r.id = i.report_id
+                {where}
+                GROUP BY r.id
+                ORDER BY r.scan_date DESC, r.id DESC
+                LIMIT ?
+            """, params + [limit])
+            rows = cursor.fetchall()
+        
+        return [dict(row) for row in rows]
     
-    def _row_to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
-        """Convert database row to dictionary"""
+    def count_issues(
+        self,
+        group_by: str = "type",
+        issue_type: Optional[str] = None,
+        severity: Optional[str] = None,
+        wcag_rule: Optional[str] = None,
+        domain: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Aggregate issue counts (e.g. 1.4.3 failures per domain)
+        
+        Args:
+            group_by: type, severity, wcag_rule, wcag_level, domain or url
+        
+        Returns:
+            Rows of {group_by value, issues, reports}, most frequent first
+        """
+        if group_by not in ISSUE_GROUP_COLUMNS:
+            raise ValueError(f"group_by must be one of: {', '.join(ISSUE_GROUP_COLUMNS)}")
+        column = ISSUE_GROUP_COLUMNS[group_by]
+        where, params = self._issue_filters({
+            "type": issue_type,
+            "severity": severity,
+            "wcag_rule": wcag_rule
+        }, domain)
+        
+        with self._read() as cursor:
+            cursor.execute(f"""
+                SELECT {column} AS {group_by},
+                       COUNT(*) AS issues,
+                       COUNT(DISTINCT i.report_id) AS reports
+                FROM issues i
+                JOIN reports r ON r.id = i.report_id
+                {where}
+                GROUP BY {column}
+                ORDER BY issues DESC
+                LIMIT ?
+            """, params + [limit])
+            rows = cursor.fetchall()
+        
+        return [dict(row) for row in rows]
+    
+    def get_issue_history(self, fingerprint: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Reports in which the same issue (by fingerprint) was found, newest first"""
+        with self._read() as cursor:
+            cursor.execute("""
+                SELECT r.id, r.url, r.domain, r.scan_date, r.score
+                FROM issues i
+                JOIN reports r ON r.id = i.report_id
+                WHERE i.fingerprint = ?
+                GROUP BY r.id
+                ORDER BY r.scan_date DESC, r.id DESC
+                LIMIT ?
+            """, (fingerprint, limit))
+            rows = cursor.fetchall()
+        
+        return [dict(row) for row in rows]
+    
+    def _row_to_dict(self, row: sqlite3.Row, issues: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Convert database row to dictionary (issues as loaded from the blob store, if any)"""
         report = dict(row)
         
         # Parse JSON fields
-        if report.get("issues_json"):
+        if issues is not None:
+            report["issues"] = issues
+        elif report.get("issues_json"):
             report["issues"] = json.loads(report["issues_json"])
         else:
             report["issues"] = []
@@ -289,25 +1453,400 @@ class Database:
         if report.get("scan_date"):
             report["date"] = report["scan_date"]
         
-        # Calculate top issues
-        issues = report.get("issues", [])
-        issue_counts = {}
-        for issue in issues:
-            issue_type = issue.get("type", "unknown")
-            issue_counts[issue_type] = issue_counts.get(issue_type, 0) + 1
-        
-        report["topIssues"] = [
-            {"type": issue_type, "count": count}
-            for issue_type, count in sorted(issue_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-        ]
+        # Top issues are stored at write time; older rows fall back to counting
+        top_issues = report.pop("top_issues", None)
+        report["topIssues"] = json.loads(top_issues) if top_issues else summarize_issue_types(report["issues"])
         
         # Remove JSON fields (already parsed)
         report.pop("issues_json", None)
         report.pop("html_content", None)  # Don't send HTML to frontend
+        for column in ("issues_blob", "html_blob", "css_blob"):
+            report.pop(column, None)
+        
+        return report
+    
+    def _summary_to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a listing row (REPORT_LISTING_COLUMNS) to dictionary"""
+        report = dict(row)
+        
+        if report.get("severity_breakdown"):
+            report["severity_breakdown"] = json.loads(report["severity_breakdown"])
+        else:
+            report["severity_breakdown"] = {"critical": 0, "high": 0, "medium": 0, "low": 0}
+        
+        if report.get("scan_date"):
+            report["date"] = report["scan_date"]
+        
+        top_issues = report.pop("top_issues", None)
+        report["topIssues"] = json.loads(top_issues) if top_issues else []
         
         return report
 
 
+class ReportWriteFailed(Exception):
+    """A report id was handed out but its write-behind insert failed"""
+    
+    def __init__(self, report_id: int, error: str):
+        super().__init__(f"Report {report_id} could not be saved: {error}")
+        self.report_id = report_id
+
+
+class ReportWriter:
+    """
+    Write-behind queue that persists reports in batched transactions
+    
+    Reports get their id immediately from submit(); a background thread
+    groups queued reports into one transaction per batch, flushing when a
+    batch reaches max_batch_size or its oldest report has waited
+    max_latency seconds. submit() blocks while the queue is full
+    (backpressure), and close() flushes everything still queued.
+    
+    Reports whose write fails are remembered (see failure()) so a read of
+    the returned id can report the failure instead of a missing report.
+    """
+    
+    _STOP = object()
+    
+    def __init__(
+        self,
+        database: Database,
+        max_batch_size: int = WRITE_BATCH_SIZE,
+        max_latency: float = WRITE_MAX_LATENCY_SECONDS,
+        max_queue_size: int = WRITE_QUEUE_SIZE
+    ):
+        self.database = database
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_latency = max_latency
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue_size)
+        self._pending = set()
+        self._pending_changed = threading.Condition()
+        self._failed: "OrderedDict[int, str]" = OrderedDict()
+        # Guards _closed and counts submits between that check and their
+        # enqueue, so close() only puts _STOP after every accepted report
+        self._submit_state = threading.Condition()
+        self._submitting = 0
+        self._closed = False
+        self.batches_written = 0
+        self.reports_written = 0
+        self.reports_failed = 0
+        self._thread = threading.Thread(target=self._run, name="report-writer", daemon=True)
+        self._thread.start()
+    
+    def _begin_submit(self) -> bool:
+        with self._submit_state:
+            if self._closed:
+                return False
+            self._submitting += 1
+            return True
+    
+    def _end_submit(self):
+        with self._submit_state:
+            self._submitting -= 1
+            self._submit_state.notify_all()
+    
+    def try_submit(self, report: Dict[str, Any]) -> bool:
+        """Queue a prepared report without blocking; False if the queue is full or closed"""
+        if not self._begin_submit():
+            return False
+        try:
+            with self._pending_changed:
+                self._pending.add(report["id"])
+            try:
+                self._queue.put_nowait(report)
+                return True
+            except queue.Full:
+                self._discard_pending([report["id"]])
+                return False
+        finally:
+            self._end_submit()
+    
+    def submit(self, report: Dict[str, Any]) -> int:
+        """
+        Queue a prepared report (see Database.prepare_report), blocking while the queue is full
+        
+        Returns:
+            The report id
+        """
+        if not self._begin_submit():
+            # After shutdown, fall back to a direct write
+            self.database._run_write(lambda cursor: self.database._write_reports(cursor, [report]))
+            return report["id"]
+        try:
+            with self._pending_changed:
+                self._pending.add(report["id"])
+            self._queue.put(report)
+        finally:
+            self._end_submit()
+        return report["id"]
+    
+    def is_pending(self, report_id: int) -> bool:
+        """Whether a report is queued but not yet written"""
+        with self._pending_changed:
+            return report_id in self._pending
+    
+    def failure(self, report_id: int) -> Optional[str]:
+        """Error of a recent report whose write failed, or None"""
+        with self._pending_changed:
+            return self._failed.get(report_id)
+    
+    def wait_for(self, report_id: int, timeout: Optional[float] = None) -> bool:
+        """Block until a queued report has been written (or failed)"""
+        with self._pending_changed:
+            return self._pending_changed.wait_for(lambda: report_id not in self._pending, timeout)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far has been written"""
+        with self._pending_changed:
+            return self._pending_changed.wait_for(lambda: not self._pending, timeout)
+    
+    def _discard_pending(self, report_ids: List[int]):
+        with self._pending_changed:
+            self._pending.difference_update(report_ids)
+            self._pending_changed.notify_all()
+    
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is self._STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_latency
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._persist(batch)
+    
+    def _persist(self, batch: List[Dict[str, Any]]):
+        """Write one batch; if it fails, retry reports individually so one bad row cannot drop the rest"""
+        try:
+            with stage_timer("db_write"):
+                self.database._run_write(lambda cursor: self.database._write_reports(cursor, batch))
+            self.batches_written += 1
+            self.reports_written += len(batch)
+        except Exception as e:
+            if len(batch) > 1:
+                for report in batch:
+                    self._persist([report])
+                return
+            self.reports_failed += 1
+            with self._pending_changed:
+                self._failed[batch[0]["id"]] = str(e)
+                while len(self._failed) > FAILED_REPORTS_KEPT:
+                    self._failed.popitem(last=False)
+            print(f"⚠️  Failed to save report {batch[0]['id']} to database: {e}")
+        finally:
+            self._discard_pending([report["id"] for report in batch])
+    
+    def stats(self) -> Dict[str, int]:
+        """Queue depth and write counters"""
+        return {
+            "queued": self._queue.qsize(),
+            "pending": len(self._pending),
+            "batches_written": self.batches_written,
+            "reports_written": self.reports_written,
+            "reports_failed": self.reports_failed
+        }
+    
+    def close(self):
+        """Flush queued reports and stop the writer thread"""
+        with self._submit_state:
+            if self._closed:
+                return
+            self._closed = True
+            # Submits already past the closed check enqueue before _STOP
+            self._submit_state.wait_for(lambda: self._submitting == 0)
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+
+class AsyncDatabase:
+    """
+    Non-blocking facade over Database for async request handlers
+    
+    Reads run concurrently on a thread pool sized to the connection pool;
+    writes (including JSON encoding of issue lists) go through a single
+    writer thread, so they are serialized without blocking the event loop.
+    New reports go through a write-behind ReportWriter and are batched.
+    """
+    
+    def __init__(self, database: Database):
+        self.database = database
+        self.writer = ReportWriter(database)
+        self._readers = ThreadPoolExecutor(
+            max_workers=database.pool.size,
+            thread_name_prefix="db-read"
+        )
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-write")
+    
+    async def _run(self, executor: ThreadPoolExecutor, func: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
+    
+    async def save_report(self, *args, **kwargs) -> int:
+        """
+        Queue a scan report for batched persistence (arguments as Database.save_report)
+        
+        Returns:
+            The report id, without waiting for the write
+        """
+        with span("save_report") as save_span:
+            if self.database.has_reserved_report_id():
+                report = self.database.prepare_report(*args, **kwargs)
+            else:
+                # Reserving the next id block is a database write
+                report = await self._run(self._writer, self.database.prepare_report, *args, **kwargs)
+            if not self.writer.try_submit(report):
+                # Queue full: wait for room off the event loop
+                save_span.set("queue_full", True)
+                await self._run(None, self.writer.submit, report)
+        return report["id"]
+    
+    async def _written(self, report_id: int):
+        """
+        Read-your-writes: wait for a report that is still queued
+        
+        Raises:
+            ReportWriteFailed: The report was accepted but could not be written
+        """
+        if self.writer.is_pending(report_id):
+            await self._run(None, self.writer.wait_for, report_id)
+        error = self.writer.failure(report_id)
+        if error is not None:
+            raise ReportWriteFailed(report_id, error)
+    
+    async def delete_report(self, report_id: int) -> bool:
+        """Delete a report by ID"""
+        await self._written(report_id)
+        return await self._run(self._writer, self.database.delete_report, report_id)
+    
+    async def get_report(self, report_id: int) -> Optional[Dict[str, Any]]:
+        """Get a single report by ID"""
+        await self._written(report_id)
+        return await self._run(self._readers, self.database.get_report, report_id)
+    
+    async def get_report_snapshot(self, report_id: int) -> Optional[Dict[str, Optional[str]]]:
+        """Get the stored HTML/CSS snapshot of a report"""
+        await self._written(report_id)
+        return await self._run(self._readers, self.database.get_report_snapshot, report_id)
+    
+    async def get_storage_statistics(self) -> Dict[str, Any]:
+        """Blob store usage and database size"""
+        return await self._run(self._readers, self.database.get_storage_statistics)
+    
+    async def get_all_reports(self, *args, **kwargs) -> List[Dict[str, Any]]:
+        """Get all reports with optional filtering (see Database.get_all_reports)"""
+        return await self._run(self._readers, self.database.get_all_reports, *args, **kwargs)
+    
+    async def get_reports_page(self, **kwargs) -> Dict[str, Any]:
+        """Get one keyset-paginated page of report summaries (see Database.get_reports_page)"""
+        return await self._run(self._readers, self.database.get_reports_page, **kwargs)
+    
+    async def search_reports(self, query: str, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+        """Substring search over domain, URL and issue messages"""
+        return await self._run(self._readers, self.database.search_reports, query, limit, offset)
+    
+    async def get_reports_by_url(self, url: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get all reports for a specific URL"""
+        return await self._run(self._readers, self.database.get_reports_by_url, url, limit)
+    
+    async def get_reports_by_domain(self, domain: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get all reports for a specific domain"""
+        return await self._run(self._readers, self.database.get_reports_by_domain, domain, limit)
+    
+    async def get_statistics(self) -> Dict[str, Any]:
+        """Get database statistics"""
+        return await self._run(self._readers, self.database.get_statistics)
+    
+    async def get_domain_statistics(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Per-domain statistics"""
+        return await self._run(self._readers, self.database.get_domain_statistics, limit)
+    
+    async def get_daily_statistics(self, days: int = 30) -> List[Dict[str, Any]]:
+        """Per-day statistics"""
+        return await self._run(self._readers, self.database.get_daily_statistics, days)
+    
+    async def rebuild_rollups(self) -> Dict[str, Any]:
+        """Recompute statistics rollups"""
+        return await self._run(self._writer, self.database.rebuild_rollups)
+    
+    async def get_score_trend(self, url: str, **options) -> Dict[str, Any]:
+        """Score over time for one URL (see Database.get_score_trend)"""
+        return await self._run(self._readers, self.database.get_score_trend, url, **options)
+    
+    async def find_issues(self, **filters) -> List[Dict[str, Any]]:
+        """Search issues across reports (see Database.find_issues)"""
+        return await self._run(self._readers, self.database.find_issues, **filters)
+    
+    async def get_reports_with_issue(self, **filters) -> List[Dict[str, Any]]:
+        """Reports containing a matching issue (see Database.get_reports_with_issue)"""
+        return await self._run(self._readers, self.database.get_reports_with_issue, **filters)
+    
+    async def count_issues(self, **filters) -> List[Dict[str, Any]]:
+        """Aggregate issue counts (see Database.count_issues)"""
+        return await self._run(self._readers, self.database.count_issues, **filters)
+    
+    async def get_issue_history(self, fingerprint: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Reports containing an issue fingerprint"""
+        return await self._run(self._readers, self.database.get_issue_history, fingerprint, limit)
+    
+    async def create_job(self, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Persist a new queued scan job"""
+        return await self._run(self._writer, self.database.create_job, kind, params)
+    
+    async def update_job(self, job_id: str, **fields) -> Optional[Dict[str, Any]]:
+        """Update a scan job (see Database.update_job)"""
+        return await self._run(self._writer, self.database.update_job, job_id, **fields)
+    
+    async def get_job(self, job_id: str, include_result: bool = False) -> Optional[Dict[str, Any]]:
+        """Get a scan job, optionally with its result"""
+        return await self._run(self._readers, self.database.get_job, job_id, include_result)
+    
+    async def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent scan jobs"""
+        return await self._run(self._readers, self.database.list_jobs, status, limit)
+    
+    async def recover_jobs(self) -> List[str]:
+        """Re-queue jobs interrupted by a restart"""
+        return await self._run(self._writer, self.database.recover_jobs)
+    
+    def close(self):
+        """Wait for pending writes, then release threads and connections"""
+        self.writer.close()
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        self.database.close()
+
+
 # Global database instance
 db = Database()
+async_db = AsyncDatabase(db)
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Accessibility reports database maintenance")
+    parser.add_argument(
+        "command",
+        choices=["rebuild-stats", "rebuild-history"],
+        help="rebuild-stats: recompute statistics rollups; rebuild-history: recompute score time series"
+    )
+    args = parser.parse_args()
+    
+    if args.command == "rebuild-stats":
+        stats = db.rebuild_rollups()
+        print(f"✅ Statistics rollups rebuilt: {json.dumps(stats)}")
+    elif args.command == "rebuild-history":
+        db.rebuild_score_history()
+        print("✅ Score history rebuilt")
 
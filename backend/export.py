@@ -0,0 +1,244 @@
+"""
+Analytics export
+Streams reports and normalized issue rows to Parquet, Arrow or CSV files
+"""
+
+import argparse
+import csv
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Pinned in requirements.txt; without it only format=csv works
+    pa = None
+    pq = None
+
+# Rows fetched from SQLite and written per row group / record batch
+EXPORT_BATCH_SIZE = 50000
+
+# Parquet is the default; CSV only when asked for explicitly
+EXPORT_FORMATS = ("parquet", "arrow", "csv")
+DEFAULT_EXPORT_FORMAT = "parquet"
+
+# (column, type) for each exported table
+REPORT_COLUMNS = [
+    ("id", "int64"),
+    ("url", "string"),
+    ("domain", "string"),
+    ("scan_date", "string"),
+    ("score", "float64"),
+    ("wcag_level", "string"),
+    ("total_issues", "int64"),
+    ("critical", "int64"),
+    ("high", "int64"),
+    ("medium", "int64"),
+    ("low", "int64"),
+    ("scan_duration", "float64"),
+]
+
+ISSUE_COLUMNS = [
+    ("report_id", "int64"),
+    ("position", "int64"),
+    ("type", "string"),
+    ("severity", "string"),
+    ("wcag_rule", "string"),
+    ("wcag_level", "string"),
+    ("selector", "string"),
+    ("message", "string"),
+    ("fingerprint", "string"),
+    ("url", "string"),
+    ("domain", "string"),
+    ("scan_date", "string"),
+]
+
+REPORT_QUERY = """
+    SELECT r.id, r.url, r.domain, r.scan_date, r.score, r.wcag_level, r.total_issues,
+           COALESCE(json_extract(r.severity_breakdown, '$.critical'), 0),
+           COALESCE(json_extract(r.severity_breakdown, '$.high'), 0),
+           COALESCE(json_extract(r.severity_breakdown, '$.medium'), 0),
+           COALESCE(json_extract(r.severity_breakdown, '$.low'), 0),
+           r.scan_duration
+    FROM reports r
+"""
+
+ISSUE_QUERY = """
+    SELECT i.report_id, i.position, i.type, i.severity, i.wcag_rule, i.wcag_level,
+           i.selector, i.message, i.fingerprint, r.url, r.domain, r.scan_date
+    FROM issues i
+    JOIN reports r ON r.id = i.report_id
+"""
+
+
+def _arrow_schema(columns: List[Tuple[str, str]]):
+    types = {"int64": pa.int64(), "float64": pa.float64(), "string": pa.string()}
+    return pa.schema([(name, types[kind]) for name, kind in columns])
+
+
+class _ArrowSink:
+    """Writes each batch as a Parquet row group or an Arrow IPC record batch"""
+    
+    def __init__(self, path: str, columns: List[Tuple[str, str]], export_format: str):
+        self.schema = _arrow_schema(columns)
+        if export_format == "parquet":
+            self.writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+        else:
+            self.writer = pa.ipc.new_file(path, self.schema)
+    
+    def write(self, rows: List[tuple]):
+        arrays = [
+            pa.array(values, type=field.type)
+            for values, field in zip(zip(*rows), self.schema)
+        ]
+        self.writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+    
+    def close(self):
+        self.writer.close()
+
+
+class _CsvSink:
+    """Plain CSV rows (format=csv)"""
+    
+    def __init__(self, path: str, columns: List[Tuple[str, str]], export_format: str):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([name for name, _ in columns])
+    
+    def write(self, rows: List[tuple]):
+        self.writer.writerows(rows)
+    
+    def close(self):
+        self.file.close()
+
+
+def _filters(
+    since: Optional[str],
+    until: Optional[str],
+    domain: Optional[str]
+) -> Tuple[str, List[Any]]:
+    clauses = []
+    params = []
+    if since:
+        clauses.append("r.scan_date >= ?")
+        params.append(since)
+    if until:
+        clauses.append("r.scan_date < ?")
+        params.append(until)
+    if domain:
+        clauses.append("r.domain = ?")
+        params.append(domain)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def export_table(
+    database,
+    table: str,
+    path: str,
+    export_format: str = DEFAULT_EXPORT_FORMAT,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    domain: Optional[str] = None,
+    batch_size: int = EXPORT_BATCH_SIZE
+) -> Dict[str, Any]:
+    """
+    Stream one table ("reports" or "issues") to a file
+
+    Rows are read with fetchmany on a single SQLite cursor and written one
+    batch at a time, so memory stays bounded by batch_size whatever the
+    table size. WAL mode keeps writers unblocked while the export runs.
+
+    Args:
+        database: Database instance
+        table: "reports" or "issues"
+        path: Output file
+        export_format: parquet, arrow or csv
+        since: Inclusive scan_date lower bound ('YYYY-MM-DD[ HH:MM:SS]')
+        until: Exclusive scan_date upper bound
+        domain: Exact report domain
+        batch_size: Rows per row group / record batch
+
+    Returns:
+        Dict with rows, bytes, seconds and rows_per_second
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    if export_format != "csv" and pa is None:
+        raise RuntimeError(f"{export_format} export requires pyarrow (pip install -r requirements.txt); use format=csv")
+    if table == "reports":
+        columns, query, order = REPORT_COLUMNS, REPORT_QUERY, " ORDER BY r.id"
+    elif table == "issues":
+        columns, query, order = ISSUE_COLUMNS, ISSUE_QUERY, " ORDER BY i.report_id, i.position"
+    else:
+        raise ValueError("table must be 'reports' or 'issues'")
+
+    where, params = _filters(since, until, domain)
+    sink_class = _CsvSink if export_format == "csv" else _ArrowSink
+
+    start = time.perf_counter()
+    rows_written = 0
+    sink = sink_class(path, columns, export_format)
+    try:
+        with database.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.arraysize = batch_size
+            cursor.execute(query + where + order, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                sink.write([tuple(row) for row in rows])
+                rows_written += len(rows)
+    finally:
+        sink.close()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "table": table,
+        "path": path,
+        "format": export_format,
+        "rows": rows_written,
+        "bytes": os.path.getsize(path),
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows_written / elapsed) if elapsed > 0 else rows_written
+    }
+
+
+def export_all(
+    database,
+    out_dir: str,
+    export_format: str = DEFAULT_EXPORT_FORMAT,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    domain: Optional[str] = None,
+    batch_size: int = EXPORT_BATCH_SIZE
+) -> List[Dict[str, Any]]:
+    """Export reports and issues into out_dir; returns the per-table results"""
+    os.makedirs(out_dir, exist_ok=True)
+    return [
+        export_table(
+            database, table, os.path.join(out_dir, f"{table}.{export_format}"),
+            export_format=export_format, since=since, until=until, domain=domain, batch_size=batch_size
+        )
+        for table in ("reports", "issues")
+    ]
+
+
+if __name__ == "__main__":
+    from database import db
+
+    parser = argparse.ArgumentParser(description="Export reports and issues for offline analytics")
+    parser.add_argument("--out", default="export", help="Output directory")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default=DEFAULT_EXPORT_FORMAT)
+    parser.add_argument("--since", help="Inclusive scan date lower bound (YYYY-MM-DD)")
+    parser.add_argument("--until", help="Exclusive scan date upper bound (YYYY-MM-DD)")
+    parser.add_argument("--domain", help="Only reports for this domain")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    for result in export_all(db, args.out, args.format, args.since, args.until, args.domain, args.batch_size):
+        print(
+            f"✅ {result['table']}: {result['rows']} rows, {result['bytes'] / 1e6:.2f} MB "
+            f"in {result['seconds']}s ({result['rows_per_second']:,} rows/s) -> {result['path']}"
+        )
@@ -0,0 +1,77 @@
+"""
+Fast JSON responses
+orjson serialization for large, internally generated payloads (scan results)
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # Pinned in requirements.txt; stdlib JSON is a degraded fallback
+    orjson = None
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value: Any) -> Any:
+    """Types neither serializer handles natively (numpy scalars, sets, ...)"""
+    if hasattr(value, "item"):
+        return value.item()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False, default=_default).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response rendered with orjson
+    
+    Returning it from an endpoint bypasses FastAPI's response_model
+    validation and jsonable_encoder walk; the response_model still
+    documents the schema.
+    """
+    
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def scan_response(
+    issues: List[Dict[str, Any]],
+    wcag_level: str,
+    score: float,
+    url: Optional[str] = None
+) -> FastJSONResponse:
+    """
+    ScanResponse-shaped response without pydantic validation
+    
+    The issue dicts come from the scanner, so validating each one against
+    Dict[str, Any] only costs time; the scalar fields are coerced the way
+    ScanResponse would coerce them.
+    
+    Args:
+        issues: Issue dicts from scan_comprehensive
+        wcag_level: WCAG conformance level
+        score: Accessibility score
+        url: Scanned URL (None for HTML/file scans)
+    """
+    return FastJSONResponse({
+        "success": True,
+        "url": url,
+        "issues": issues,
+        "total_issues": len(issues),
+        "wcag_level": str(wcag_level),
+        "score": float(score)
+    })
@@ -0,0 +1,181 @@
+"""
+Scan job storage
+Persistent state, stage progress and results of background scan jobs
+"""
+
+import json
+import sqlite3
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from blob_store import BlobStore
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+# Finished jobs (and their stored results) are kept this long
+JOB_RETENTION_DAYS = 7
+
+# Retention runs at most this often while jobs finish
+JOB_PRUNE_INTERVAL_SECONDS = 3600
+
+# Columns that update() may set
+JOB_UPDATE_COLUMNS = ("status", "stage", "progress", "error", "report_id", "started_at", "finished_at")
+
+
+def utc_timestamp() -> str:
+    """Current UTC time in the 'YYYY-MM-DD HH:MM:SS' format used for scan_date"""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class JobStore:
+    """Scan job operations on a caller-provided cursor"""
+    
+    @staticmethod
+    def create_schema(cursor: sqlite3.Cursor):
+        """Create the scan_jobs table"""
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scan_jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                stage TEXT,
+                progress REAL NOT NULL DEFAULT 0,
+                params TEXT NOT NULL,
+                error TEXT,
+                result_blob TEXT,
+                report_id INTEGER,
+                version INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL,
+                started_at TEXT,
+                finished_at TEXT
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_scan_jobs_status ON scan_jobs(status, created_at)
+        """)
+    
+    def __init__(self, blobs: BlobStore):
+        self.blobs = blobs
+        self._last_prune = 0.0
+    
+    def create(self, cursor: sqlite3.Cursor, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a queued job and return it"""
+        job_id = uuid.uuid4().hex
+        cursor.execute("""
+            INSERT INTO scan_jobs (id, kind, status, stage, params, created_at)
+            VALUES (?, ?, 'queued', 'queued', ?, ?)
+        """, (job_id, kind, json.dumps(params), utc_timestamp()))
+        return self.get(cursor, job_id)
+    
+    def update(
+        self,
+        cursor: sqlite3.Cursor,
+        job_id: str,
+        fields: Dict[str, Any],
+        result: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Update job columns and bump its version
+        
+        Args:
+            fields: Column values; keys must be in JOB_UPDATE_COLUMNS
+            result: Final result, stored compressed in the blob store
+        
+        Returns:
+            The updated job, or None if it does not exist
+        """
+        unknown = set(fields) - set(JOB_UPDATE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Cannot update job columns: {', '.join(sorted(unknown))}")
+        fields = dict(fields)
+        if result is not None:
+            fields["result_blob"] = self.blobs.put(
+                cursor, json.dumps(result, separators=(",", ":")).encode("utf-8")
+            )
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        cursor.execute(
+            f"UPDATE scan_jobs SET {assignments}, version = version + 1 WHERE id = ?",
+            list(fields.values()) + [job_id]
+        )
+        if cursor.rowcount == 0:
+            return None
+        return self.get(cursor, job_id)
+    
+    def get(self, cursor: sqlite3.Cursor, job_id: str, include_result: bool = False) -> Optional[Dict[str, Any]]:
+        """Job by id, optionally with its decoded result"""
+        row = cursor.execute("SELECT * FROM scan_jobs WHERE id = ?", (job_id,)).fetchone()
+        if not row:
+            return None
+        job = self._row_to_dict(row)
+        if include_result and row["result_blob"]:
+            job["result"] = json.loads(self.blobs.get(cursor, row["result_blob"]))
+        return job
+    
+    def list(self, cursor: sqlite3.Cursor, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent jobs first, without results"""
+        if status is not None and status not in JOB_STATUSES:
+            raise ValueError(f"status must be one of: {', '.join(JOB_STATUSES)}")
+        query = "SELECT * FROM scan_jobs"
+        params: List[Any] = []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY created_at DESC, rowid DESC LIMIT ?"
+        params.append(limit)
+        return [self._row_to_dict(row) for row in cursor.execute(query, params).fetchall()]
+    
+    def recover(self, cursor: sqlite3.Cursor) -> List[str]:
+        """
+        Re-queue jobs interrupted by a restart
+        
+        Returns:
+            Ids of all queued jobs, oldest first
+        """
+        cursor.execute("""
+            UPDATE scan_jobs
+            SET status = 'queued', stage = 'queued', progress = 0, started_at = NULL, version = version + 1
+            WHERE status = 'running'
+        """)
+        cursor.execute("SELECT id FROM scan_jobs WHERE status = 'queued' ORDER BY created_at, rowid")
+        return [row[0] for row in cursor.fetchall()]
+    
+    def prune(self, cursor: sqlite3.Cursor, now: Optional[datetime] = None) -> int:
+        """
+        Delete finished jobs older than JOB_RETENTION_DAYS and release their results
+        
+        Returns:
+            Number of jobs deleted
+        """
+        now = now or datetime.now(timezone.utc)
+        cutoff = (now - timedelta(days=JOB_RETENTION_DAYS)).strftime("%Y-%m-%d %H:%M:%S")
+        placeholders = ", ".join("?" for _ in FINISHED_STATUSES)
+        rows = cursor.execute(f"""
+            SELECT id, result_blob FROM scan_jobs
+            WHERE status IN ({placeholders}) AND finished_at < ?
+        """, FINISHED_STATUSES + (cutoff,)).fetchall()
+        self.blobs.release(cursor, (row["result_blob"] for row in rows))
+        cursor.executemany("DELETE FROM scan_jobs WHERE id = ?", [(row["id"],) for row in rows])
+        self._last_prune = now.timestamp()
+        return len(rows)
+    
+    def prune_due(self) -> bool:
+        """Whether JOB_PRUNE_INTERVAL_SECONDS have passed since the last prune"""
+        return datetime.now(timezone.utc).timestamp() - self._last_prune >= JOB_PRUNE_INTERVAL_SECONDS
+    
+    def _row_to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "id": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "stage": row["stage"],
+            "progress": row["progress"],
+            "params": json.loads(row["params"]),
+            "error": row["error"],
+            "report_id": row["report_id"],
+            "version": row["version"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"]
+        }
@@ -3,19 +3,33 @@ AI Web Accessibility Validator & Auto-Fixer - FastAPI Backend
 Main application entry point with all API endpoints
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, HttpUrl, Field, validator
 from typing import List, Optional, Dict, Any
 import uvicorn
 from pathlib import Path
+import asyncio
 import logging
 import traceback
 
 from services.scanner import AccessibilityScanner
 from services.ai_engine import AIEngine
 from services.auto_fixer import AutoFixer
+from database import async_db
+from scan_pool import PooledScanner
+from scan_jobs import ScanJobQueue, make_scan_runner
+from bulk_scan import BULK_DEFAULT_CONCURRENCY, BULK_MAX_ITEMS, bulk_scan_events, shutdown_cpu_pool
+from batch_fix import BATCH_FIX_MAX_ITEMS, batch_fix, batch_fix_events
+from single_flight import SingleFlight, scan_key
+from fast_json import scan_response
+from admission import AdmissionMiddleware, default_limits
+from compression import CompressionMiddleware
+from server_metrics import MetricsMiddleware, register_server_metrics
+from server_tracing import TracingMiddleware
+from services import metrics
+from scan_stream import scan_events, stream_format, streaming_scan_response
 
 # Configure logging
 logging.basicConfig(
@@ -30,6 +44,11 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Admission control for the scan/fix endpoints; added first so it runs
+# inside CORSMiddleware and 429 responses keep their CORS headers
+admission_limits = default_limits()
+app.add_middleware(AdmissionMiddleware, limits=admission_limits)
+
 # CORS middleware for frontend communication
 app.add_middleware(
     CORSMiddleware,
@@ -39,6 +58,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON responses (scan results) for clients that accept it
+app.add_middleware(CompressionMiddleware)
+
+# Server-Timing header on every response; with TRACE_EXPORT=1 in the
+# environment, send "X-Trace: 1" to also export the full trace to traces.jsonl
+app.add_middleware(TracingMiddleware)
+
+# Request counts and latency for /metrics; outermost, so 429s and errors are counted too
+app.add_middleware(MetricsMiddleware)
+
 # Initialize services (lazy initialization to handle import errors)
 scanner = None
 ai_engine = None
@@ -48,7 +77,7 @@ def get_scanner():
     """Lazy load scanner to handle import errors gracefully"""
     global scanner
     if scanner is None:
-        scanner = AccessibilityScanner()
+        scanner = PooledScanner(AccessibilityScanner())
     return scanner
 
 def get_ai_engine():
@@ -66,6 +95,37 @@ def get_auto_fixer():
     return auto_fixer
 
 
+async def run_scan_job(params: Dict[str, Any], progress) -> Dict[str, Any]:
+    """Runner for background "scan-url" jobs (the scanner is created on first use)"""
+    return await make_scan_runner(get_scanner(), limit=admission_limits["scan-url"])(params, progress)
+
+
+# Background scan jobs, persisted in SQLite (see scan_jobs.py)
+job_queue = ScanJobQueue(async_db, {"scan-url": run_scan_job})
+scan_flights = SingleFlight()
+register_server_metrics(async_db, job_queue, lambda: scanner, admission_limits, scan_flights)
+
+
+@app.on_event("startup")
+async def start_scan_jobs():
+    """Start the scan worker processes, then the job workers (resuming persisted jobs)"""
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, get_scanner().start)
+    except Exception as e:
+        logger.warning(f"Scan process pool unavailable, scanning in-process: {str(e)}")
+    await job_queue.start()
+
+
+@app.on_event("shutdown")
+async def stop_scan_jobs():
+    """Stop scan job, CPU and scan process workers and flush pending database writes"""
+    await job_queue.stop()
+    shutdown_cpu_pool()
+    if scanner is not None:
+        scanner.shutdown()
+    async_db.close()
+
+
 # Pydantic models for request/response
 class ScanURLRequest(BaseModel):
     url: str = Field(..., min_length=1, description="Website URL to scan")
@@ -102,6 +162,20 @@ class FixRequest(BaseModel):
         return str(v).strip()
 
 
+class BulkDocument(BaseModel):
+    html: str = Field(..., min_length=1, description="HTML content to scan")
+    css: Optional[str] = Field(None, description="Optional CSS content")
+    js: Optional[str] = Field(None, description="Optional JavaScript content")
+    id: Optional[str] = Field(None, description="Caller's identifier, echoed in results")
+
+
+class BulkScanRequest(BaseModel):
+    urls: List[str] = Field(default_factory=list, description="Website URLs to scan")
+    documents: List[BulkDocument] = Field(default_factory=list, description="Raw HTML documents to scan")
+    concurrency: int = Field(BULK_DEFAULT_CONCURRENCY, ge=1, description="Items scanned at once")
+    include_issues: bool = Field(True, description="Include issue lists in per-item results")
+
+
 class ScanResponse(BaseModel):
     success: bool
     url: Optional[str] = None
@@ -129,6 +203,12 @@ async def root():
     }
 
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus metrics: request counts, stage latencies, pools, queues and caches"""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -141,7 +221,9 @@ async def health_check():
             "status": "healthy",
             "service": "accessibility-validator",
             "scanner": "initialized",
-            "fixer": "initialized"
+            "fixer": "initialized",
+            "scan_coalescing": scan_flights.stats(),
+            "admission": {name: limit.stats() for name, limit in admission_limits.items()}
         }
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
@@ -155,6 +237,59 @@ async def health_check():
         )
 
 
+async def run_url_scan(url: str) -> Dict[str, Any]:
+    """Fetch, scan and score a URL (shared by coalesced /scan-url requests)"""
+    # Get scanner instance
+    try:
+        scanner_instance = get_scanner()
+    except Exception as e:
+        logger.error(f"Failed to initialize scanner: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to initialize scanner: {str(e)}")
+    
+    # Fetch and parse the website
+    try:
+        html_content, css_content, js_content = await scanner_instance.fetch_website(url)
+    except Exception as e:
+        logger.error(f"Failed to fetch website: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Failed to fetch website: {str(e)}")
+    
+    # Run comprehensive accessibility scan
+    try:
+        issues = await scanner_instance.scan_comprehensive(html_content, css_content, js_content, url)
+        
+        # Ensure issues is a list
+        if not isinstance(issues, list):
+            logger.warning(f"Scanner returned non-list issues: {type(issues)}")
+            issues = []
+    except Exception as e:
+        logger.error(f"Error during scan: {str(e)}\n{traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=f"Error during accessibility scan: {str(e)}")
+    
+    # Calculate score and WCAG level
+    try:
+        score = scanner_instance.calculate_accessibility_score(issues)
+        wcag_level = scanner_instance.determine_wcag_level(issues)
+        
+        # Ensure score is valid
+        if not isinstance(score, (int, float)):
+            score = 0.0
+        if score < 0:
+            score = 0.0
+        if score > 100:
+            score = 100.0
+        
+        if not isinstance(wcag_level, str):
+            wcag_level = "Unknown"
+    except Exception as e:
+        logger.warning(f"Error calculating score/WCAG level: {str(e)}")
+        score = 0.0
+        wcag_level = "Unknown"
+    
+    logger.info(f"URL scan completed: {len(issues)} issues found")
+    
+    return {"url": url, "issues": issues, "wcag_level": wcag_level, "score": score}
+
+
 @app.post("/scan-url", response_model=ScanResponse)
 async def scan_url(request: ScanURLRequest):
     """
@@ -169,69 +304,16 @@ async def scan_url(request: ScanURLRequest):
         # Validate URL
         if not url:
             raise HTTPException(status_code=400, detail="URL cannot be empty")
-            
+        
         # Add protocol if missing
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
-            
-        logger.info(f"Starting URL scan for: {url}")
-        
-        # Get scanner instance
-        try:
-            scanner_instance = get_scanner()
-        except Exception as e:
-            logger.error(f"Failed to initialize scanner: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Failed to initialize scanner: {str(e)}")
-        
-        # Fetch and parse the website
-        try:
-            html_content, css_content, js_content = await scanner_instance.fetch_website(url)
-        except Exception as e:
-            logger.error(f"Failed to fetch website: {str(e)}")
-            raise HTTPException(status_code=400, detail=f"Failed to fetch website: {str(e)}")
-        
-        # Run comprehensive accessibility scan
-        try:
-            issues = await scanner_instance.scan_comprehensive(html_content, css_content, js_content, url)
-            
-            # Ensure issues is a list
-            if not isinstance(issues, list):
-                logger.warning(f"Scanner returned non-list issues: {type(issues)}")
-                issues = []
-        except Exception as e:
-            logger.error(f"Error during scan: {str(e)}\n{traceback.format_exc()}")
-            raise HTTPException(status_code=500, detail=f"Error during accessibility scan: {str(e)}")
-        
-        # Calculate score and WCAG level
-        try:
-            score = scanner_instance.calculate_accessibility_score(issues)
-            wcag_level = scanner_instance.determine_wcag_level(issues)
-            
-            # Ensure score is valid
-            if not isinstance(score, (int, float)):
-                score = 0.0
-            if score < 0:
-                score = 0.0
-            if score > 100:
-                score = 100.0
-                
-            if not isinstance(wcag_level, str):
-                wcag_level = "Unknown"
-        except Exception as e:
-            logger.warning(f"Error calculating score/WCAG level: {str(e)}")
-            score = 0.0
-            wcag_level = "Unknown"
         
-        logger.info(f"URL scan completed: {len(issues)} issues found")
+        logger.info(f"Starting URL scan for: {url}")
         
-        return ScanResponse(
-            success=True,
-            url=url,
-            issues=issues,
-            total_issues=len(issues),
-            wcag_level=wcag_level,
-            score=score
-        )
+        # Identical concurrent requests share one fetch and scan
+        result = await scan_flights.run(scan_key(url), lambda: run_url_scan(url))
+        return scan_response(**result)
     except HTTPException:
         raise
     except Exception as e:
@@ -274,7 +356,7 @@ async def scan_html(request: ScanHTMLRequest):
             if not isinstance(issues, list):
                 logger.warning(f"Scanner returned non-list issues: {type(issues)}")
                 issues = []
-                
+        
         except Exception as e:
             logger.error(f"Error during scan: {str(e)}\n{traceback.format_exc()}")
             raise HTTPException(status_code=500, detail=f"Error during accessibility scan: {str(e)}")
@@ -291,11 +373,11 @@ async def scan_html(request: ScanHTMLRequest):
                 score = 0.0
             if score > 100:
                 score = 100.0
-                
+            
             # Ensure wcag_level is a string
             if not isinstance(wcag_level, str):
                 wcag_level = "Unknown"
-                
+        
         except Exception as e:
             logger.warning(f"Error calculating score/WCAG level: {str(e)}")
             score = 0.0
@@ -303,13 +385,7 @@ async def scan_html(request: ScanHTMLRequest):
         
         logger.info(f"Scan completed: {len(issues)} issues found")
         
-        return ScanResponse(
-            success=True,
-            issues=issues,
-            total_issues=len(issues),
-            wcag_level=wcag_level,
-            score=score
-        )
+        return scan_response(issues, wcag_level, score)
     except HTTPException:
         raise
     except Exception as e:
@@ -317,6 +393,165 @@ async def scan_html(request: ScanHTMLRequest):
         raise HTTPException(status_code=500, detail=f"Error scanning HTML: {str(e)}")
 
 
+@app.post("/scan-url/stream")
+async def scan_url_stream(
+    request: ScanURLRequest,
+    format: Optional[str] = None,
+    accept: Optional[str] = Header(None)
+):
+    """
+    Scan a website URL, streaming results as each rule family completes
+    
+    Input: Website URL; format=sse (default) or ndjson, or Accept: application/x-ndjson
+    Output: Events fetched, rule (one per rule family) and score; error ends the stream early
+    """
+    try:
+        fmt = stream_format(format, accept)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    url = str(request.url).strip()
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    
+    try:
+        scanner_instance = get_scanner()
+    except Exception as e:
+        logger.error(f"Failed to initialize scanner: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to initialize scanner: {str(e)}")
+    
+    logger.info(f"Starting streaming URL scan for: {url}")
+    return streaming_scan_response(scan_events(scanner_instance, url), fmt)
+
+
+@app.post("/scan-html/stream")
+async def scan_html_stream(
+    request: ScanHTMLRequest,
+    format: Optional[str] = None,
+    accept: Optional[str] = Header(None)
+):
+    """
+    Scan raw HTML/CSS/JS, streaming results as each rule family completes
+    
+    Input: HTML, optional CSS and JS; format as for /scan-url/stream
+    Output: Events rule (one per rule family) and score
+    """
+    try:
+        fmt = stream_format(format, accept)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        scanner_instance = get_scanner()
+    except Exception as e:
+        logger.error(f"Failed to initialize scanner: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to initialize scanner: {str(e)}")
+    
+    events = scan_events(
+        scanner_instance,
+        "uploaded-content",
+        html=request.html,
+        css=request.css or "",
+        js=request.js or ""
+    )
+    return streaming_scan_response(events, fmt)
+
+
+@app.post("/scan-bulk")
+async def scan_bulk(
+    request: BulkScanRequest,
+    format: Optional[str] = None,
+    accept: Optional[str] = Header(None)
+):
+    """
+    Scan many URLs and/or HTML documents concurrently
+    
+    Input: URLs and/or documents, concurrency level; format as for /scan-url/stream
+    Output: Events item (per scanned item) and error (per failed item) as they
+    complete, then an aggregate summary
+    """
+    try:
+        fmt = stream_format(format, accept)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    items = [{"url": url} for url in request.urls] + [doc.dict() for doc in request.documents]
+    if not items:
+        raise HTTPException(status_code=400, detail="Provide at least one URL or document")
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_ITEMS} items per request")
+    
+    try:
+        scanner_instance = get_scanner()
+    except Exception as e:
+        logger.error(f"Failed to initialize scanner: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to initialize scanner: {str(e)}")
+    
+    logger.info(f"Starting bulk scan of {len(items)} items (concurrency {request.concurrency})")
+    events = bulk_scan_events(
+        scanner_instance,
+        items,
+        concurrency=request.concurrency,
+        include_issues=request.include_issues,
+        limits=admission_limits
+    )
+    return streaming_scan_response(events, fmt)
+
+
+@app.post("/jobs/scan-url", status_code=202)
+async def create_scan_job(request: ScanURLRequest):
+    """
+    Queue a website URL scan in the background
+    
+    Input: Website URL
+    Output: Queued job; poll GET /jobs/{job_id} for progress and the report
+    """
+    url = str(request.url).strip()
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    
+    try:
+        job = await job_queue.submit("scan-url", {"url": url})
+    except asyncio.QueueFull:
+        logger.warning(f"Scan queue full, rejected job for: {url}")
+        raise HTTPException(status_code=503, detail="Scan queue is full, try again later", headers={"Retry-After": "10"})
+    
+    logger.info(f"Queued scan job {job['id']} for: {url}")
+    return {"success": True, "job": job}
+
+
+@app.get("/jobs")
+async def list_scan_jobs(status: Optional[str] = None, limit: int = 50):
+    """List recent scan jobs (without results)"""
+    try:
+        jobs = await async_db.list_jobs(status=status, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"success": True, "jobs": jobs, "total": len(jobs), "queue": job_queue.stats()}
+
+
+@app.get("/jobs/{job_id}")
+async def get_scan_job(job_id: str, version: Optional[int] = None, wait: float = 0):
+    """
+    Get a scan job's status, stage progress and (once succeeded) result
+    
+    Long-poll by passing the last seen version and a wait time in seconds.
+    """
+    job = await job_queue.get(job_id, version=version, wait=wait)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"success": True, "job": job}
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_scan_job(job_id: str):
+    """Cancel a queued or running scan job"""
+    job = await job_queue.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"success": True, "job": job}
+
+
 @app.post("/upload-file")
 async def upload_html_file(file: UploadFile = File(...)):
     """
@@ -338,13 +573,7 @@ async def upload_html_file(file: UploadFile = File(...)):
         score = scanner_instance.calculate_accessibility_score(issues)
         wcag_level = scanner_instance.determine_wcag_level(issues)
         
-        return ScanResponse(
-            success=True,
-            issues=issues,
-            total_issues=len(issues),
-            wcag_level=wcag_level,
-            score=score
-        )
+        return scan_response(issues, wcag_level, score)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
@@ -363,7 +592,7 @@ async def auto_fix_issue(request: FixRequest):
             raise HTTPException(status_code=400, detail="Original code cannot be empty")
         if not request.issue_type or not request.issue_type.strip():
             raise HTTPException(status_code=400, detail="Issue type cannot be empty")
-            
+        
         logger.info(f"Generating fix for issue type: {request.issue_type}")
         
         # Get fixer instance
@@ -385,20 +614,20 @@ async def auto_fix_issue(request: FixRequest):
             # Validate fix_result structure
             if not isinstance(fix_result, dict):
                 raise ValueError("Fix result must be a dictionary")
-                
+            
             if "fixed_code" not in fix_result:
                 logger.warning("Fix result missing 'fixed_code', using original code")
                 fix_result["fixed_code"] = request.original_code
-                
+            
             if "explanation" not in fix_result:
                 logger.warning("Fix result missing 'explanation', using default")
                 fix_result["explanation"] = "Fix applied for accessibility improvement."
-                
+            
             # Ensure fixed_code is not empty
             if not fix_result["fixed_code"] or not str(fix_result["fixed_code"]).strip():
                 logger.warning("Fix result has empty fixed_code, using original")
                 fix_result["fixed_code"] = request.original_code
-                
+        
         except Exception as e:
             logger.error(f"Error generating fix: {str(e)}\n{traceback.format_exc()}")
             raise HTTPException(status_code=500, detail=f"Error generating fix: {str(e)}")
@@ -425,54 +654,22 @@ async def batch_fix_issues(issues: List[FixRequest]):
     Generate fixes for multiple issues at once
     
     Input: List of issue fix requests
-    Output: List of fix responses
+    Output: List of fix responses (in input order, with per-fix timing_ms)
     """
     try:
         if not issues or len(issues) == 0:
             raise HTTPException(status_code=400, detail="Issues list cannot be empty")
-            
+        if len(issues) > BATCH_FIX_MAX_ITEMS:
+            raise HTTPException(status_code=400, detail=f"At most {BATCH_FIX_MAX_ITEMS} issues per batch")
+        
         logger.info(f"Starting batch fix for {len(issues)} issues")
         
-        results = []
         fixer_instance = get_auto_fixer()
+        results = await batch_fix(fixer_instance, [issue.dict() for issue in issues])
         
-        for issue in issues:
-            try:
-                fix_result = await fixer_instance.generate_fix(
-                    issue_type=issue.issue_type,
-                    element_selector=issue.element_selector,
-                    original_code=issue.original_code,
-                    issue_id=issue.issue_id
-                )
-                
-                # Validate fix_result
-                if not isinstance(fix_result, dict):
-                    results.append({
-                        "issue_id": issue.issue_id,
-                        "success": False,
-                        "error": "Invalid fix result format"
-                    })
-                    continue
-                    
-                if "fixed_code" not in fix_result:
-                    fix_result["fixed_code"] = issue.original_code
-                if "explanation" not in fix_result:
-                    fix_result["explanation"] = "Fix applied for accessibility improvement."
-                
-                results.append({
-                    "issue_id": issue.issue_id,
-                    "success": True,
-                    "fixed_code": str(fix_result["fixed_code"]),
-                    "explanation": str(fix_result["explanation"])
-                })
-            except Exception as e:
-                logger.error(f"Error fixing issue {issue.issue_id}: {str(e)}")
-                results.append({
-                    "issue_id": issue.issue_id,
-                    "success": False,
-                    "error": str(e)
-                })
-        
+        for result in results:
+            if not result["success"]:
+                logger.error(f"Error fixing issue {result['issue_id']}: {result['error']}")
         logger.info(f"Batch fix completed: {len([r for r in results if r.get('success')])} successful")
         
         return {"success": True, "fixes": results}
@@ -483,6 +680,38 @@ async def batch_fix_issues(issues: List[FixRequest]):
         raise HTTPException(status_code=500, detail=f"Error batch fixing: {str(e)}")
 
 
+@app.post("/batch-fix/stream")
+async def batch_fix_stream(
+    issues: List[FixRequest],
+    format: Optional[str] = None,
+    accept: Optional[str] = Header(None)
+):
+    """
+    Generate fixes for multiple issues, streaming each fix as it completes
+    
+    Input: List of issue fix requests; format as for /scan-url/stream
+    Output: Events fix (per issue, with its input index and timing_ms) in
+    completion order, then a summary
+    """
+    try:
+        fmt = stream_format(format, accept)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not issues:
+        raise HTTPException(status_code=400, detail="Issues list cannot be empty")
+    if len(issues) > BATCH_FIX_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_FIX_MAX_ITEMS} issues per batch")
+    
+    try:
+        fixer_instance = get_auto_fixer()
+    except Exception as e:
+        logger.error(f"Failed to initialize auto-fixer: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to initialize auto-fixer: {str(e)}")
+    
+    logger.info(f"Starting streaming batch fix for {len(issues)} issues")
+    return streaming_scan_response(batch_fix_events(fixer_instance, [issue.dict() for issue in issues]), fmt)
+
+
 @app.get("/wcag-rules")
 async def get_wcag_rules():
     """Get list of all WCAG 2.2 rules that are being checked"""
@@ -0,0 +1,284 @@
+"""
+Background scan jobs
+Bounded worker pool that runs URL scans outside the request, with persisted progress
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from job_store import FINISHED_STATUSES, utc_timestamp
+
+# Concurrent scans per server process
+SCAN_WORKERS = 4
+
+# Jobs waiting for a worker before new submissions are rejected
+SCAN_JOB_QUEUE_SIZE = 100
+
+# Upper bound for one long-poll request
+LONG_POLL_MAX_SECONDS = 30.0
+
+# Latest job versions kept in memory for long-polling (oldest evicted first)
+MAX_TRACKED_VERSIONS = 10000
+
+# Runner: (params, progress) -> result; progress(stage, fraction) records stage progress
+Progress = Callable[[str, float], Awaitable[None]]
+Runner = Callable[[Dict[str, Any], Progress], Awaitable[Dict[str, Any]]]
+
+
+def make_scan_runner(scanner, save_report: Optional[Callable[..., Awaitable[int]]] = None, limit=None) -> Runner:
+    """
+    Build the runner for "scan-url" jobs
+    
+    Args:
+        scanner: Scanner with fetch_website, scan_comprehensive, calculate_accessibility_score
+            and determine_wcag_level
+        save_report: Optional AsyncDatabase.save_report; the report id is stored with the job
+        limit: Optional AdmissionLimit shared with /scan-url; the job holds a slot at
+            "bulk" priority while it fetches and scans, waiting when it is full
+    
+    Returns:
+        Coroutine function taking (params, progress)
+    """
+    async def run(params: Dict[str, Any], progress: Progress) -> Dict[str, Any]:
+        url = params["url"]
+        start = time.perf_counter()
+        
+        async with limit.slot("bulk", wait=True) if limit is not None else nullcontext():
+            await progress("fetching", 0.05)
+            html_content, css_content, js_content = await scanner.fetch_website(url)
+            
+            await progress("scanning", 0.35)
+            issues = await scanner.scan_comprehensive(html_content, css_content, js_content, url)
+        if not isinstance(issues, list):
+            issues = []
+        
+        await progress("scoring", 0.85)
+        score = scanner.calculate_accessibility_score(issues)
+        wcag_level = scanner.determine_wcag_level(issues)
+        
+        result = {
+            "success": True,
+            "url": url,
+            "issues": issues,
+            "total_issues": len(issues),
+            "wcag_level": wcag_level,
+            "score": score
+        }
+        if save_report is not None:
+            await progress("saving", 0.95)
+            result["report_id"] = await save_report(
+                url=url,
+                score=score,
+                wcag_level=wcag_level,
+                total_issues=len(issues),
+                issues=issues,
+                scan_duration=round(time.perf_counter() - start, 3),
+                html_content=html_content,
+                css_content=css_content
+            )
+        return result
+    
+    return run
+
+
+class ScanJobQueue:
+    """
+    Persistent job queue served by a fixed number of asyncio workers
+    
+    Job state lives in SQLite (see job_store) so queued and interrupted jobs
+    are picked up again after a restart. Every state change bumps the job's
+    version, which long-polling clients wait on.
+    """
+    
+    def __init__(
+        self,
+        database,
+        runners: Dict[str, Runner],
+        workers: int = SCAN_WORKERS,
+        max_queued: int = SCAN_JOB_QUEUE_SIZE
+    ):
+        """
+        Args:
+            database: AsyncDatabase
+            runners: Runner per job kind
+            workers: Number of concurrent jobs
+            max_queued: Queued jobs accepted before submit raises asyncio.QueueFull
+        """
+        self.database = database
+        self.runners = runners
+        self.workers = workers
+        self.max_queued = max_queued
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cancelled: Set[str] = set()
+        self._versions: "OrderedDict[str, int]" = OrderedDict()
+        self._changed = asyncio.Condition()
+        self._submitting = 0
+        self._stopping = False
+    
+    async def start(self):
+        """Re-queue persisted jobs and start the workers"""
+        self._stopping = False
+        for job_id in await self.database.recover_jobs():
+            self._queue.put_nowait(job_id)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+    
+    async def stop(self):
+        """Stop the workers; running jobs are persisted as queued and resume on the next start"""
+        self._stopping = True
+        tasks = self._tasks + list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+    
+    async def submit(self, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Persist and enqueue a job
+        
+        Returns:
+            The queued job
+        
+        Raises:
+            ValueError: Unknown job kind
+            asyncio.QueueFull: max_queued jobs are already waiting
+        """
+        if kind not in self.runners:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if self._queue.qsize() + self._submitting >= self.max_queued:
+            raise asyncio.QueueFull()
+        self._submitting += 1
+        try:
+            job = await self.database.create_job(kind, params)
+        finally:
+            self._submitting -= 1
+        self._queue.put_nowait(job["id"])
+        return job
+    
+    async def get(self, job_id: str, version: Optional[int] = None, wait: float = 0) -> Optional[Dict[str, Any]]:
+        """
+        Get a job with its result, optionally long-polling for a change
+        
+        Args:
+            job_id: Job id
+            version: Last version the client has seen; returns once the job moves past it
+            wait: Seconds to wait for that change (capped at LONG_POLL_MAX_SECONDS)
+        
+        Returns:
+            The job (result included once it has succeeded), or None if it does not exist
+        """
+        job = await self.database.get_job(job_id, include_result=True)
+        if job is None or version is None or wait <= 0:
+            return job
+        if job["version"] > version or job["status"] in FINISHED_STATUSES:
+            return job
+        
+        try:
+            async with self._changed:
+                await asyncio.wait_for(
+                    self._changed.wait_for(lambda: self._versions.get(job_id, 0) > version),
+                    timeout=min(wait, LONG_POLL_MAX_SECONDS)
+                )
+        except asyncio.TimeoutError:
+            pass
+        return await self.database.get_job(job_id, include_result=True)
+    
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a queued or running job; finished jobs are returned unchanged
+        
+        Returns:
+            The job, or None if it does not exist
+        """
+        job = await self.database.get_job(job_id)
+        if job is None or job["status"] in FINISHED_STATUSES:
+            return job
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            return await self.database.get_job(job_id)
+        self._cancelled.add(job_id)
+        return await self._update(job_id, status="cancelled", stage="cancelled", finished_at=utc_timestamp())
+    
+    def stats(self) -> Dict[str, int]:
+        """Worker pool and queue occupancy"""
+        return {
+            "workers": len(self._tasks),
+            "busy": len(self._running),
+            "queued": self._queue.qsize(),
+            "max_queued": self.max_queued
+        }
+    
+    async def _update(self, job_id: str, **fields) -> Optional[Dict[str, Any]]:
+        """Persist a change and wake long-polling clients"""
+        job = await self.database.update_job(job_id, **fields)
+        if job is not None:
+            async with self._changed:
+                self._versions[job_id] = job["version"]
+                self._versions.move_to_end(job_id)
+                if len(self._versions) > MAX_TRACKED_VERSIONS:
+                    self._versions.popitem(last=False)
+                self._changed.notify_all()
+        return job
+    
+    async def _work(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                if job_id in self._cancelled:
+                    self._cancelled.discard(job_id)
+                    continue
+                task = asyncio.create_task(self._execute(job_id))
+                self._running[job_id] = task
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    if not task.done() or self._stopping:
+                        raise
+                finally:
+                    self._running.pop(job_id, None)
+            finally:
+                self._queue.task_done()
+    
+    async def _execute(self, job_id: str):
+        job = await self.database.get_job(job_id)
+        if job is None or job["status"] != "queued":
+            return
+        runner = self.runners.get(job["kind"])
+        if runner is None:
+            await self._update(
+                job_id, status="failed", stage="failed",
+                error=f"Unknown job kind: {job['kind']}", finished_at=utc_timestamp()
+            )
+            return
+        
+        async def progress(stage: str, fraction: float):
+            await self._update(job_id, stage=stage, progress=round(fraction, 3))
+        
+        await self._update(job_id, status="running", stage="starting", progress=0, started_at=utc_timestamp())
+        try:
+            result = await runner(job["params"], progress)
+        except asyncio.CancelledError:
+            if self._stopping:
+                await self._update(job_id, status="queued", stage="queued", progress=0, started_at=None)
+            else:
+                await self._update(job_id, status="cancelled", stage="cancelled", finished_at=utc_timestamp())
+            raise
+        except Exception as e:
+            print(f"❌ Scan job {job_id} failed: {e}")
+            await self._update(job_id, status="failed", stage="failed", error=str(e), finished_at=utc_timestamp())
+            return
+        await self._update(
+            job_id,
+            status="succeeded",
+            stage="done",
+            progress=1.0,
+            report_id=result.get("report_id"),
+            finished_at=utc_timestamp(),
+            result=result
+        )
@@ -0,0 +1,224 @@
+"""
+Scan process pool
+Runs the CPU-bound rule checks of scan_comprehensive in worker processes
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from services import metrics, tracing
+
+try:
+    import orjson
+except ImportError:  # Optional: fall back to compact stdlib JSON
+    orjson = None
+
+# Worker processes; 0 scans on the event loop (no pool)
+SCAN_PROCESSES = int(os.environ.get("SCAN_PROCESSES", os.cpu_count() or 2))
+
+# Imported once by the fork server, so workers start with the scanner loaded
+WORKER_PRELOAD = ["services.scanner"]
+
+# Pages up to this size are scanned in-process: a few milliseconds of work
+# costs less than the round trip to a worker and never waits behind large pages
+INLINE_SCAN_MAX_CHARS = 20000
+
+# Seconds start() waits for every worker to come up
+WORKER_START_TIMEOUT = 60.0
+
+_worker_scanner = None
+_start_barrier = None
+
+
+def dump_issues(issues: List[Dict[str, Any]]) -> bytes:
+    """Serialize an issue list for transfer between processes"""
+    if orjson is not None:
+        return orjson.dumps(issues)
+    return json.dumps(issues, separators=(",", ":")).encode("utf-8")
+
+
+def load_issues(data: bytes) -> List[Dict[str, Any]]:
+    """Inverse of dump_issues"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _init_worker(start_barrier=None):
+    global _worker_scanner, _start_barrier
+    from services.scanner import AccessibilityScanner
+    _worker_scanner = AccessibilityScanner()
+    _start_barrier = start_barrier
+
+
+def _warm_up() -> int:
+    """
+    Task that forces a worker to start (and import the scanner)
+    
+    Workers are spawned on demand; holding each warm-up task until all of
+    them run makes start() spawn the whole pool.
+    """
+    if _start_barrier is not None:
+        _start_barrier.wait(WORKER_START_TIMEOUT)
+    return os.getpid()
+
+
+@contextmanager
+def _main_module_hidden():
+    """
+    Keep new workers from importing the server's __main__ module
+    
+    multiprocessing re-imports it (as __mp_main__) in every worker, which
+    for "python simple_server.py" would open the database and start the
+    report writer there. Workers only run functions of this module.
+    """
+    main = sys.modules["__main__"]
+    saved = {name: main.__dict__[name] for name in ("__file__", "__spec__") if name in main.__dict__}
+    main.__dict__.pop("__file__", None)
+    main.__spec__ = None
+    try:
+        yield
+    finally:
+        main.__dict__.pop("__spec__", None)
+        main.__dict__.update(saved)
+
+
+def _scan_in_worker(html: str, css: str, js: str, source_url: str, traced: bool) -> Tuple[bytes, list, Optional[dict]]:
+    # Stage timings (and spans, when the request is traced) are sent back with
+    # the issues and recorded by the server process
+    with metrics.capture_observations() as observations:
+        if not traced:
+            issues = asyncio.run(_worker_scanner.scan_comprehensive(html, css, js, source_url))
+            trace = None
+        else:
+            with tracing.start_trace("scan_worker") as worker_trace:
+                issues = asyncio.run(_worker_scanner.scan_comprehensive(html, css, js, source_url))
+            trace = worker_trace.to_dict()
+    return dump_issues(issues if isinstance(issues, list) else []), observations, trace
+
+
+class PooledScanner:
+    """
+    Scanner facade that moves scan_comprehensive off the event loop
+    
+    Large documents are scanned in a process pool, so one big page no longer
+    blocks every other request on the worker; small documents are scanned
+    in-process. Every other attribute (fetch_website, scan_rules, scoring)
+    is delegated to the wrapped scanner.
+    """
+    
+    def __init__(
+        self,
+        scanner,
+        processes: int = SCAN_PROCESSES,
+        inline_max_chars: int = INLINE_SCAN_MAX_CHARS
+    ):
+        """
+        Args:
+            scanner: AccessibilityScanner used in-process
+            processes: Worker processes (0 disables the pool)
+            inline_max_chars: Documents up to this many characters skip the pool
+        """
+        self.scanner = scanner
+        self.processes = processes
+        self.inline_max_chars = inline_max_chars
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._start_lock = asyncio.Lock()
+        self.pooled_scans = 0
+        self.inline_scans = 0
+        self.pooled_in_flight = 0
+    
+    def __getattr__(self, name: str):
+        return getattr(self.scanner, name)
+    
+    def start(self):
+        """Start (and warm up) the worker processes"""
+        if self.processes <= 0 or self._executor is not None:
+            return
+        # Workers are forked from a single-threaded fork server, never from
+        # this process: by now it runs the report writer, DB pool and cpu_pool
+        # threads, and a fork could inherit one of their locks held
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload(WORKER_PRELOAD)
+        else:
+            context = multiprocessing.get_context("spawn")
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(context.Barrier(self.processes),)
+        )
+        with _main_module_hidden():
+            for future in [self._executor.submit(_warm_up) for _ in range(self.processes)]:
+                future.result()
+    
+    async def _ensure_started(self, broken: Optional[ProcessPoolExecutor] = None) -> ProcessPoolExecutor:
+        """
+        Start the pool off the event loop, replacing it first if it is the broken one
+        
+        Scans that fail on the same broken pool at once restart it only once:
+        later callers find it already replaced and use the new pool.
+        """
+        async with self._start_lock:
+            if broken is not None and self._executor is broken:
+                self._executor = None
+                broken.shutdown(wait=False, cancel_futures=True)
+            if self._executor is None:
+                # Starting and warming up the workers blocks
+                await asyncio.get_running_loop().run_in_executor(None, self.start)
+            return self._executor
+    
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+    
+    def runs_inline(self, html: str, css: str) -> bool:
+        """Whether scan_comprehensive would scan this document in-process (on the calling loop)"""
+        return self.processes <= 0 or len(html or "") + len(css or "") <= self.inline_max_chars
+    
+    async def scan_comprehensive(self, html: str, css: str, js: str, source_url: str) -> List[Dict[str, Any]]:
+        """Same contract as AccessibilityScanner.scan_comprehensive"""
+        if self.runs_inline(html, css):
+            self.inline_scans += 1
+            return await self.scanner.scan_comprehensive(html, css, js, source_url)
+        
+        executor = self._executor or await self._ensure_started()
+        loop = asyncio.get_running_loop()
+        request_trace = tracing.current_trace()
+        args = (html, css, js, source_url, request_trace is not None)
+        self.pooled_in_flight += 1
+        try:
+            with tracing.span("scan_pool"):
+                try:
+                    data, observations, worker_trace = await loop.run_in_executor(executor, _scan_in_worker, *args)
+                except BrokenProcessPool:
+                    # A worker died (e.g. killed for memory); replace the pool and retry once
+                    print("⚠️  Scan worker pool broken, restarting")
+                    executor = await self._ensure_started(broken=executor)
+                    data, observations, worker_trace = await loop.run_in_executor(executor, _scan_in_worker, *args)
+                if worker_trace is not None:
+                    request_trace.graft(worker_trace["spans"], worker_trace["started_at"])
+        finally:
+            self.pooled_in_flight -= 1
+        self.pooled_scans += 1
+        metrics.replay(observations)
+        return load_issues(data)
+    
+    def stats(self) -> Dict[str, int]:
+        """Pool size, busy workers and how many scans ran in the pool vs. in-process"""
+        return {
+            "processes": self.processes if self._executor is not None else 0,
+            "busy": min(self.pooled_in_flight, self.processes),
+            "pooled_scans": self.pooled_scans,
+            "inline_scans": self.inline_scans
+        }
@@ -0,0 +1,198 @@
+"""
+Streaming scans
+Server-Sent Events / NDJSON stream of per-rule scan results followed by the score
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi.responses import StreamingResponse
+
+from bulk_scan import cpu_pool
+from fast_json import dumps
+
+STREAM_FORMATS = {
+    "sse": "text/event-stream",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def stream_format(format: Optional[str], accept: Optional[str]) -> str:
+    """Pick sse or ndjson from an explicit format parameter or the Accept header"""
+    if format:
+        if format not in STREAM_FORMATS:
+            raise ValueError(f"format must be one of: {', '.join(STREAM_FORMATS)}")
+        return format
+    if accept and STREAM_FORMATS["ndjson"] in accept:
+        return "ndjson"
+    return "sse"
+
+
+def encode_event(event: str, data: Dict[str, Any], format: str) -> bytes:
+    """Serialize one event as an SSE frame or an NDJSON line"""
+    if format == "ndjson":
+        return dumps({"event": event, **data}) + b"\n"
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+async def rules_in_thread(
+    scanner,
+    html: str,
+    css: str,
+    js: str,
+    source_url: str
+) -> AsyncIterator[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    Iterate scanner.scan_rules in the CPU thread pool, yielding each result on the event loop
+    
+    The rule checks are CPU-bound; iterated on the loop they would stall every
+    other request for the length of the scan. The worker stops after the
+    current rule once the consumer goes away.
+    """
+    loop = asyncio.get_running_loop()
+    results: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+    done = object()
+    
+    def post(item):
+        try:
+            loop.call_soon_threadsafe(results.put_nowait, item)
+        except RuntimeError:
+            stop.set()  # Event loop closed
+    
+    async def drain():
+        async for result in scanner.scan_rules(html, css, js, source_url):
+            post(result)
+            if stop.is_set():
+                break
+    
+    def run():
+        try:
+            asyncio.run(drain())
+        except Exception as e:
+            post(e)
+        finally:
+            post(done)
+    
+    # The copied context carries the request's trace into the worker thread
+    loop.run_in_executor(cpu_pool(), contextvars.copy_context().run, run)
+    try:
+        while True:
+            item = await results.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+async def scan_events(
+    scanner,
+    source_url: str,
+    html: Optional[str] = None,
+    css: str = "",
+    js: str = "",
+    save_report: Optional[Callable[..., Awaitable[int]]] = None
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Scan and yield (event, data) pairs as results become available
+    
+    Events: "fetched" (URL scans only), one "rule" per rule family, then
+    "score"; an "error" event ends the stream early.
+    
+    Args:
+        scanner: Scanner instance; per-rule events need scan_rules, other
+            scanners produce a single "all" rule event
+        source_url: URL to fetch (when html is None) or an identifier
+        html: HTML to scan instead of fetching source_url
+        css: CSS content for html scans
+        js: JavaScript content for html scans
+        save_report: Optional AsyncDatabase.save_report; the id is sent with the score
+    """
+    start = time.perf_counter()
+    
+    def elapsed_ms() -> float:
+        return round((time.perf_counter() - start) * 1000, 1)
+    
+    if html is None:
+        try:
+            html, css, js = await scanner.fetch_website(source_url)
+        except Exception as e:
+            yield "error", {"stage": "fetch", "detail": str(e), "elapsed_ms": elapsed_ms()}
+            return
+        yield "fetched", {
+            "url": source_url,
+            "html_chars": len(html),
+            "css_chars": len(css),
+            "js_chars": len(js),
+            "elapsed_ms": elapsed_ms()
+        }
+    
+    issues = []
+    try:
+        if hasattr(scanner, "scan_rules"):
+            rule_results = rules_in_thread(scanner, html, css, js, source_url)
+        else:
+            async def single_rule():
+                yield "all", await scanner.scan_comprehensive(html, css, js, source_url)
+            rule_results = single_rule()
+        
+        async for rule, rule_issues in rule_results:
+            issues.extend(rule_issues)
+            yield "rule", {
+                "rule": rule,
+                "issues": rule_issues,
+                "count": len(rule_issues),
+                "elapsed_ms": elapsed_ms()
+            }
+            # Let the response flush before the next (CPU-bound) check starts
+            await asyncio.sleep(0)
+    except Exception as e:
+        yield "error", {"stage": "scan", "detail": str(e), "elapsed_ms": elapsed_ms()}
+        return
+    
+    score = scanner.calculate_accessibility_score(issues)
+    wcag_level = scanner.determine_wcag_level(issues)
+    summary = {
+        "url": source_url,
+        "score": score,
+        "wcag_level": wcag_level,
+        "total_issues": len(issues),
+        "elapsed_ms": elapsed_ms()
+    }
+    if save_report is not None:
+        try:
+            summary["report_id"] = await save_report(
+                url=source_url,
+                score=score,
+                wcag_level=wcag_level,
+                total_issues=len(issues),
+                issues=issues,
+                scan_duration=round(time.perf_counter() - start, 3),
+                html_content=html,
+                css_content=css
+            )
+        except Exception as e:
+            print(f"⚠️  Failed to save streamed report to database: {e}")
+    yield "score", summary
+
+
+def streaming_scan_response(events: AsyncIterator[Tuple[str, Dict[str, Any]]], format: str) -> StreamingResponse:
+    """Wrap scan_events in a non-buffered streaming response"""
+    async def body():
+        async for event, data in events:
+            yield encode_event(event, data, format)
+    
+    return StreamingResponse(
+        body(),
+        media_type=STREAM_FORMATS[format],
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Disable proxy buffering (nginx)
+        }
+    )
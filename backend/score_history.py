@@ -0,0 +1,293 @@
+"""
+Score time-series storage
+Compact per-URL score history with hourly/daily downsampling and retention
+"""
+
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+SEVERITIES = ("critical", "high", "medium", "low")
+
+# Bucket resolutions: name -> length of the scan_date prefix that identifies a bucket
+RESOLUTIONS = {
+    "hour": 13,  # "YYYY-MM-DD HH"
+    "day": 10,   # "YYYY-MM-DD"
+}
+
+# How long each resolution is kept (None keeps forever)
+RETENTION_DAYS = {
+    "raw": 30,
+    "hour": 365,
+    "day": None,
+}
+
+# Retention runs at most this often while writing
+PRUNE_INTERVAL_SECONDS = 3600
+
+# "auto" resolution picks the finest series with at most this many points
+MAX_TREND_POINTS = 5000
+
+
+def bucket_key(timestamp: str, resolution: str) -> str:
+    """Bucket a 'YYYY-MM-DD HH:MM:SS' timestamp"""
+    return timestamp[:RESOLUTIONS[resolution]]
+
+
+class ScoreHistory:
+    """Score time-series operations on a caller-provided cursor"""
+    
+    @staticmethod
+    def create_schema(cursor: sqlite3.Cursor):
+        """Create the urls, score_points and score_buckets tables"""
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS urls (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL UNIQUE
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS score_points (
+                report_id INTEGER PRIMARY KEY,
+                url_id INTEGER NOT NULL,
+                ts TEXT NOT NULL,
+                score REAL NOT NULL,
+                critical INTEGER NOT NULL DEFAULT 0,
+                high INTEGER NOT NULL DEFAULT 0,
+                medium INTEGER NOT NULL DEFAULT 0,
+                low INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_score_points_url_ts ON score_points(url_id, ts)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_score_points_ts ON score_points(ts)
+        """)
+        # Sums (not averages) so removing a report can be applied exactly
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS score_buckets (
+                url_id INTEGER NOT NULL,
+                resolution TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                samples INTEGER NOT NULL DEFAULT 0,
+                score_sum REAL NOT NULL DEFAULT 0,
+                critical INTEGER NOT NULL DEFAULT 0,
+                high INTEGER NOT NULL DEFAULT 0,
+                medium INTEGER NOT NULL DEFAULT 0,
+                low INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (url_id, resolution, bucket)
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_score_buckets_bucket ON score_buckets(resolution, bucket)
+        """)
+    
+    def __init__(self):
+        self._last_prune = 0.0
+    
+    def record(self, cursor: sqlite3.Cursor, points: List[Dict[str, Any]]):
+        """
+        Add points to the raw series and the hourly/daily buckets
+        
+        Args:
+            points: Dicts with report_id, url, ts, score and a severity count per SEVERITIES
+        """
+        if not points:
+            return
+        cursor.executemany(
+            "INSERT OR IGNORE INTO urls (url) VALUES (?)",
+            [(point["url"],) for point in points]
+        )
+        cursor.executemany("""
+            INSERT OR REPLACE INTO score_points (report_id, url_id, ts, score, critical, high, medium, low)
+            VALUES (?, (SELECT id FROM urls WHERE url = ?), ?, ?, ?, ?, ?, ?)
+        """, [
+            (point["report_id"], point["url"], point["ts"], point["score"])
+            + tuple(point.get(severity, 0) for severity in SEVERITIES)
+            for point in points
+        ])
+        self._adjust_buckets(cursor, points, 1)
+    
+    def remove(self, cursor: sqlite3.Cursor, point: Dict[str, Any]):
+        """
+        Take a deleted report out of the raw series and its buckets
+        
+        Args:
+            point: Same shape as for record(); buckets are adjusted even if
+                the raw point has already been pruned
+        """
+        cursor.execute("DELETE FROM score_points WHERE report_id = ?", (point["report_id"],))
+        self._adjust_buckets(cursor, [point], -1)
+    
+    def _adjust_buckets(self, cursor: sqlite3.Cursor, points: List[Dict[str, Any]], sign: int):
+        rows = []
+        for point in points:
+            counts = tuple(sign * point.get(severity, 0) for severity in SEVERITIES)
+            for resolution in RESOLUTIONS:
+                rows.append((
+                    point["url"], resolution, bucket_key(point["ts"], resolution),
+                    sign, sign * point["score"]
+                ) + counts)
+        cursor.executemany("""
+            INSERT INTO score_buckets (url_id, resolution, bucket, samples, score_sum, critical, high, medium, low)
+            VALUES ((SELECT id FROM urls WHERE url = ?), ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url_id, resolution, bucket) DO UPDATE SET
+                samples = samples + excluded.samples,
+                score_sum = score_sum + excluded.score_sum,
+                critical = critical + excluded.critical,
+                high = high + excluded.high,
+                medium = medium + excluded.medium,
+                low = low + excluded.low
+        """, rows)
+        if sign < 0:
+            cursor.executemany("""
+                DELETE FROM score_buckets
+                WHERE url_id = (SELECT id FROM urls WHERE url = ?) AND resolution = ? AND bucket = ?
+                  AND samples <= 0
+            """, [row[:3] for row in rows])
+    
+    def prune(self, cursor: sqlite3.Cursor, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Apply RETENTION_DAYS; older raw points remain summarized in the buckets
+        
+        Returns:
+            Rows deleted per series
+        """
+        now = now or datetime.now(timezone.utc)
+        deleted = {}
+        for series, days in RETENTION_DAYS.items():
+            if days is None:
+                continue
+            cutoff = (now - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+            if series == "raw":
+                cursor.execute("DELETE FROM score_points WHERE ts < ?", (cutoff,))
+            else:
+                cursor.execute(
+                    "DELETE FROM score_buckets WHERE resolution = ? AND bucket < ?",
+                    (series, bucket_key(cutoff, series))
+                )
+            deleted[series] = cursor.rowcount
+        self._last_prune = now.timestamp()
+        return deleted
+    
+    def prune_due(self) -> bool:
+        """Whether PRUNE_INTERVAL_SECONDS have passed since the last prune"""
+        return datetime.now(timezone.utc).timestamp() - self._last_prune >= PRUNE_INTERVAL_SECONDS
+    
+    def rebuild(self, cursor: sqlite3.Cursor):
+        """Recompute the raw series and buckets from the reports table"""
+        cursor.execute("DELETE FROM score_points")
+        cursor.execute("DELETE FROM score_buckets")
+        cursor.execute("INSERT OR IGNORE INTO urls (url) SELECT DISTINCT url FROM reports")
+        cursor.execute("""
+            INSERT INTO score_points (report_id, url_id, ts, score, critical, high, medium, low)
+            SELECT r.id, u.id, r.scan_date, r.score,
+                   COALESCE(json_extract(r.severity_breakdown, '$.critical'), 0),
+                   COALESCE(json_extract(r.severity_breakdown, '$.high'), 0),
+                   COALESCE(json_extract(r.severity_breakdown, '$.medium'), 0),
+                   COALESCE(json_extract(r.severity_breakdown, '$.low'), 0)
+            FROM reports r JOIN urls u ON u.url = r.url
+        """)
+        for resolution, length in RESOLUTIONS.items():
+            cursor.execute("""
+                INSERT INTO score_buckets (url_id, resolution, bucket, samples, score_sum, critical, high, medium, low)
+                SELECT url_id, ?, substr(ts, 1, ?), COUNT(*), SUM(score),
+                       SUM(critical), SUM(high), SUM(medium), SUM(low)
+                FROM score_points
+                GROUP BY url_id, substr(ts, 1, ?)
+            """, (resolution, length, length))
+    
+    def trend(
+        self,
+        cursor: sqlite3.Cursor,
+        url: str,
+        resolution: str = "auto",
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        max_points: int = MAX_TREND_POINTS
+    ) -> Dict[str, Any]:
+        """
+        Score series for one URL
+        
+        Args:
+            url: Exact report URL
+            resolution: raw, hour, day, or auto (finest series with at most max_points)
+            since: Inclusive lower bound, 'YYYY-MM-DD[ HH:MM:SS]'
+            until: Exclusive upper bound, same format
+            max_points: Point budget for auto resolution, and the most points
+                returned at any resolution (the most recent ones)
+        
+        Returns:
+            Dict with the resolution used, points of
+            {t, score, samples, critical, high, medium, low} in time order, and
+            truncated (older points were left out to stay within max_points)
+        """
+        row = cursor.execute("SELECT id FROM urls WHERE url = ?", (url,)).fetchone()
+        if not row:
+            return {"resolution": resolution, "points": [], "truncated": False}
+        url_id = row[0]
+        
+        if resolution == "auto":
+            resolution = "day"
+            for candidate in ("raw", "hour"):
+                if (self._covers(cursor, url_id, candidate, since)
+                        and self._count(cursor, url_id, candidate, since, until) <= max_points):
+                    resolution = candidate
+                    break
+        elif resolution != "raw" and resolution not in RESOLUTIONS:
+            raise ValueError(f"resolution must be one of: auto, raw, {', '.join(RESOLUTIONS)}")
+        
+        column, table, where, params = self._series(url_id, resolution, since, until)
+        if resolution == "raw":
+            select = f"{column} AS t, score, 1 AS samples, critical, high, medium, low"
+        else:
+            select = f"{column} AS t, ROUND(score_sum / samples, 2) AS score, samples, critical, high, medium, low"
+        # Newest first, so a long range keeps its most recent points
+        cursor.execute(f"""
+            SELECT {select} FROM {table}
+            WHERE {where}
+            ORDER BY {column} DESC
+            LIMIT ?
+        """, params + [max_points + 1])
+        rows = cursor.fetchall()
+        
+        return {
+            "resolution": resolution,
+            "points": [dict(zip(("t", "score", "samples") + SEVERITIES, tuple(r))) for r in reversed(rows[:max_points])],
+            "truncated": len(rows) > max_points
+        }
+    
+    def _series(self, url_id: int, resolution: str, since: Optional[str], until: Optional[str]):
+        """Column, table, WHERE clause and parameters for one series"""
+        if resolution == "raw":
+            column, table, where, params = "ts", "score_points", "url_id = ?", [url_id]
+        else:
+            column, table = "bucket", "score_buckets"
+            where, params = "url_id = ? AND resolution = ?", [url_id, resolution]
+        if since:
+            where += f" AND {column} >= ?"
+            params.append(since if resolution == "raw" else bucket_key(since, resolution))
+        if until:
+            where += f" AND {column} < ?"
+            params.append(until)
+        return column, table, where, params
+    
+    def _covers(self, cursor: sqlite3.Cursor, url_id: int, series: str, since: Optional[str]) -> bool:
+        """Whether retention has kept everything this series would show from ``since`` on"""
+        days = RETENTION_DAYS[series]
+        if days is None:
+            return True
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+        if since and since >= cutoff:
+            return True
+        older = cursor.execute("""
+            SELECT 1 FROM score_buckets
+            WHERE url_id = ? AND resolution = 'day' AND bucket < ? AND bucket >= ?
+            LIMIT 1
+        """, (url_id, bucket_key(cutoff, "day"), since or "")).fetchone()
+        return older is None
+    
+    def _count(self, cursor: sqlite3.Cursor, url_id: int, resolution: str, since: Optional[str], until: Optional[str]) -> int:
+        _, table, where, params = self._series(url_id, resolution, since, until)
+        return cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}", params).fetchone()[0]
@@ -0,0 +1,147 @@
+"""
+Server metrics
+Request metrics middleware and scrape-time collectors for pools, queues and caches
+"""
+
+import time
+from typing import Callable, Dict, Iterable
+
+from services import color_utils, css_color
+from services.color_solver import solution_cache_stats
+from services.metrics import Counter, Family, Gauge, Histogram, register_collector, stats_family
+
+HTTP_REQUESTS = Counter("http_requests", "HTTP requests by route and status", ["method", "route", "status"])
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being served", ["method"])
+HTTP_SECONDS = Histogram("http_request_duration_seconds", "HTTP request latency by route", ["method", "route"])
+
+
+class MetricsMiddleware:
+    """
+    Counts and times every HTTP request
+    
+    Requests are labelled with the route template (/reports/{report_id},
+    not the raw path) so label cardinality stays bounded; unrouted
+    requests share the "unmatched" label. Add it last so it is outermost.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        status = 500
+        in_flight = HTTP_IN_FLIGHT.labels(method)
+        
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_flight.dec()
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUESTS.labels(method, route_path, status).inc()
+            HTTP_SECONDS.labels(method, route_path).observe(elapsed)
+
+
+def _cache_families(caches: Dict[str, Dict[str, int]]) -> Iterable[Family]:
+    """Hit, miss and hit-ratio families from {cache: {"hits": n, "misses": m}}"""
+    ratios = {
+        name: {"ratio": counts["hits"] / (counts["hits"] + counts["misses"])}
+        for name, counts in caches.items() if counts["hits"] + counts["misses"]
+    }
+    yield stats_family("cache_hits", "Cache hits", caches, "cache", "hits", "counter")
+    yield stats_family("cache_misses", "Cache misses", caches, "cache", "misses", "counter")
+    yield stats_family("cache_hit_ratio", "Cache hits / lookups since start", ratios, "cache", "ratio")
+
+
+def register_server_metrics(
+    database,
+    job_queue,
+    get_scanner: Callable[[], object],
+    admission_limits: Dict[str, object],
+    scan_flights
+):
+    """
+    Export the stats() of the server's shared components at scrape time
+    
+    Args:
+        database: AsyncDatabase (connection pool and report writer)
+        job_queue: ScanJobQueue
+        get_scanner: Returns the current scanner (or None before it is created)
+        admission_limits: Limit name -> AdmissionLimit
+        scan_flights: SingleFlight coalescing /scan-url
+    """
+    def collect() -> Iterable[Family]:
+        pool = database.database.pool.stats()
+        yield "db_pool_size", "gauge", "SQLite connections the pool may open", [({}, pool["size"])]
+        yield "db_pool_connections", "gauge", "SQLite connections by state", [
+            ({"state": state}, pool[state]) for state in ("open", "idle", "in_use")
+        ]
+        
+        writer = database.writer.stats()
+        yield "db_write_queue_depth", "gauge", "Reports queued for the batch writer", [({}, writer["queued"])]
+        yield "db_reports_written", "counter", "Reports persisted by the batch writer", [({}, writer["reports_written"])]
+        yield "db_report_write_failures", "counter", "Reports the batch writer failed to persist", [({}, writer["reports_failed"])]
+        yield "db_write_batches", "counter", "Write transactions committed by the batch writer", [({}, writer["batches_written"])]
+        
+        jobs = job_queue.stats()
+        yield "scan_job_workers", "gauge", "Background scan job workers by state", [
+            ({"state": "busy"}, jobs["busy"]), ({"state": "idle"}, jobs["workers"] - jobs["busy"])
+        ]
+        yield "scan_job_queue_depth", "gauge", "Background scan jobs waiting for a worker", [({}, jobs["queued"])]
+        
+        scanner = get_scanner()
+        if scanner is not None and hasattr(scanner, "stats"):
+            pool = scanner.stats()
+            yield "scan_pool_processes", "gauge", "Scan worker processes", [({}, pool["processes"])]
+            yield "scan_pool_busy", "gauge", "Scan worker processes running a scan", [({}, pool["busy"])]
+            yield "scan_pool_utilization", "gauge", "Busy / total scan worker processes", [
+                ({}, pool["busy"] / pool["processes"] if pool["processes"] else 0.0)
+            ]
+            yield "scans", "counter", "Scans by where they ran", [
+                ({"mode": "pooled"}, pool["pooled_scans"]), ({"mode": "inline"}, pool["inline_scans"])
+            ]
+        
+        admission = {name: limit.stats() for name, limit in admission_limits.items()}
+        yield stats_family("admission_active", "Requests holding an admission slot", admission, "limit", "active")
+        yield stats_family("admission_queued", "Requests waiting for an admission slot", admission, "limit", "queued")
+        yield stats_family("admission_capacity", "Concurrent admission slots", admission, "limit", "max_concurrent")
+        yield "admission_requests", "counter", "Admission outcomes by limit and priority class", [
+            ({"limit": limit, "class": name, "outcome": outcome}, count)
+            for limit, stats in admission.items()
+            for name, outcomes in stats["classes"].items()
+            for outcome, count in outcomes.items()
+        ]
+        
+        flights = scan_flights.stats()
+        yield "scan_coalesce_requests", "counter", "/scan-url requests by how they were served", [
+            ({"result": result}, flights[result]) for result in ("leaders", "coalesced", "grace_hits")
+        ]
+        yield "scan_coalesce_in_flight", "gauge", "Distinct URL scans in flight", [({}, flights["in_flight"])]
+        
+        caches = {
+            "parse_color": color_utils.parse_color.cache_info(),
+            "color_luminance": color_utils.color_luminance.cache_info(),
+            "css_color_value": css_color.parse_color_value.cache_info(),
+        }
+        counts = {name: {"hits": info.hits, "misses": info.misses} for name, info in caches.items()}
+        solver = solution_cache_stats()
+        counts["color_solver"] = {"hits": solver["hits"], "misses": solver["misses"]}
+        counts["scan_coalescing"] = {
+            "hits": flights["coalesced"] + flights["grace_hits"], "misses": flights["leaders"]
+        }
+        yield from _cache_families(counts)
+    
+    register_collector(collect)
@@ -0,0 +1,118 @@
+"""
+Server tracing
+Server-Timing response headers and an opt-in JSON-lines trace exporter
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+from fast_json import dumps
+from services import tracing
+
+# Trace export is off unless the server is started with TRACE_EXPORT=1; then
+# requests carrying this header (any value but "0"/"false") have their full
+# trace appended to TRACE_PATH and the response echoes the id in X-Trace-Id
+TRACE_EXPORT = os.environ.get("TRACE_EXPORT", "").strip().lower() in ("1", "true", "yes")
+TRACE_HEADER = "x-trace"
+TRACE_PATH = Path(__file__).parent / "traces.jsonl"
+
+# Size at which the trace file is rotated to TRACE_PATH.1 (one old file is kept)
+TRACE_MAX_BYTES = int(os.environ.get("TRACE_MAX_BYTES", 10 * 1024 * 1024))
+
+
+class JSONLinesExporter:
+    """Appends one JSON trace per line to a local file, rotating it at max_bytes"""
+    
+    def __init__(self, path: Path = TRACE_PATH, max_bytes: int = TRACE_MAX_BYTES):
+        """
+        Args:
+            path: Trace file
+            max_bytes: Size past which the file is renamed to <path>.1 and restarted
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+        self.exported = 0
+        self.rotations = 0
+    
+    def export(self, record: Dict[str, Any]):
+        """Append one trace (blocking file I/O; call from a worker thread)"""
+        line = dumps(record) + b"\n"
+        with self._lock:
+            if self._size is None:
+                self._size = self.path.stat().st_size if self.path.exists() else 0
+            if self._size and self._size + len(line) > self.max_bytes:
+                os.replace(self.path, self.path.with_name(self.path.name + ".1"))
+                self._size = 0
+                self.rotations += 1
+            with open(self.path, "ab") as f:
+                f.write(line)
+            self._size += len(line)
+            self.exported += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        return {"path": str(self.path), "exported": self.exported, "rotations": self.rotations}
+
+
+def _trace_requested(headers: Headers) -> bool:
+    value = headers.get(TRACE_HEADER)
+    return value is not None and value.strip().lower() not in ("0", "false", "")
+
+
+class TracingMiddleware:
+    """
+    Traces every HTTP request and reports its spans in Server-Timing
+    
+    Spans come from services.tracing.span (fetch and its sub-resources,
+    parsing, each rule, scoring, save_report). Streamed responses send their
+    headers before the scan runs, so their Server-Timing only has what
+    finished by then; the exported trace is always complete.
+    """
+    
+    def __init__(self, app, exporter: Optional[JSONLinesExporter] = None):
+        """
+        Args:
+            app: ASGI app
+            exporter: Destination of traces requested with TRACE_HEADER; defaults
+                to TRACE_PATH when TRACE_EXPORT is set, otherwise the header is ignored
+        """
+        self.app = app
+        if exporter is None and TRACE_EXPORT:
+            exporter = JSONLinesExporter()
+        self.exporter = exporter
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        export = self.exporter is not None and _trace_requested(Headers(scope=scope))
+        status = 500
+        
+        with tracing.start_trace(f"{scope['method']} {scope['path']}") as trace:
+            async def send_with_timing(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", trace.server_timing())
+                    if export:
+                        headers.append("X-Trace-Id", trace.trace_id)
+                await send(message)
+            
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                if export:
+                    record = trace.to_dict()
+                    record["status"] = status
+                    try:
+                        await run_in_threadpool(self.exporter.export, record)
+                    except OSError as e:
+                        print(f"⚠️  Failed to export trace {trace.trace_id}: {e}")
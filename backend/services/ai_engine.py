@@ -9,9 +9,12 @@ Handles AI-powered accessibility features:
 from typing import Optional, Dict, Any
 import re
 from PIL import Image
-import requests
+import httpx
 from io import BytesIO
 
+# Seconds allowed for downloading an image to describe
+IMAGE_DOWNLOAD_TIMEOUT = 10.0
+
 
 class AIEngine:
     """AI-powered accessibility analysis and generation"""
@@ -21,13 +24,19 @@ class AIEngine:
         # For now, use rule-based approaches that can be enhanced with real models
         pass
     
-    async def generate_alt_text(self, image_url: str, context: Optional[str] = None) -> str:
+    async def generate_alt_text(
+        self,
+        image_url: str,
+        context: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None
+    ) -> str:
         """
         Generate alt text for an image using AI captioning
         
         Args:
             image_url: URL of the image
             context: Optional context about the image
+            client: Optional shared HTTP client (batch fixes reuse its connections)
             
         Returns:
             Generated alt text description
@@ -36,9 +45,13 @@ class AIEngine:
             # In production: Use actual image captioning model (e.g., BLIP, CLIP, GPT-4 Vision)
             # For demo: Use rule-based approach
             
-            # Download image
+            # Download image without blocking the event loop
             try:
-                response = requests.get(image_url, timeout=10)
+                if client is not None:
+                    response = await client.get(image_url, timeout=IMAGE_DOWNLOAD_TIMEOUT)
+                else:
+                    async with httpx.AsyncClient(follow_redirects=True) as image_client:
+                        response = await image_client.get(image_url, timeout=IMAGE_DOWNLOAD_TIMEOUT)
                 image = Image.open(BytesIO(response.content))
                 
                 # Analyze image characteristics
@@ -3,12 +3,21 @@ Auto Fixer Service
 Generates automatic fixes for accessibility issues
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from bs4 import BeautifulSoup
+import httpx
 import re
 from .ai_engine import AIEngine
 from .contrast_analyzer import ContrastAnalyzer
 
+_STYLE_ATTR_RE = re.compile(r'style\s*=\s*(["\'])(.*?)\1', re.IGNORECASE | re.DOTALL)
+# Text color only; the lookbehind skips background-color / border-color
+_STYLE_COLOR_RE = re.compile(r'(?<![\w-])color\s*:\s*([^;]+)', re.IGNORECASE)
+_STYLE_BG_RE = re.compile(r'background(?:-color)?\s*:\s*([^;]+)', re.IGNORECASE)
+
+# Fixes that download the image (I/O-bound)
+IMAGE_FIX_TYPES = frozenset({"missing_alt_text", "empty_alt_text"})
+
 
 class AutoFixer:
     """Generates automatic code fixes for accessibility issues"""
@@ -37,46 +46,83 @@ class AutoFixer:
             Dictionary with fixed_code and explanation
         """
         try:
-            # Parse HTML
-            soup = BeautifulSoup(original_code, 'lxml')
-            element = soup.find('img') or soup.find('a') or soup.find('button') or soup.find()
-            
-            if not element:
-                return {
-                    "fixed_code": original_code,
-                    "explanation": "Could not parse element for fixing"
-                }
-            
-            fix_methods = {
-                "missing_alt_text": self._fix_missing_alt_text,
-                "empty_alt_text": self._fix_empty_alt_text,
-                "contrast_ratio": self._fix_contrast_ratio,
-                "missing_label": self._fix_missing_label,
-                "missing_aria_label": self._fix_missing_aria_label,
-                "semantic_html": self._fix_semantic_html,
-                "missing_lang": self._fix_missing_lang,
-                "heading_hierarchy": self._fix_heading_hierarchy,
-                "keyboard_navigation": self._fix_keyboard_navigation,
-                "focus_indicator": self._fix_focus_indicator,
-                "invalid_aria_role": self._fix_invalid_aria_role
-            }
-            
-            fix_method = fix_methods.get(issue_type)
-            
-            if fix_method:
-                return await fix_method(element, soup, original_code)
-            else:
-                return {
-                    "fixed_code": original_code,
-                    "explanation": f"Auto-fix not yet implemented for issue type: {issue_type}"
-                }
+            soup = self.parse_snippet(original_code)
+            return await self.apply_fix(issue_type, soup, original_code)
         except Exception as e:
             return {
                 "fixed_code": original_code,
                 "explanation": f"Error generating fix: {str(e)}"
             }
     
-    async def _fix_missing_alt_text(self, element, soup: BeautifulSoup, original: str) -> Dict[str, str]:
+    def parse_snippet(self, original_code: str) -> BeautifulSoup:
+        """Parse an issue's HTML snippet (fixes modify the returned tree)"""
+        return BeautifulSoup(original_code, 'lxml')
+    
+    def _target_element(self, soup: BeautifulSoup):
+        """Element a fix applies to: the first img/a/button, else the snippet's first element"""
+        element = soup.find('img') or soup.find('a') or soup.find('button')
+        if element:
+            return element
+        # lxml wraps fragments in <html><body>; the bare find() would return <html>
+        if soup.body is not None and soup.body.find():
+            return soup.body.find()
+        return soup.find()
+    
+    async def apply_fix(
+        self,
+        issue_type: str,
+        soup: BeautifulSoup,
+        original_code: str,
+        client: Optional[httpx.AsyncClient] = None
+    ) -> Dict[str, str]:
+        """
+        Apply the fix for issue_type to an already parsed snippet
+        
+        Args:
+            issue_type: Type of issue (missing_alt_text, contrast_ratio, etc.)
+            soup: Tree from parse_snippet (modified in place)
+            original_code: Original HTML code
+            client: Optional shared HTTP client for image downloads
+            
+        Returns:
+            Dictionary with fixed_code and explanation
+        """
+        element = self._target_element(soup)
+        
+        if not element:
+            return {
+                "fixed_code": original_code,
+                "explanation": "Could not parse element for fixing"
+            }
+        
+        fix_methods = {
+            "missing_alt_text": self._fix_missing_alt_text,
+            "empty_alt_text": self._fix_empty_alt_text,
+            "contrast_ratio": self._fix_contrast_ratio,
+            "missing_label": self._fix_missing_label,
+            "missing_aria_label": self._fix_missing_aria_label,
+            "semantic_html": self._fix_semantic_html,
+            "missing_lang": self._fix_missing_lang,
+            "heading_hierarchy": self._fix_heading_hierarchy,
+            "keyboard_navigation": self._fix_keyboard_navigation,
+            "focus_indicator": self._fix_focus_indicator,
+            "invalid_aria_role": self._fix_invalid_aria_role
+        }
+        
+        fix_method = fix_methods.get(issue_type)
+        
+        if not fix_method:
+            return {
+                "fixed_code": original_code,
+                "explanation": f"Auto-fix not yet implemented for issue type: {issue_type}"
+            }
+        if issue_type in IMAGE_FIX_TYPES:
+            return await fix_method(element, soup, original_code, client=client)
+        return await fix_method(element, soup, original_code)
+    
+    async def _fix_missing_alt_text(
+        self, element, soup: BeautifulSoup, original: str, client: Optional[httpx.AsyncClient] = None
+    ) -> Dict[str, str]:
         """Fix missing alt text"""
         if element.name == 'img':
             # Generate alt text using AI
@@ -85,7 +131,7 @@ class AutoFixer:
             context_text = context.get_text(strip=True) if context else None
             
             # Try to generate descriptive alt text
-            alt_text = await self.ai_engine.generate_alt_text(img_src, context_text)
+            alt_text = await self.ai_engine.generate_alt_text(img_src, context_text, client=client)
             
             element['alt'] = alt_text
             
@@ -96,7 +142,9 @@ class AutoFixer:
         
         return {"fixed_code": original, "explanation": "Element is not an image"}
     
-    async def _fix_empty_alt_text(self, element, soup: BeautifulSoup, original: str) -> Dict[str, str]:
+    async def _fix_empty_alt_text(
+        self, element, soup: BeautifulSoup, original: str, client: Optional[httpx.AsyncClient] = None
+    ) -> Dict[str, str]:
         """Fix empty alt text"""
         if element.name == 'img':
             img_src = element.get('src', '')
@@ -111,7 +159,7 @@ class AutoFixer:
                 }
             
             # Generate descriptive alt text
-            alt_text = await self.ai_engine.generate_alt_text(img_src, context_text)
+            alt_text = await self.ai_engine.generate_alt_text(img_src, context_text, client=client)
             element['alt'] = alt_text
             
             return {
@@ -127,24 +175,15 @@ class AutoFixer:
         style = element.get('style', '')
         
         # Try to find colors
-        color_match = re.search(r'color\s*:\s*([^;]+)', style, re.IGNORECASE)
-        bg_match = re.search(r'background(?:-color)?\s*:\s*([^;]+)', style, re.IGNORECASE)
+        text_color, bg_color = self._extract_style_colors(style)
         
-        if color_match and bg_match:
-            text_color = color_match.group(1).strip()
-            bg_color = bg_match.group(1).strip()
-            
+        if text_color and bg_color:
             # Get suggested color
             suggestion = await self.ai_engine.suggest_contrast_fix(text_color, bg_color)
             suggested_color = suggestion["suggested_color"]
             
             # Update style
-            new_style = re.sub(
-                r'color\s*:\s*[^;]+',
-                f'color: {suggested_color}',
-                style,
-                flags=re.IGNORECASE
-            )
+            new_style = _STYLE_COLOR_RE.sub(f'color: {suggested_color}', style, count=1)
             
             element['style'] = new_style
             
@@ -161,6 +200,42 @@ class AutoFixer:
                 "explanation": "Added high-contrast colors (black text on white background) to meet WCAG standards. Adjust colors as needed for your design."
             }
     
+    def _extract_style_colors(self, style: str) -> Tuple[Optional[str], Optional[str]]:
+        """Extract (text_color, bg_color) from an inline style attribute"""
+        color_match = _STYLE_COLOR_RE.search(style)
+        bg_match = _STYLE_BG_RE.search(style)
+        
+        text_color = color_match.group(1).strip() if color_match else None
+        bg_color = bg_match.group(1).strip() if bg_match else None
+        return text_color, bg_color
+    
+    def prepare_contrast_fixes(self, original_codes: List[str], min_ratio: float = 4.5) -> int:
+        """
+        Solve the color pairs of many contrast issues in one batch
+        
+        Results land in the shared solver cache, so the per-issue
+        _fix_contrast_ratio calls that follow are cache hits.
+        
+        Args:
+            original_codes: Original HTML snippets of contrast_ratio issues
+            min_ratio: Minimum contrast ratio required
+            
+        Returns:
+            Number of color pairs found
+        """
+        pairs = []
+        for code in original_codes:
+            style_match = _STYLE_ATTR_RE.search(code or "")
+            if not style_match:
+                continue
+            text_color, bg_color = self._extract_style_colors(style_match.group(2))
+            if text_color and bg_color:
+                pairs.append((text_color, bg_color))
+        
+        if pairs:
+            self.contrast_analyzer.suggest_accessible_colors(pairs, min_ratio)
+        return len(pairs)
+    
     async def _fix_missing_label(self, element, soup: BeautifulSoup, original: str) -> Dict[str, str]:
         """Fix missing form label"""
         if element.name not in ['input', 'select', 'textarea']:
@@ -0,0 +1,227 @@
+"""
+Accessible Color Solver
+Finds the closest hue-preserving color that meets a WCAG contrast ratio
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from .color_utils import RGB, LINEAR_LUT_ARRAY, luminance_array, resolve_color_pair
+
+# Bisection steps over OKLab lightness; 2**-20 is far below one 8-bit step
+SOLVER_ITERATIONS = 20
+
+SOLUTION_CACHE_SIZE = 4096
+
+_solution_cache: "OrderedDict[Tuple[RGB, RGB, float], RGB]" = OrderedDict()
+# Scans may run in worker threads; LRU bookkeeping is not atomic
+_cache_lock = threading.Lock()
+_cache_counts = {"hits": 0, "misses": 0}
+
+# OKLab matrices (Björn Ottosson), operating on linear sRGB in 0-1
+_LINEAR_TO_LMS = np.array([
+    [0.4122214708, 0.5363325363, 0.0514459929],
+    [0.2119034982, 0.6806995451, 0.1073969566],
+    [0.0883024619, 0.2817188376, 0.6299787005],
+])
+_LMS_TO_LAB = np.array([
+    [0.2104542553, 0.7936177850, -0.0040720468],
+    [1.9779984951, -2.4285922050, 0.4505937099],
+    [0.0259040371, 0.7827717662, -0.8086757660],
+])
+_LAB_TO_LMS = np.linalg.inv(_LMS_TO_LAB)
+_LMS_TO_LINEAR = np.linalg.inv(_LINEAR_TO_LMS)
+
+
+def target_luminance(bg_luminance: np.ndarray, min_ratio: np.ndarray, darker: np.ndarray) -> np.ndarray:
+    """
+    Foreground luminance that exactly reaches ``min_ratio`` against a background
+
+    From (L1 + 0.05) / (L2 + 0.05) = ratio, solved for the darker or the
+    lighter side. Values outside 0-1 mean that direction is infeasible.
+    """
+    return np.where(
+        darker,
+        (bg_luminance + 0.05) / min_ratio - 0.05,
+        min_ratio * (bg_luminance + 0.05) - 0.05
+    )
+
+
+def _srgb_to_oklab(rgb: np.ndarray) -> np.ndarray:
+    """(N, 3) integer sRGB to (N, 3) OKLab"""
+    linear = LINEAR_LUT_ARRAY[np.clip(rgb, 0, 255)]
+    lms = np.cbrt(linear @ _LINEAR_TO_LMS.T)
+    return lms @ _LMS_TO_LAB.T
+
+
+def _oklab_to_srgb(lab: np.ndarray) -> np.ndarray:
+    """(N, 3) OKLab to (N, 3) integer sRGB, clipped to the sRGB gamut"""
+    lms = (lab @ _LAB_TO_LMS.T) ** 3
+    linear = np.clip(lms @ _LMS_TO_LINEAR.T, 0.0, 1.0)
+    encoded = np.where(
+        linear <= 0.0031308,
+        linear * 12.92,
+        1.055 * np.power(linear, 1 / 2.4) - 0.055
+    )
+    return np.rint(encoded * 255.0).astype(np.int64)
+
+
+def _with_lightness(lab: np.ndarray, lightness: np.ndarray, darker: np.ndarray) -> np.ndarray:
+    """
+    Move colors to a new OKLab lightness, keeping hue
+
+    Chroma is scaled down towards the black or white end so the search
+    range always ends at pure black / pure white.
+    """
+    l0 = lab[:, 0]
+    scale = np.where(
+        darker,
+        np.divide(lightness, l0, out=np.zeros_like(l0), where=l0 > 0),
+        np.divide(1.0 - lightness, 1.0 - l0, out=np.zeros_like(l0), where=l0 < 1)
+    )
+    scale = np.clip(scale, 0.0, 1.0)
+    return np.column_stack([lightness, lab[:, 1] * scale, lab[:, 2] * scale])
+
+
+def solve_accessible_rgb_array(
+    foreground: np.ndarray,
+    background: np.ndarray,
+    min_ratio
+) -> np.ndarray:
+    """
+    Solve accessible text colors for many pairs in one vectorized pass
+
+    The target luminance is computed analytically from the background and the
+    required ratio, then OKLab lightness is bisected (hue preserved) to the
+    color closest to the original that still reaches it after 8-bit rounding.
+    Pairs that already pass are returned unchanged; pairs where neither
+    direction can reach the ratio fall back to black or white, whichever is
+    higher contrast.
+
+    Args:
+        foreground: Integer array of shape (N, 3)
+        background: Integer array of shape (N, 3)
+        min_ratio: Scalar or array of shape (N,)
+
+    Returns:
+        Integer array of shape (N, 3)
+    """
+    fg = np.asarray(foreground, dtype=np.int64).reshape(-1, 3)
+    bg = np.asarray(background, dtype=np.int64).reshape(-1, 3)
+    ratio = np.broadcast_to(np.asarray(min_ratio, dtype=np.float64), (len(fg),))
+
+    fg_lum = luminance_array(fg)
+    bg_lum = luminance_array(bg)
+
+    # Prefer moving in the direction the text already sits relative to the background
+    # unless only the other direction can reach the ratio
+    prefer_darker = fg_lum <= bg_lum
+    dark_ok = target_luminance(bg_lum, ratio, True) >= 0.0
+    light_ok = target_luminance(bg_lum, ratio, False) <= 1.0
+    darker = np.where(prefer_darker, dark_ok | ~light_ok, dark_ok & ~light_ok)
+    feasible = np.where(darker, dark_ok, light_ok)
+
+    def passes(candidate: np.ndarray) -> np.ndarray:
+        lum = luminance_array(candidate)
+        return (np.maximum(lum, bg_lum) + 0.05) / (np.minimum(lum, bg_lum) + 0.05) >= ratio
+
+    lab = _srgb_to_oklab(fg)
+    # Bisect between the original lightness (fails) and black/white (passes)
+    fail_l = lab[:, 0].copy()
+    pass_l = np.where(darker, 0.0, 1.0)
+    for _ in range(SOLVER_ITERATIONS):
+        mid = (fail_l + pass_l) / 2.0
+        ok = passes(_oklab_to_srgb(_with_lightness(lab, mid, darker)))
+        pass_l = np.where(ok, mid, pass_l)
+        fail_l = np.where(ok, fail_l, mid)
+
+    result = _oklab_to_srgb(_with_lightness(lab, pass_l, darker))
+
+    # Guard against rounding at the end of the search and infeasible pairs
+    extreme = np.where(darker[:, None], 0, 255)
+    result = np.where((passes(result) | ~feasible)[:, None], result, extreme)
+    best_extreme = np.where(
+        (1.05 / (bg_lum + 0.05) >= (bg_lum + 0.05) / 0.05)[:, None], 255, 0
+    )
+    result = np.where(feasible[:, None], result, np.broadcast_to(best_extreme, result.shape))
+
+    return np.where(passes(fg)[:, None], fg, result)
+
+
+def solve_accessible_rgb(foreground: RGB, background: RGB, min_ratio: float) -> RGB:
+    """Solve a single pair, memoized per (foreground, background, ratio)"""
+    key = (tuple(foreground), tuple(background), float(min_ratio))
+    with _cache_lock:
+        cached = _solution_cache.get(key)
+        if cached is not None:
+            _solution_cache.move_to_end(key)
+            _cache_counts["hits"] += 1
+            return cached
+    return solve_accessible_rgbs([key[0]], [key[1]], min_ratio)[0]
+
+
+def solve_accessible_rgbs(
+    foregrounds: Iterable[RGB],
+    backgrounds: Iterable[RGB],
+    min_ratio: float
+) -> List[RGB]:
+    """
+    Batch solve color pairs, deduplicating and sharing the solution cache
+
+    Returns:
+        List of RGB tuples, one per input pair
+    """
+    min_ratio = float(min_ratio)
+    keys = [(tuple(f), tuple(b), min_ratio) for f, b in zip(foregrounds, backgrounds)]
+
+    known = {}
+    with _cache_lock:
+        for key in keys:
+            if key in _solution_cache:
+                _solution_cache.move_to_end(key)
+                known[key] = _solution_cache[key]
+        _cache_counts["hits"] += len(known)
+    missing = [k for k in dict.fromkeys(keys) if k not in known]
+
+    if missing:
+        solved = solve_accessible_rgb_array(
+            np.array([k[0] for k in missing]),
+            np.array([k[1] for k in missing]),
+            min_ratio
+        )
+        with _cache_lock:
+            _cache_counts["misses"] += len(missing)
+            for key, rgb in zip(missing, solved):
+                known[key] = _solution_cache[key] = tuple(int(c) for c in rgb)
+                if len(_solution_cache) > SOLUTION_CACHE_SIZE:
+                    _solution_cache.popitem(last=False)
+
+    return [known[key] for key in keys]
+
+
+def solution_cache_stats() -> Dict[str, int]:
+    """Hit/miss counts and size of the solution cache"""
+    with _cache_lock:
+        return dict(_cache_counts, size=len(_solution_cache))
+
+
+def rgb_to_hex(rgb: RGB) -> str:
+    """Format an RGB tuple as a lowercase hex color"""
+    return "#{:02x}{:02x}{:02x}".format(*rgb)
+
+
+def suggest_accessible_hex(
+    pairs: Iterable[Tuple[str, str]],
+    min_ratio: float = 4.5
+) -> List[Optional[str]]:
+    """
+    Suggest accessible text colors for (text_color, bg_color) string pairs
+
+    Returns:
+        Hex color per pair, or None where either color could not be parsed
+    """
+    resolved = [resolve_color_pair(fg, bg) for fg, bg in pairs]
+    valid = [p for p in resolved if p is not None]
+    solved = iter(solve_accessible_rgbs([p[0] for p in valid], [p[1] for p in valid], min_ratio))
+    return [rgb_to_hex(next(solved)) if p is not None else None for p in resolved]
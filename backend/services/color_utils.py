@@ -0,0 +1,208 @@
+"""
+Color Utilities
+Shared color parsing, relative luminance and WCAG contrast math
+"""
+
+from functools import lru_cache
+from typing import Mapping, Optional, Tuple
+import numpy as np
+from . import css_color
+
+
+RGB = Tuple[int, int, int]
+
+# Bound for the per-process color string caches. Pages reuse a small palette,
+# so a few thousand entries comfortably covers a scan while staying small.
+COLOR_CACHE_SIZE = 4096
+
+def _channel_to_linear(value: int) -> float:
+    """sRGB channel (0-255) to linear light, per WCAG 2.1 relative luminance"""
+    c = value / 255.0
+    if c <= 0.03928:
+        return c / 12.92
+    return ((c + 0.055) / 1.055) ** 2.4
+
+
+# Precomputed linearization of every 8-bit channel value
+LINEAR_LUT: Tuple[float, ...] = tuple(_channel_to_linear(v) for v in range(256))
+
+
+LINEAR_LUT_ARRAY = np.array(LINEAR_LUT, dtype=np.float64)
+
+_LUMINANCE_WEIGHTS = np.array([0.2126, 0.7152, 0.0722], dtype=np.float64)
+
+
+def relative_luminance(r: int, g: int, b: int) -> float:
+    """
+    Calculate relative luminance of an RGB color
+    Formula from WCAG 2.1: https://www.w3.org/WAI/GL/wiki/Relative_luminance
+    """
+    try:
+        return 0.2126 * LINEAR_LUT[r] + 0.7152 * LINEAR_LUT[g] + 0.0722 * LINEAR_LUT[b]
+    except (IndexError, TypeError):
+        # Non-integer or out-of-range channels fall back to the exact formula
+        return (
+            0.2126 * _channel_to_linear(r)
+            + 0.7152 * _channel_to_linear(g)
+            + 0.0722 * _channel_to_linear(b)
+        )
+
+
+def contrast_from_luminance(lum1: float, lum2: float) -> float:
+    """Contrast ratio (1.0 to 21.0) between two relative luminances"""
+    if lum1 < lum2:
+        lum1, lum2 = lum2, lum1
+    return (lum1 + 0.05) / (lum2 + 0.05)
+
+
+def rgb_contrast_ratio(rgb1: RGB, rgb2: RGB) -> float:
+    """Contrast ratio (1.0 to 21.0) between two RGB tuples"""
+    return contrast_from_luminance(relative_luminance(*rgb1), relative_luminance(*rgb2))
+
+
+def composite_over(fg: np.ndarray, bg: np.ndarray) -> np.ndarray:
+    """
+    Alpha-composite RGBA colors over RGB(A) backgrounds
+
+    Args:
+        fg: Array of shape (N, 3) or (N, 4). Alpha is 0-255 for integer
+            arrays and 0-1 for float arrays
+        bg: Array of shape (N, 3) or (N, 4); background alpha is ignored
+
+    Returns:
+        Array of shape (N, 3) with channels in 0-255. Opaque input is
+        returned unchanged so integer arrays keep the lookup-table path.
+    """
+    fg = np.asarray(fg)
+    if fg.shape[-1] < 4:
+        return fg
+    alpha = fg[..., 3:4].astype(np.float64)
+    if np.issubdtype(fg.dtype, np.integer):
+        alpha = alpha / 255.0
+    bg = np.asarray(bg, dtype=np.float64)[..., :3]
+    return fg[..., :3] * alpha + bg * (1.0 - alpha)
+
+
+def luminance_array(rgb: np.ndarray) -> np.ndarray:
+    """
+    Relative luminance for an (N, 3) array of 0-255 channel values
+
+    Integer arrays are linearized through the lookup table; float arrays
+    (e.g. after alpha compositing) use the exact formula.
+    """
+    rgb = np.asarray(rgb)
+    if np.issubdtype(rgb.dtype, np.integer):
+        linear = LINEAR_LUT_ARRAY[np.clip(rgb, 0, 255)]
+    else:
+        c = np.clip(rgb, 0.0, 255.0) / 255.0
+        linear = np.where(c <= 0.03928, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    return linear @ _LUMINANCE_WEIGHTS
+
+
+def contrast_ratio_array(fg: np.ndarray, bg: np.ndarray) -> np.ndarray:
+    """Vectorized contrast ratios for paired (N, 3|4) foreground/background arrays"""
+    fg = composite_over(fg, bg)
+    lum_fg = luminance_array(fg)
+    lum_bg = luminance_array(np.asarray(bg)[..., :3])
+    return (np.maximum(lum_fg, lum_bg) + 0.05) / (np.minimum(lum_fg, lum_bg) + 0.05)
+
+
+def hex_to_rgb(hex_color: str) -> RGB:
+    """Convert hex color to RGB tuple"""
+    hex_color = hex_color.lstrip('#')
+    if len(hex_color) == 3:
+        hex_color = ''.join([c * 2 for c in hex_color])
+    return tuple(int(hex_color[i:i + 2], 16) for i in (0, 2, 4))
+
+
+@lru_cache(maxsize=COLOR_CACHE_SIZE)
+def parse_color(color: str) -> Optional[RGB]:
+    """
+    Parse a CSS color string to an RGB tuple
+
+    Accepts the full grammar of css_color.parse_color_value; alpha is
+    dropped. Use resolve_color_pair to composite translucent colors.
+    Results are memoized per color string.
+
+    Returns:
+        RGB tuple, or None if the color could not be parsed
+    """
+    color = css_color.parse_color_value(color)
+    if color is None or color == css_color.CURRENT_COLOR:
+        return None
+    return (int(round(color[0])), int(round(color[1])), int(round(color[2])))
+
+
+@lru_cache(maxsize=COLOR_CACHE_SIZE)
+def color_luminance(color: str) -> Optional[float]:
+    """Relative luminance of a CSS color string, memoized per string"""
+    rgb = parse_color(color)
+    if rgb is None:
+        return None
+    return relative_luminance(*rgb)
+
+
+def resolve_color_pair(
+    text_color: str,
+    bg_color: str,
+    variables: Optional[Mapping[str, str]] = None
+) -> Optional[Tuple[RGB, RGB]]:
+    """
+    Resolve a text/background color pair to the opaque colors that are seen
+
+    var() references are looked up in ``variables``; the background is
+    flattened over a white canvas and the text composited over that
+    background. ``currentColor`` means black for text and the text color
+    for the background.
+
+    Returns:
+        Tuple of (text RGB, background RGB), or None if either is unresolvable
+    """
+    text = css_color.resolve_color(text_color, variables)
+    if text is None:
+        return None
+    bg = css_color.resolve_color(bg_color, variables, current_color=text)
+    if bg is None:
+        return None
+    bg_rgb = css_color.to_opaque_rgb(bg)
+    text_rgb = css_color.to_opaque_rgb(text, (float(bg_rgb[0]), float(bg_rgb[1]), float(bg_rgb[2]), 1.0))
+    return text_rgb, bg_rgb
+
+
+def contrast_ratio(
+    color1: str,
+    color2: str,
+    variables: Optional[Mapping[str, str]] = None
+) -> Optional[float]:
+    """
+    Contrast ratio between a text color and a background color
+
+    Opaque, variable-free colors take the cached-luminance fast path;
+    anything else is resolved and composited via resolve_color_pair.
+
+    Returns:
+        Contrast ratio (1.0 to 21.0), or None if either color is unresolvable
+    """
+    if _is_plain_opaque(color1) and _is_plain_opaque(color2):
+        lum1 = color_luminance(color1)
+        lum2 = color_luminance(color2)
+        if lum1 is not None and lum2 is not None:
+            return contrast_from_luminance(lum1, lum2)
+
+    pair = resolve_color_pair(color1, color2, variables)
+    if pair is None:
+        return None
+    return rgb_contrast_ratio(*pair)
+
+
+def _is_plain_opaque(color: str) -> bool:
+    """True when a color string parses on its own to a fully opaque color"""
+    parsed = css_color.parse_color_value(color) if color else None
+    return parsed is not None and parsed != css_color.CURRENT_COLOR and parsed[3] >= 1.0
+
+
+def clear_color_caches():
+    """Drop all memoized color parses and luminances"""
+    css_color.parse_color_value.cache_clear()
+    parse_color.cache_clear()
+    color_luminance.cache_clear()
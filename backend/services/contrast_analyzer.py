@@ -3,141 +3,201 @@ Color Contrast Analyzer
 Analyzes color contrast ratios for WCAG compliance
 """
 
-from typing import Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 import re
-import webcolors
+import numpy as np
 # Note: ColorThief can be used for extracting dominant colors from images
 # For now, we focus on CSS color analysis
 # from colorthief import ColorThief
 import io
 from PIL import Image
+from . import color_solver, color_utils, css_cascade
 
 
 class ContrastAnalyzer:
     """Analyzes color contrast ratios between text and background"""
     
     def __init__(self):
-        pass
+        # (css, index) of the last stylesheet, swapped as one value so
+        # concurrent scans in worker threads never pair an index with the wrong CSS
+        self._stylesheet_index: Optional[Tuple[str, css_cascade.StyleSheetIndex]] = None
     
     def hex_to_rgb(self, hex_color: str) -> Tuple[int, int, int]:
         """Convert hex color to RGB tuple"""
-        hex_color = hex_color.lstrip('#')
-        if len(hex_color) == 3:
-            hex_color = ''.join([c*2 for c in hex_color])
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+        return color_utils.hex_to_rgb(hex_color)
     
     def rgb_to_luminance(self, r: int, g: int, b: int) -> float:
         """
         Calculate relative luminance of a color
         Formula from WCAG 2.1: https://www.w3.org/WAI/GL/wiki/Relative_luminance
         """
-        def to_linear(c):
-            c = c / 255.0
-            if c <= 0.03928:
-                return c / 12.92
-            else:
-                return ((c + 0.055) / 1.055) ** 2.4
-        
-        r_linear = to_linear(r)
-        g_linear = to_linear(g)
-        b_linear = to_linear(b)
-        
-        return 0.2126 * r_linear + 0.7152 * g_linear + 0.0722 * b_linear
+        return color_utils.relative_luminance(r, g, b)
     
-    def calculate_contrast_ratio(self, color1: str, color2: str) -> float:
+    def calculate_contrast_ratio(
+        self,
+        color1: str,
+        color2: str,
+        variables: Optional[Dict[str, str]] = None
+    ) -> float:
         """
         Calculate contrast ratio between two colors
         
         Args:
-            color1: First color (hex, rgb, or named color)
-            color2: Second color (hex, rgb, or named color)
+            color1: Text color (any CSS color, including hsl(), alpha and var())
+            color2: Background color; translucent text is composited over it
+            variables: Optional custom property map from get_css_variables
             
         Returns:
             Contrast ratio (1.0 to 21.0)
         """
         try:
-            # Convert colors to RGB
-            rgb1 = self._parse_color(color1)
-            rgb2 = self._parse_color(color2)
+            # Parsed colors and their luminances are cached per color string
+            ratio = color_utils.contrast_ratio(color1, color2, variables)
             
-            if not rgb1 or not rgb2:
+            if ratio is None:
                 return 1.0  # Default to lowest ratio if parsing fails
             
-            # Calculate relative luminance
-            lum1 = self.rgb_to_luminance(*rgb1)
-            lum2 = self.rgb_to_luminance(*rgb2)
-            
-            # Ensure lighter color is in numerator
-            lighter = max(lum1, lum2)
-            darker = min(lum1, lum2)
-            
-            # Calculate contrast ratio
-            ratio = (lighter + 0.05) / (darker + 0.05)
-            
             return round(ratio, 2)
         except Exception:
             return 1.0
     
+    def calculate_contrast_ratios(
+        self,
+        foreground: np.ndarray,
+        background: np.ndarray,
+        large_text: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Calculate contrast ratios and WCAG pass masks for many color pairs at once
+        
+        Args:
+            foreground: Array of shape (N, 3) or (N, 4) with RGB(A) text colors
+            background: Array of shape (N, 3) or (N, 4) with RGB(A) backgrounds
+            large_text: Optional boolean array of shape (N,) marking large text
+            
+        Returns:
+            Dictionary with ``ratios`` (rounded like calculate_contrast_ratio),
+            ``required_aa``, ``aa_pass`` and ``aaa_pass`` arrays of shape (N,)
+        """
+        ratios = np.round(color_utils.contrast_ratio_array(foreground, background), 2)
+        
+        if large_text is None:
+            large_text = np.zeros(ratios.shape, dtype=bool)
+        else:
+            large_text = np.asarray(large_text, dtype=bool)
+        
+        required_aa = np.where(large_text, 3.0, 4.5)
+        required_aaa = np.where(large_text, 4.5, 7.0)
+        
+        return {
+            "ratios": ratios,
+            "required_aa": required_aa,
+            "aa_pass": ratios >= required_aa,
+            "aaa_pass": ratios >= required_aaa
+        }
+    
+    def parse_colors(self, colors: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Parse color strings into an RGB array for the batch API
+        
+        Returns:
+            Tuple of (integer array of shape (N, 3), boolean mask of parsed rows).
+            Unparseable colors are left as black and flagged False in the mask.
+        """
+        colors = list(colors)
+        rgb = np.zeros((len(colors), 3), dtype=np.int32)
+        valid = np.zeros(len(colors), dtype=bool)
+        for i, color in enumerate(colors):
+            parsed = color_utils.parse_color(color)
+            if parsed is not None:
+                rgb[i] = parsed
+                valid[i] = True
+        return rgb, valid
+    
+    def resolve_color_pairs(
+        self,
+        pairs: Iterable[Tuple[str, str]],
+        variables: Optional[Dict[str, str]] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Resolve (text_color, bg_color) pairs into opaque RGB arrays for the batch API
+        
+        var() references, currentColor and alpha are resolved the same way
+        as in calculate_contrast_ratio.
+        
+        Returns:
+            Tuple of (text array (N, 3), background array (N, 3), boolean mask
+            of resolved rows). Unresolvable rows are left black.
+        """
+        pairs = list(pairs)
+        fg = np.zeros((len(pairs), 3), dtype=np.int32)
+        bg = np.zeros((len(pairs), 3), dtype=np.int32)
+        valid = np.zeros(len(pairs), dtype=bool)
+        for i, (text_color, bg_color) in enumerate(pairs):
+            resolved = color_utils.resolve_color_pair(text_color, bg_color, variables)
+            if resolved is not None:
+                fg[i], bg[i] = resolved
+                valid[i] = True
+        return fg, bg, valid
+    
+    def get_css_variables(self, css: str) -> Dict[str, str]:
+        """Custom property map of a stylesheet, taken from its cached index"""
+        return self.style_resolver(css).index.variables
+    
     def _parse_color(self, color: str) -> Optional[Tuple[int, int, int]]:
         """Parse color string to RGB tuple"""
-        if not color:
-            return None
-        
-        color = color.strip().lower()
+        return color_utils.parse_color(color)
+    
+    def style_resolver(self, css: str) -> css_cascade.StyleResolver:
+        """
+        Create a computed-style resolver for one document
         
-        # Try named colors
-        try:
-            rgb = webcolors.name_to_rgb(color)
-            return (rgb.red, rgb.green, rgb.blue)
-        except:
-            pass
-        
-        # Try hex color
-        if color.startswith('#'):
-            try:
-                return self.hex_to_rgb(color)
-            except:
-                pass
-        
-        # Try rgb/rgba format
-        rgb_match = re.match(r'rgba?\((\d+),\s*(\d+),\s*(\d+)', color)
-        if rgb_match:
-            return tuple(int(x) for x in rgb_match.groups())
-        
-        return None
+        The stylesheet index is built once per distinct CSS string and reused
+        across calls; the resolver caches styles of the document's elements.
+        """
+        cached = self._stylesheet_index
+        if cached is None or cached[0] != css:
+            cached = (css, css_cascade.StyleSheetIndex(css or ""))
+            self._stylesheet_index = cached
+        return cached[1].resolver()
     
     def extract_colors(
         self,
         inline_style: str,
         css: str,
-        element
+        element,
+        resolver: Optional[css_cascade.StyleResolver] = None
     ) -> Tuple[Optional[str], Optional[str]]:
         """
         Extract background and text colors from styles
         
+        Colors are computed through the CSS cascade (stylesheet rules,
+        inline styles, inheritance and ancestor backgrounds).
+        
         Args:
-            inline_style: Inline style attribute
+            inline_style: Inline style attribute (used when no element is given)
             css: CSS content
             element: BeautifulSoup element
+            resolver: Optional per-document resolver from style_resolver
             
         Returns:
             Tuple of (background_color, text_color)
         """
+        if element is not None and getattr(element, 'name', None):
+            style = (resolver or self.style_resolver(css)).computed_style(element)
+            return style.background_string(), style.text_color_string()
+        
         text_color = None
         bg_color = None
         
         # Extract from inline styles
         if inline_style:
-            color_match = re.search(r'color\s*:\s*([^;]+)', inline_style, re.IGNORECASE)
-            if color_match:
-                text_color = color_match.group(1).strip()
-            
-            bg_match = re.search(r'background(?:-color)?\s*:\s*([^;]+)', inline_style, re.IGNORECASE)
-            if bg_match:
-                bg_color = bg_match.group(1).strip()
+            declarations = css_cascade.parse_declarations(inline_style)
+            if 'color' in declarations:
+                text_color = declarations['color'][0]
+            if 'background-color' in declarations:
+                bg_color = declarations['background-color'][0]
         
-        # If colors not found, try to get from CSS
-        # For simplicity, default to common values
         if not text_color:
             text_color = "#000000"  # Default black text
         if not bg_color:
@@ -145,11 +205,14 @@ class ContrastAnalyzer:
         
         return bg_color, text_color
     
-    def is_large_text(self, element) -> bool:
+    def is_large_text(self, element, resolver: Optional[css_cascade.StyleResolver] = None) -> bool:
         """
         Determine if text is considered "large text" for WCAG
         Large text is 18pt+ or 14pt+ bold
         """
+        if resolver is not None:
+            return resolver.computed_style(element).is_large_text
+        
         # Check font-size in style attribute
         style = element.get('style', '')
         font_size_match = re.search(r'font-size\s*:\s*(\d+(?:\.\d+)?)(px|pt|em|rem)', style, re.IGNORECASE)
@@ -181,6 +244,9 @@ class ContrastAnalyzer:
         """
         Suggest an accessible color that meets contrast requirements
         
+        The hue of the current color is preserved; only its lightness is
+        adjusted until the required ratio is reached (see color_solver).
+        
         Args:
             current_color: Current text color
             bg_color: Background color
@@ -189,31 +255,33 @@ class ContrastAnalyzer:
         Returns:
             Suggested accessible color (hex)
         """
-        current_rgb = self._parse_color(current_color)
-        bg_rgb = self._parse_color(bg_color)
+        resolved = color_utils.resolve_color_pair(current_color, bg_color)
         
-        if not current_rgb or not bg_rgb:
+        if not resolved:
             return current_color
         
-        bg_lum = self.rgb_to_luminance(*bg_rgb)
-        
-        # If background is light, use darker text; if dark, use lighter text
-        if bg_lum > 0.5:
-            # Light background - need dark text
-            # Try progressively darker grays
-            for gray in range(0, 100, 10):
-                test_color = f"#{gray:02x}{gray:02x}{gray:02x}"
-                ratio = self.calculate_contrast_ratio(test_color, bg_color)
-                if ratio >= min_ratio:
-                    return test_color
-            return "#000000"
-        else:
-            # Dark background - need light text
-            # Try progressively lighter grays
-            for gray in range(255, 150, -10):
-                test_color = f"#{gray:02x}{gray:02x}{gray:02x}"
-                ratio = self.calculate_contrast_ratio(test_color, bg_color)
-                if ratio >= min_ratio:
-                    return test_color
-            return "#FFFFFF"
-
+        current_rgb, bg_rgb = resolved
+        return color_solver.rgb_to_hex(
+            color_solver.solve_accessible_rgb(current_rgb, bg_rgb, min_ratio)
+        )
+    
+    def suggest_accessible_colors(
+        self,
+        pairs: List[Tuple[str, str]],
+        min_ratio: float = 4.5
+    ) -> List[str]:
+        """
+        Suggest accessible colors for many (text_color, bg_color) pairs at once
+        
+        Args:
+            pairs: List of (current_color, bg_color) tuples
+            min_ratio: Minimum contrast ratio required
+            
+        Returns:
+            Suggested color per pair; unparseable pairs keep their current color
+        """
+        suggestions = color_solver.suggest_accessible_hex(pairs, min_ratio)
+        return [
+            suggestion if suggestion is not None else current_color
+            for suggestion, (current_color, _) in zip(suggestions, pairs)
+        ]
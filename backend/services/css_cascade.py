@@ -0,0 +1,800 @@
+"""
+CSS Cascade Engine
+Indexes a stylesheet once and computes color, background and font-size for
+elements using selector matching, specificity and inheritance
+"""
+
+import itertools
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+import re
+from . import css_color
+
+
+# Pseudo-classes that describe an interaction state; rules using them do not
+# apply to the default rendering we evaluate
+_DYNAMIC_PSEUDOS = {
+    "hover", "focus", "focus-visible", "focus-within", "active", "visited",
+    "target", "checked", "disabled", "enabled", "invalid", "valid", "placeholder-shown"
+}
+
+ROOT_FONT_PX = 16.0
+
+_FONT_SIZE_KEYWORDS = {
+    "xx-small": 9.0, "x-small": 10.0, "small": 13.0, "medium": 16.0,
+    "large": 18.0, "x-large": 24.0, "xx-large": 32.0, "xxx-large": 48.0
+}
+
+# User agent defaults that matter for contrast: heading sizes and bold text
+_UA_FONT_SCALE = {"h1": 2.0, "h2": 1.5, "h3": 1.17, "h4": 1.0, "h5": 0.83, "h6": 0.67, "small": 0.83}
+_UA_BOLD = {"h1", "h2", "h3", "h4", "h5", "h6", "b", "strong", "th"}
+
+_FONT_WEIGHT_KEYWORDS = {"normal": 400, "bold": 700, "lighter": 300, "bolder": 700}
+
+# Ancestor bloom filter: 2 bits per key in a 256-bit integer
+_BLOOM_BITS = 256
+
+# Upper bound for the (signature, parent) -> style memo
+STYLE_MEMO_SIZE = 50000
+
+_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+_NUMBER_UNIT_RE = re.compile(r'^(-?\d*\.?\d+)([a-z%]*)$')
+
+
+def _bloom_bits(key: str) -> int:
+    h = hash(key)
+    return (1 << (h % _BLOOM_BITS)) | (1 << ((h >> 8) % _BLOOM_BITS))
+
+
+class _Compound:
+    """One compound selector, e.g. ``div.card#main[role=button]:first-child``"""
+
+    __slots__ = ("tag", "id", "classes", "attrs", "pseudos", "negations")
+
+    def __init__(self):
+        self.tag: Optional[str] = None
+        self.id: Optional[str] = None
+        self.classes: List[str] = []
+        self.attrs: List[Tuple[str, Optional[str], Optional[str]]] = []
+        self.pseudos: List[str] = []
+        self.negations: List["_Compound"] = []
+
+    def specificity(self) -> Tuple[int, int, int]:
+        ids = 1 if self.id else 0
+        classes = len(self.classes) + len(self.attrs) + len(self.pseudos)
+        types = 1 if self.tag else 0
+        for negation in self.negations:
+            n_ids, n_classes, n_types = negation.specificity()
+            ids += n_ids
+            classes += n_classes
+            types += n_types
+        return (ids, classes, types)
+
+    def matches(self, element, siblings: "_SiblingIndex") -> bool:
+        if self.tag and element.name != self.tag:
+            return False
+        if self.id and element.get("id") != self.id:
+            return False
+        if self.classes:
+            element_classes = element.get("class") or ()
+            for cls in self.classes:
+                if cls not in element_classes:
+                    return False
+        for name, op, value in self.attrs:
+            if not _match_attr(element, name, op, value):
+                return False
+        for pseudo in self.pseudos:
+            if not _match_pseudo(element, pseudo, siblings):
+                return False
+        for negation in self.negations:
+            if negation.matches(element, siblings):
+                return False
+        return True
+
+
+def _match_attr(element, name: str, op: Optional[str], value: Optional[str]) -> bool:
+    actual = element.get(name)
+    if actual is None:
+        return False
+    if op is None:
+        return True
+    if isinstance(actual, list):
+        actual = " ".join(actual)
+    if op == "=":
+        return actual == value
+    if op == "~=":
+        return value in actual.split()
+    if op == "|=":
+        return actual == value or actual.startswith(value + "-")
+    if op == "^=":
+        return bool(value) and actual.startswith(value)
+    if op == "$=":
+        return bool(value) and actual.endswith(value)
+    if op == "*=":
+        return bool(value) and value in actual
+    return False
+
+
+class _SiblingIndex:
+    """
+    Element children per parent, listed once per document
+
+    Structural pseudo-classes and sibling combinators look up positions here
+    instead of rescanning the sibling list for every element, which would be
+    quadratic on wide lists (thousands of <li> or <tr>).
+    """
+
+    def __init__(self):
+        self._children: Dict[int, Tuple[list, Dict[int, int]]] = {}
+        self._earliest: Dict[tuple, int] = {}
+
+    def _entry(self, parent) -> Tuple[list, Dict[int, int]]:
+        entry = self._children.get(id(parent))
+        if entry is None:
+            # The list keeps the children (and through them the parent) alive, so ids stay unique
+            children = [child for child in parent.children if getattr(child, "name", None)]
+            entry = (children, {id(child): i for i, child in enumerate(children)})
+            self._children[id(parent)] = entry
+        return entry
+
+    def position(self, element) -> Tuple[int, int]:
+        """(index among the parent's element children, number of element children)"""
+        if element.parent is None:
+            return 0, 1
+        children, positions = self._entry(element.parent)
+        return positions[id(element)], len(children)
+
+    def previous(self, element):
+        """Preceding element sibling, or None"""
+        if element.parent is None:
+            return None
+        children, positions = self._entry(element.parent)
+        index = positions[id(element)]
+        return children[index - 1] if index > 0 else None
+
+    def earliest(self, element, key: tuple, predicate: Callable) -> int:
+        """Index of the first sibling of element satisfying predicate, evaluated once per parent and key"""
+        if element.parent is None:
+            return 0 if predicate(element) else 1
+        children, _ = self._entry(element.parent)
+        cache_key = (id(element.parent),) + key
+        index = self._earliest.get(cache_key)
+        if index is None:
+            index = next((i for i, child in enumerate(children) if predicate(child)), len(children))
+            self._earliest[cache_key] = index
+        return index
+
+
+def _match_pseudo(element, pseudo: str, siblings: _SiblingIndex) -> bool:
+    if pseudo == "root":
+        return element.parent is None or element.parent.name == "[document]"
+    if pseudo in ("link", "any-link"):
+        return element.name in ("a", "area") and element.get("href") is not None
+    index, count = siblings.position(element)
+    if pseudo == "first-child":
+        return index == 0
+    if pseudo == "last-child":
+        return index == count - 1
+    if pseudo == "only-child":
+        return count == 1
+    return False
+
+
+class _Selector:
+    """A complex selector stored right-to-left: compounds[0] is the subject"""
+
+    __slots__ = ("compounds", "combinators", "specificity", "ancestor_bloom")
+
+    def __init__(self, compounds: List[_Compound], combinators: List[str]):
+        # combinators[i] joins compounds[i] (right) to compounds[i + 1] (left)
+        self.compounds = compounds
+        self.combinators = combinators
+        ids = classes = types = 0
+        for compound in compounds:
+            c_ids, c_classes, c_types = compound.specificity()
+            ids += c_ids
+            classes += c_classes
+            types += c_types
+        self.specificity = (ids, classes, types)
+
+        # Keys every matching element must have among its ancestors
+        bloom = 0
+        for compound, combinator in zip(compounds[1:], combinators):
+            if combinator in (" ", ">"):
+                bloom |= _compound_bloom(compound)
+        self.ancestor_bloom = bloom
+
+    @property
+    def is_structural(self) -> bool:
+        """Whether matching depends on sibling positions (structural pseudos or + / ~)"""
+        return any(c in ("+", "~") for c in self.combinators) or any(
+            negation.pseudos for compound in self.compounds for negation in [compound] + compound.negations
+        )
+
+    def matches(self, element, siblings: "_SiblingIndex") -> bool:
+        if not self.compounds[0].matches(element, siblings):
+            return False
+        return self._match_from(element, 1, siblings)
+
+    def _match_from(self, element, index: int, siblings: "_SiblingIndex") -> bool:
+        if index >= len(self.compounds):
+            return True
+        compound = self.compounds[index]
+        combinator = self.combinators[index - 1]
+        if combinator == ">":
+            parent = _parent_element(element)
+            return (
+                parent is not None
+                and compound.matches(parent, siblings)
+                and self._match_from(parent, index + 1, siblings)
+            )
+        if combinator == " ":
+            ancestor = _parent_element(element)
+            while ancestor is not None:
+                if compound.matches(ancestor, siblings) and self._match_from(ancestor, index + 1, siblings):
+                    return True
+                ancestor = _parent_element(ancestor)
+            return False
+        if combinator == "+":
+            sibling = siblings.previous(element)
+            return (
+                sibling is not None
+                and compound.matches(sibling, siblings)
+                and self._match_from(sibling, index + 1, siblings)
+            )
+        if combinator == "~":
+            # Whether a sibling satisfies the rest of the selector does not depend
+            # on element, so the first such sibling is found once per parent
+            first = siblings.earliest(
+                element,
+                (id(self), index),
+                lambda sibling: compound.matches(sibling, siblings) and self._match_from(sibling, index + 1, siblings)
+            )
+            return first < siblings.position(element)[0]
+        return False
+
+
+def _parent_element(element):
+    parent = element.parent
+    if parent is None or parent.name == "[document]":
+        return None
+    return parent
+
+
+def _compound_bloom(compound: _Compound) -> int:
+    bloom = 0
+    if compound.tag:
+        bloom |= _bloom_bits(compound.tag)
+    if compound.id:
+        bloom |= _bloom_bits("#" + compound.id)
+    for cls in compound.classes:
+        bloom |= _bloom_bits("." + cls)
+    return bloom
+
+
+def _element_bloom(element) -> int:
+    bloom = _bloom_bits(element.name)
+    element_id = element.get("id")
+    if element_id:
+        bloom |= _bloom_bits("#" + element_id)
+    for cls in element.get("class") or ():
+        bloom |= _bloom_bits("." + cls)
+    return bloom
+
+
+class _SelectorParser:
+    """Parses one complex selector; returns None for anything unsupported"""
+
+    _NAME_CHARS = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_\\")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+
+    def parse(self) -> Optional[_Selector]:
+        compounds = []
+        combinators = []
+        text = self.text
+        while True:
+            self._skip_space()
+            compound = self._compound()
+            if compound is None:
+                return None
+            compounds.append(compound)
+            had_space = self._skip_space()
+            if self.pos >= len(text):
+                break
+            ch = text[self.pos]
+            if ch in ">+~":
+                combinators.append(ch)
+                self.pos += 1
+            elif had_space:
+                combinators.append(" ")
+            else:
+                return None
+        compounds.reverse()
+        combinators.reverse()
+        return _Selector(compounds, combinators)
+
+    def _skip_space(self) -> bool:
+        start = self.pos
+        while self.pos < len(self.text) and self.text[self.pos].isspace():
+            self.pos += 1
+        return self.pos > start
+
+    def _name(self) -> str:
+        start = self.pos
+        while self.pos < len(self.text) and self.text[self.pos] in self._NAME_CHARS:
+            self.pos += 1
+        return self.text[start:self.pos]
+
+    def _compound(self) -> Optional[_Compound]:
+        compound = _Compound()
+        text = self.text
+        start = self.pos
+        if self.pos < len(text) and text[self.pos] == "*":
+            self.pos += 1
+        elif self.pos < len(text) and text[self.pos] in self._NAME_CHARS:
+            compound.tag = self._name().lower()
+        while self.pos < len(text):
+            ch = text[self.pos]
+            if ch == "#":
+                self.pos += 1
+                compound.id = self._name()
+            elif ch == ".":
+                self.pos += 1
+                compound.classes.append(self._name())
+            elif ch == "[":
+                end = text.find("]", self.pos)
+                if end < 0:
+                    return None
+                attr = self._attr(text[self.pos + 1:end])
+                if attr is None:
+                    return None
+                compound.attrs.append(attr)
+                self.pos = end + 1
+            elif ch == ":":
+                if not self._pseudo(compound):
+                    return None
+            else:
+                break
+        if self.pos == start:
+            return None
+        return compound
+
+    def _attr(self, body: str) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+        for op in ("~=", "|=", "^=", "$=", "*=", "="):
+            if op in body:
+                name, _, value = body.partition(op)
+                value = value.strip()
+                if value.endswith((" i", " s")):
+                    value = value[:-2].strip()
+                return (name.strip().lower(), op, value.strip("\"'"))
+        return (body.strip().lower(), None, None)
+
+    def _pseudo(self, compound: _Compound) -> bool:
+        text = self.text
+        self.pos += 1
+        if self.pos < len(text) and text[self.pos] == ":":
+            return False  # pseudo-elements (::before) never style the element itself
+        name = self._name().lower()
+        if self.pos < len(text) and text[self.pos] == "(":
+            end = text.find(")", self.pos)
+            if end < 0 or name != "not":
+                return False
+            inner = _SelectorParser(text[self.pos + 1:end].strip())
+            negation = inner._compound()
+            if negation is None or inner.pos != len(inner.text):
+                return False
+            compound.negations.append(negation)
+            self.pos = end + 1
+            return True
+        if name in _DYNAMIC_PSEUDOS or name in ("before", "after", "placeholder", "selection"):
+            return False
+        if name in ("root", "link", "any-link", "first-child", "last-child", "only-child"):
+            compound.pseudos.append(name)
+            return True
+        return False
+
+
+class _Rule:
+    __slots__ = ("selector", "declarations", "order")
+
+    def __init__(self, selector: _Selector, declarations: Dict[str, Tuple[str, bool]], order: int):
+        self.selector = selector
+        self.declarations = declarations
+        self.order = order
+
+
+# Properties the contrast checks need; everything else is dropped at index time
+_TRACKED_PROPERTIES = ("color", "background-color", "background", "font-size", "font-weight", "font")
+
+
+def parse_declarations(block: str) -> Dict[str, Tuple[str, bool]]:
+    """Parse ``prop: value; ...`` into {prop: (value, important)} for tracked properties"""
+    declarations = {}
+    for part in block.split(";"):
+        name, sep, value = part.partition(":")
+        if not sep:
+            continue
+        name = name.strip().lower()
+        if name not in _TRACKED_PROPERTIES:
+            continue
+        value = value.strip()
+        important = False
+        lowered = value.lower()
+        if lowered.endswith("!important"):
+            important = True
+            value = value[:lowered.rfind("!")].strip()
+        if name == "background":
+            color_value = _background_color_from_shorthand(value)
+            if color_value is None:
+                continue
+            name, value = "background-color", color_value
+        elif name == "font":
+            size = _font_size_from_shorthand(value)
+            if size is None:
+                continue
+            if "bold" in lowered.split():
+                declarations["font-weight"] = ("bold", important)
+            name, value = "font-size", size
+        declarations[name] = (value, important)
+    return declarations
+
+
+def _split_top_level(value: str, separator: str = " ") -> List[str]:
+    """Split on a separator outside of parentheses"""
+    parts = []
+    depth = 0
+    current = []
+    for ch in value:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if depth == 0 and (ch == separator or (separator == " " and ch.isspace())):
+            if current:
+                parts.append("".join(current))
+                current = []
+            continue
+        current.append(ch)
+    if current:
+        parts.append("".join(current))
+    return parts
+
+
+def _background_color_from_shorthand(value: str) -> Optional[str]:
+    """The color layer of a ``background`` shorthand; transparent if none"""
+    if value.lower() in ("none", "transparent", "initial", "unset"):
+        return "transparent"
+    for token in _split_top_level(value):
+        if token.lower().startswith("var(") or css_color.parse_color_value(token) is not None:
+            return token
+    return "transparent"
+
+
+def _font_size_from_shorthand(value: str) -> Optional[str]:
+    """The font-size component of a ``font`` shorthand, e.g. ``bold 1.5em/1.2 serif``"""
+    for token in _split_top_level(value):
+        size = token.split("/")[0].lower()
+        if size in _FONT_SIZE_KEYWORDS:
+            return size
+        match = _NUMBER_UNIT_RE.match(size)
+        if match and match.group(2) in ("px", "pt", "em", "rem", "%"):
+            return size
+    return None
+
+
+class ComputedStyle:
+    """Resolved styles of one element in the context of its ancestors"""
+
+    __slots__ = ("uid", "color", "backdrop", "font_size", "font_weight", "bloom")
+
+    def __init__(self, uid: int, color, backdrop, font_size: float, font_weight: int, bloom: int):
+        self.uid = uid
+        self.color = color          # RGBA text color
+        self.backdrop = backdrop    # Opaque RGBA effective background
+        self.font_size = font_size  # px
+        self.font_weight = font_weight
+        self.bloom = bloom          # Bloom filter of this element and its ancestors
+
+    @property
+    def is_bold(self) -> bool:
+        return self.font_weight >= 700
+
+    @property
+    def is_large_text(self) -> bool:
+        """WCAG large text: 18pt (24px) or 14pt (~18.66px) bold"""
+        return self.font_size >= 24.0 or (self.font_size >= 18.66 and self.is_bold)
+
+    def text_color_string(self) -> str:
+        return format_color(self.color)
+
+    def background_string(self) -> str:
+        return format_color(self.backdrop)
+
+
+def format_color(color) -> str:
+    """Format RGBA as hex when opaque, rgba() otherwise"""
+    r, g, b = (int(round(c)) for c in color[:3])
+    if color[3] >= 1.0:
+        return "#{:02x}{:02x}{:02x}".format(r, g, b)
+    return "rgba({}, {}, {}, {})".format(r, g, b, round(color[3], 3))
+
+
+_ROOT_STYLE = ComputedStyle(0, css_color.BLACK, css_color.WHITE, ROOT_FONT_PX, 400, 0)
+
+
+class StyleSheetIndex:
+    """
+    Parsed stylesheet with rules bucketed by their rightmost id, class or tag
+
+    Build once per page; computed styles are memoized per (element signature,
+    parent style), so repeated structures such as list items and table rows
+    are resolved once.
+    """
+
+    def __init__(self, css: str):
+        self.variables = css_color.extract_css_variables(css)
+        self.rules: List[_Rule] = []
+        self._by_id: Dict[str, List[_Rule]] = defaultdict(list)
+        self._by_class: Dict[str, List[_Rule]] = defaultdict(list)
+        self._by_tag: Dict[str, List[_Rule]] = defaultdict(list)
+        self._universal: List[_Rule] = []
+        # Attributes selectors depend on become part of the memo key, and so do
+        # the structural rules (sibling positions) that match the element
+        self._attr_names = set()
+        self._structural_rules: set = set()
+        # The index is shared by scans running in cpu_pool threads: uids come
+        # from a count (next() is atomic) and a racing memo write only costs a miss
+        self._memo: Dict[tuple, ComputedStyle] = {}
+        self._uids = itertools.count(1)
+
+        self._parse(_COMMENT_RE.sub("", css or ""))
+
+    def _parse(self, css: str):
+        pos = 0
+        length = len(css)
+        while pos < length:
+            brace = css.find("{", pos)
+            if brace < 0:
+                break
+            semicolon = css.find(";", pos, brace)
+            if semicolon >= 0:
+                # Statement at-rules (@import, @charset) or stray declarations
+                pos = semicolon + 1
+                continue
+            prelude = css[pos:brace].strip()
+            end = self._block_end(css, brace)
+            body = css[brace + 1:end]
+            if prelude.startswith("@"):
+                keyword = prelude[1:].split(None, 1)[0].lower() if len(prelude) > 1 else ""
+                # Conditional groups are flattened; their rules may apply
+                if keyword in ("media", "supports", "layer", "container", "document"):
+                    self._parse(body)
+            else:
+                self._add_rule(prelude, body)
+            pos = end + 1
+
+    def _block_end(self, css: str, open_brace: int) -> int:
+        depth = 0
+        for i in range(open_brace, len(css)):
+            if css[i] == "{":
+                depth += 1
+            elif css[i] == "}":
+                depth -= 1
+                if depth == 0:
+                    return i
+        return len(css)
+
+    def _add_rule(self, prelude: str, body: str):
+        declarations = parse_declarations(body)
+        if not declarations:
+            return
+        for selector_text in _split_top_level(prelude, ","):
+            selector = _SelectorParser(selector_text.strip()).parse()
+            if selector is None:
+                continue
+            rule = _Rule(selector, declarations, len(self.rules))
+            self.rules.append(rule)
+            self._note_dependencies(selector)
+            if selector.is_structural:
+                self._structural_rules.add(rule.order)
+
+            subject = selector.compounds[0]
+            if subject.id:
+                self._by_id[subject.id].append(rule)
+            elif subject.classes:
+                self._by_class[subject.classes[0]].append(rule)
+            elif subject.tag:
+                self._by_tag[subject.tag].append(rule)
+            else:
+                self._universal.append(rule)
+
+    def _note_dependencies(self, selector: _Selector):
+        for compound in selector.compounds:
+            for negation in [compound] + compound.negations:
+                for name, _, _ in negation.attrs:
+                    self._attr_names.add(name)
+
+    def candidate_rules(self, element) -> List[_Rule]:
+        """Rules whose rightmost compound could match the element"""
+        candidates = list(self._universal)
+        candidates.extend(self._by_tag.get(element.name, ()))
+        element_id = element.get("id")
+        if element_id:
+            candidates.extend(self._by_id.get(element_id, ()))
+        for cls in element.get("class") or ():
+            candidates.extend(self._by_class.get(cls, ()))
+        return candidates
+
+    def matching_rules(self, element, ancestor_bloom: int, siblings: _SiblingIndex) -> List[_Rule]:
+        """Rules that match the element, ordered by cascade precedence (lowest first)"""
+        matched = []
+        seen = set()
+        for rule in self.candidate_rules(element):
+            if rule.order in seen:
+                continue
+            seen.add(rule.order)
+            required = rule.selector.ancestor_bloom
+            if required & ancestor_bloom != required:
+                continue
+            if rule.selector.matches(element, siblings):
+                matched.append(rule)
+        matched.sort(key=lambda r: (r.selector.specificity, r.order))
+        return matched
+
+    def _signature(self, element, siblings: _SiblingIndex) -> tuple:
+        classes = element.get("class") or ()
+        signature = (
+            element.name,
+            element.get("id"),
+            tuple(classes),
+            element.get("style"),
+        )
+        if self._attr_names:
+            signature += tuple(
+                " ".join(v) if isinstance(v, list) else v
+                for v in (element.get(name) for name in sorted(self._attr_names))
+            )
+        if self._structural_rules:
+            # Which position-dependent rules match, not the siblings themselves,
+            # so list items in the same matching state share one memo entry
+            signature += tuple(sorted({
+                rule.order for rule in self.candidate_rules(element)
+                if rule.order in self._structural_rules and rule.selector.matches(element, siblings)
+            }))
+        return signature
+
+    def compute(self, element, parent: ComputedStyle, siblings: _SiblingIndex) -> ComputedStyle:
+        """Computed style of an element given its parent's computed style"""
+        key = (self._signature(element, siblings), parent.uid)
+        style = self._memo.get(key)
+        if style is not None:
+            return style
+
+        cascaded = self._cascade(element, parent.bloom, siblings)
+        style = self._resolve(element, cascaded, parent)
+        if len(self._memo) >= STYLE_MEMO_SIZE:
+            self._memo.clear()
+        self._memo[key] = style
+        return style
+
+    def _cascade(self, element, ancestor_bloom: int, siblings: _SiblingIndex) -> Dict[str, str]:
+        """Winning declared value per tracked property"""
+        winners: Dict[str, Tuple[tuple, str]] = {}
+        for rule in self.matching_rules(element, ancestor_bloom, siblings):
+            for name, (value, important) in rule.declarations.items():
+                rank = (important, False, rule.selector.specificity, rule.order)
+                if name not in winners or rank >= winners[name][0]:
+                    winners[name] = (rank, value)
+
+        inline = element.get("style")
+        if inline:
+            for name, (value, important) in parse_declarations(inline).items():
+                rank = (important, True, (0, 0, 0), 0)
+                if name not in winners or rank >= winners[name][0]:
+                    winners[name] = (rank, value)
+
+        return {name: value for name, (_, value) in winners.items()}
+
+    def _resolve(self, element, cascaded: Dict[str, str], parent: ComputedStyle) -> ComputedStyle:
+        color = parent.color
+        if "color" in cascaded:
+            resolved = css_color.resolve_color(cascaded["color"], self.variables, current_color=parent.color)
+            if resolved is not None:
+                color = resolved
+
+        backdrop = parent.backdrop
+        if "background-color" in cascaded:
+            background = css_color.resolve_color(cascaded["background-color"], self.variables, current_color=color)
+            if background is not None:
+                backdrop = css_color.composite(background, parent.backdrop)
+
+        font_size = parent.font_size * _UA_FONT_SCALE.get(element.name, 1.0)
+        if "font-size" in cascaded:
+            font_size = _resolve_font_size(cascaded["font-size"], parent.font_size, font_size)
+
+        font_weight = 700 if element.name in _UA_BOLD else parent.font_weight
+        if "font-weight" in cascaded:
+            font_weight = _resolve_font_weight(cascaded["font-weight"], parent.font_weight, font_weight)
+
+        return ComputedStyle(next(self._uids), color, backdrop, font_size, font_weight, parent.bloom | _element_bloom(element))
+
+    def resolver(self) -> "StyleResolver":
+        """Per-document resolver that caches computed styles by element"""
+        return StyleResolver(self)
+
+
+def _resolve_font_size(value: str, parent_px: float, default_px: float) -> float:
+    value = value.strip().lower()
+    if value in _FONT_SIZE_KEYWORDS:
+        return _FONT_SIZE_KEYWORDS[value]
+    if value == "smaller":
+        return parent_px / 1.2
+    if value == "larger":
+        return parent_px * 1.2
+    if value in ("inherit", "unset"):
+        return parent_px
+    match = _NUMBER_UNIT_RE.match(value)
+    if not match:
+        return default_px
+    number = float(match.group(1))
+    unit = match.group(2)
+    if unit == "px":
+        return number
+    if unit == "pt":
+        return number * 4.0 / 3.0
+    if unit == "em":
+        return number * parent_px
+    if unit == "rem":
+        return number * ROOT_FONT_PX
+    if unit == "%":
+        return number * parent_px / 100.0
+    return default_px
+
+
+def _resolve_font_weight(value: str, parent_weight: int, default_weight: int) -> int:
+    value = value.strip().lower()
+    if value in _FONT_WEIGHT_KEYWORDS:
+        if value == "bolder":
+            return max(700, parent_weight)
+        if value == "lighter":
+            return min(300, parent_weight)
+        return _FONT_WEIGHT_KEYWORDS[value]
+    if value in ("inherit", "unset"):
+        return parent_weight
+    try:
+        return int(float(value))
+    except ValueError:
+        return default_weight
+
+
+class StyleResolver:
+    """Computes and caches styles for the elements of one parsed document"""
+
+    def __init__(self, index: StyleSheetIndex):
+        self.index = index
+        self._styles: Dict[int, ComputedStyle] = {}
+        self._siblings = _SiblingIndex()
+        # Holding the elements keeps their ids stable for the cache's lifetime
+        self._elements: List = []
+
+    def computed_style(self, element) -> ComputedStyle:
+        """Computed style of an element, resolving uncached ancestors first"""
+        chain = []
+        node = element
+        parent_style = _ROOT_STYLE
+        while node is not None and getattr(node, "name", None) and node.name != "[document]":
+            cached = self._styles.get(id(node))
+            if cached is not None:
+                parent_style = cached
+                break
+            chain.append(node)
+            node = node.parent
+
+        for node in reversed(chain):
+            parent_style = self.index.compute(node, parent_style, self._siblings)
+            self._styles[id(node)] = parent_style
+            self._elements.append(node)
+        return parent_style
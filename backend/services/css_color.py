@@ -0,0 +1,358 @@
+"""
+CSS Color Parser
+Single-pass tokenizer for the CSS color grammar, custom property resolution
+and alpha compositing
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Mapping, Optional, Tuple
+import colorsys
+import re
+import webcolors
+
+
+RGBA = Tuple[float, float, float, float]
+
+# Sentinel returned for the ``currentColor`` keyword
+CURRENT_COLOR = "currentcolor"
+
+COLOR_CACHE_SIZE = 4096
+
+# Custom property references are resolved at most this deep (guards cycles)
+MAX_VAR_DEPTH = 16
+
+_ANGLE_UNITS = {"deg": 1.0, "grad": 0.9, "rad": 57.29577951308232, "turn": 360.0}
+
+# Only used once per stylesheet, when building the variable map
+_CUSTOM_PROPERTY_RE = re.compile(r'(--[\w-]+)\s*:\s*([^;{}]+)')
+
+WHITE: RGBA = (255.0, 255.0, 255.0, 1.0)
+BLACK: RGBA = (0.0, 0.0, 0.0, 1.0)
+
+
+class _Token:
+    """Color grammar token: kind is hash, ident, func, number, comma, slash or close"""
+
+    __slots__ = ("kind", "value", "unit")
+
+    def __init__(self, kind: str, value=None, unit: str = ""):
+        self.kind = kind
+        self.value = value
+        self.unit = unit
+
+
+def _tokenize(text: str) -> Optional[List[_Token]]:
+    """Tokenize a lower-cased color value in one pass; None on invalid input"""
+    tokens = []
+    i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if ch in " \t\n\r":
+            i += 1
+        elif ch == ",":
+            tokens.append(_Token("comma"))
+            i += 1
+        elif ch == "/":
+            tokens.append(_Token("slash"))
+            i += 1
+        elif ch == ")":
+            tokens.append(_Token("close"))
+            i += 1
+        elif ch == "#":
+            j = i + 1
+            while j < n and text[j] in "0123456789abcdef":
+                j += 1
+            tokens.append(_Token("hash", text[i + 1:j]))
+            i = j
+        elif ch.isdigit() or ch in "+-." and i + 1 < n and (text[i + 1].isdigit() or text[i + 1] == "."):
+            j = i + 1
+            while j < n and (text[j].isdigit() or text[j] == "."):
+                j += 1
+            if j < n and text[j] == "e" and j + 1 < n and (text[j + 1].isdigit() or text[j + 1] in "+-"):
+                j += 2
+                while j < n and text[j].isdigit():
+                    j += 1
+            try:
+                number = float(text[i:j])
+            except ValueError:
+                return None
+            k = j
+            while k < n and (text[k].isalpha() or text[k] == "%"):
+                k += 1
+            tokens.append(_Token("number", number, text[j:k]))
+            i = k
+        elif ch.isalpha() or ch == "-":
+            j = i + 1
+            while j < n and (text[j].isalnum() or text[j] in "-_"):
+                j += 1
+            if j < n and text[j] == "(":
+                tokens.append(_Token("func", text[i:j]))
+                j += 1
+            else:
+                tokens.append(_Token("ident", text[i:j]))
+            i = j
+        else:
+            return None
+    return tokens
+
+
+def _hex_to_rgba(digits: str) -> Optional[RGBA]:
+    """#rgb, #rgba, #rrggbb and #rrggbbaa"""
+    if len(digits) in (3, 4):
+        digits = "".join(c * 2 for c in digits)
+    if len(digits) not in (6, 8):
+        return None
+    r, g, b = (int(digits[i:i + 2], 16) for i in (0, 2, 4))
+    a = int(digits[6:8], 16) / 255.0 if len(digits) == 8 else 1.0
+    return (float(r), float(g), float(b), a)
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return low if value < low else high if value > high else value
+
+
+def _alpha(token: _Token) -> Optional[float]:
+    if token.kind != "number" or token.unit not in ("", "%"):
+        return None
+    return _clamp(token.value / 100.0 if token.unit == "%" else token.value, 0.0, 1.0)
+
+
+def _function_args(tokens: List[_Token], start: int) -> Optional[Tuple[List[_Token], Optional[_Token], int]]:
+    """
+    Collect the channel arguments of a color function
+
+    Accepts both the legacy comma syntax and the space / slash syntax.
+
+    Returns:
+        Tuple of (channel tokens, alpha token or None, index after ``)``)
+    """
+    channels = []
+    alpha = None
+    i = start
+    while i < len(tokens):
+        token = tokens[i]
+        if token.kind == "close":
+            return channels, alpha, i + 1
+        if token.kind == "comma":
+            i += 1
+            continue
+        if token.kind == "slash":
+            if i + 1 >= len(tokens):
+                return None
+            alpha = tokens[i + 1]
+            i += 2
+            continue
+        if token.kind not in ("number", "ident"):
+            return None
+        if len(channels) == 3 and alpha is None:
+            # Legacy rgba(r, g, b, a) / hsla(h, s, l, a)
+            alpha = token
+        else:
+            channels.append(token)
+        i += 1
+    return None
+
+
+def _rgb_function(channels: List[_Token], alpha: Optional[_Token]) -> Optional[RGBA]:
+    if len(channels) != 3:
+        return None
+    values = []
+    for token in channels:
+        if token.kind == "ident" and token.value == "none":
+            values.append(0.0)
+        elif token.kind == "number" and token.unit == "%":
+            values.append(_clamp(token.value * 2.55, 0.0, 255.0))
+        elif token.kind == "number" and token.unit == "":
+            values.append(_clamp(token.value, 0.0, 255.0))
+        else:
+            return None
+    a = 1.0 if alpha is None else _alpha(alpha)
+    if a is None:
+        return None
+    return (values[0], values[1], values[2], a)
+
+
+def _hsl_function(channels: List[_Token], alpha: Optional[_Token]) -> Optional[RGBA]:
+    if len(channels) != 3 or any(t.kind != "number" for t in channels):
+        return None
+    hue_token, sat_token, light_token = channels
+    if hue_token.unit and hue_token.unit not in _ANGLE_UNITS:
+        return None
+    hue = hue_token.value * _ANGLE_UNITS.get(hue_token.unit, 1.0)
+    if sat_token.unit not in ("%", "") or light_token.unit not in ("%", ""):
+        return None
+    saturation = _clamp(sat_token.value / 100.0, 0.0, 1.0)
+    lightness = _clamp(light_token.value / 100.0, 0.0, 1.0)
+    r, g, b = colorsys.hls_to_rgb((hue % 360.0) / 360.0, lightness, saturation)
+    a = 1.0 if alpha is None else _alpha(alpha)
+    if a is None:
+        return None
+    return (r * 255.0, g * 255.0, b * 255.0, a)
+
+
+def _named_color(name: str) -> Optional[RGBA]:
+    if name == "transparent":
+        return (0.0, 0.0, 0.0, 0.0)
+    try:
+        rgb = webcolors.name_to_rgb(name)
+    except ValueError:
+        return None
+    return (float(rgb.red), float(rgb.green), float(rgb.blue), 1.0)
+
+
+@lru_cache(maxsize=COLOR_CACHE_SIZE)
+def parse_color_value(value: str):
+    """
+    Parse a variable-free CSS color value, interned per string
+
+    Supports named colors, ``transparent``, ``currentColor``, #rgb/#rgba/
+    #rrggbb/#rrggbbaa and rgb()/rgba()/hsl()/hsla() in both legacy comma
+    and modern space/slash syntax, with numbers, percentages and angle units.
+    A trailing ``!important`` is ignored.
+
+    Returns:
+        RGBA tuple (channels 0-255, alpha 0-1), CURRENT_COLOR, or None
+    """
+    if not value:
+        return None
+    tokens = _tokenize(value.lower().replace("!important", "").strip())
+    if not tokens:
+        return None
+    first = tokens[0]
+
+    if first.kind == "hash":
+        color = _hex_to_rgba(first.value)
+        end = 1
+    elif first.kind == "ident":
+        if first.value == CURRENT_COLOR:
+            return CURRENT_COLOR if len(tokens) == 1 else None
+        color = _named_color(first.value)
+        end = 1
+    elif first.kind == "func" and first.value in ("rgb", "rgba", "hsl", "hsla"):
+        args = _function_args(tokens, 1)
+        if args is None:
+            return None
+        channels, alpha, end = args
+        if first.value.startswith("rgb"):
+            color = _rgb_function(channels, alpha)
+        else:
+            color = _hsl_function(channels, alpha)
+    else:
+        return None
+
+    if end != len(tokens):
+        return None
+    return color
+
+
+def extract_css_variables(css: str) -> Dict[str, str]:
+    """
+    Build the custom property map for a stylesheet
+
+    Declarations are collected once (later declarations win, like a flat
+    cascade) and var() references between them are resolved up front, so
+    per-element color lookups only need dictionary access.
+    """
+    raw = {}
+    if css:
+        for name, value in _CUSTOM_PROPERTY_RE.findall(css):
+            raw[name.strip().lower()] = value.strip()
+
+    resolved = {}
+    for name, value in raw.items():
+        substituted = substitute_variables(value, raw)
+        if substituted is not None:
+            resolved[name] = substituted
+    return resolved
+
+
+def substitute_variables(value: str, variables: Mapping[str, str], depth: int = 0) -> Optional[str]:
+    """
+    Replace every var(--name[, fallback]) in a value
+
+    Returns:
+        The substituted value, or None if a reference cannot be resolved
+    """
+    start = value.find("var(")
+    if start < 0:
+        return value
+    if depth >= MAX_VAR_DEPTH:
+        return None
+
+    # Find the matching close paren, allowing nested functions in the fallback
+    level = 0
+    end = -1
+    for i in range(start + 3, len(value)):
+        if value[i] == "(":
+            level += 1
+        elif value[i] == ")":
+            level -= 1
+            if level == 0:
+                end = i
+                break
+    if end < 0:
+        return None
+
+    name, _, fallback = value[start + 4:end].partition(",")
+    replacement = variables.get(name.strip().lower())
+    if replacement is None:
+        if not fallback.strip():
+            return None
+        replacement = fallback.strip()
+
+    replacement = substitute_variables(replacement, variables, depth + 1)
+    if replacement is None:
+        return None
+    return substitute_variables(value[:start] + replacement + value[end + 1:], variables, depth + 1)
+
+
+def resolve_color(
+    value: str,
+    variables: Optional[Mapping[str, str]] = None,
+    current_color: Optional[RGBA] = None
+) -> Optional[RGBA]:
+    """
+    Resolve a CSS color value to RGBA
+
+    Args:
+        value: CSS color value, possibly containing var() references
+        variables: Custom property map from extract_css_variables
+        current_color: Value used for ``currentColor`` (defaults to black)
+
+    Returns:
+        RGBA tuple, or None if the value is not a resolvable color
+    """
+    if not value:
+        return None
+    if "var(" in value:
+        value = substitute_variables(value, variables or {})
+        if value is None:
+            return None
+    color = parse_color_value(value)
+    if color == CURRENT_COLOR:
+        return current_color or BLACK
+    return color
+
+
+def composite(color: RGBA, backdrop: RGBA) -> RGBA:
+    """Source-over composite ``color`` onto ``backdrop``; opaque colors pass through"""
+    alpha = color[3]
+    if alpha >= 1.0:
+        return color
+    base_alpha = backdrop[3]
+    out_alpha = alpha + base_alpha * (1.0 - alpha)
+    if out_alpha <= 0.0:
+        return (0.0, 0.0, 0.0, 0.0)
+    return tuple(
+        (color[i] * alpha + backdrop[i] * base_alpha * (1.0 - alpha)) / out_alpha
+        for i in range(3)
+    ) + (out_alpha,)
+
+
+def to_opaque_rgb(color: RGBA, backdrop: RGBA = WHITE) -> Tuple[int, int, int]:
+    """Flatten a color over an opaque backdrop and round to 8-bit channels"""
+    flat = composite(color, backdrop)
+    if flat[3] < 1.0:
+        flat = composite(flat, WHITE)
+    return (int(round(flat[0])), int(round(flat[1])), int(round(flat[2])))
@@ -10,6 +10,7 @@ import base64
 from io import BytesIO
 from PIL import Image
 import json
+from .metrics import timed_stage
 
 
 class HeadlessRunner:
@@ -48,6 +49,7 @@ class HeadlessRunner:
             await self.playwright.stop()
             self.playwright = None
     
+    @timed_stage("headless_render")
     async def render_page(
         self,
         url: str,
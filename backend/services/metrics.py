@@ -0,0 +1,279 @@
+"""
+Metrics
+Minimal Prometheus-compatible counters, gauges and histograms (text exposition format)
+"""
+
+import asyncio
+import bisect
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from . import tracing
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans sub-millisecond rule checks up to slow page fetches
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# (name, type, help, [(labels, value)]) produced at scrape time
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+_metrics: Dict[str, "_Metric"] = {}
+_collectors: List[Callable[[], Iterable[Family]]] = []
+
+# Set while a scan runs in a worker process: observations are recorded
+# here and replayed in the server process (see capture_observations)
+_captured: Optional[List[Tuple[str, Tuple[str, ...], float]]] = None
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+class _Metric:
+    """Labelled metric family; children are created per label-value tuple"""
+    
+    type = ""
+    
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        if name in _metrics:
+            raise ValueError(f"Duplicate metric: {name}")
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        _metrics[name] = self
+    
+    def labels(self, *values) -> object:
+        """Child for one combination of label values (cached)"""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child(key))
+        return child
+    
+    def _new_child(self, key: Tuple[str, ...]):
+        raise NotImplementedError
+    
+    def samples(self) -> Iterable[Tuple[str, Dict[str, str], float]]:
+        raise NotImplementedError
+
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    
+    type = "counter"
+    
+    def _new_child(self, key):
+        return _CounterChild()
+    
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+    
+    def samples(self):
+        for key, child in list(self._children.items()):
+            yield self.name + "_total", dict(zip(self.labelnames, key)), child.value
+
+
+class _GaugeChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+    
+    def set(self, value: float):
+        self.value = value
+    
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+    
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+
+class Gauge(_Metric):
+    """Value that goes up and down"""
+    
+    type = "gauge"
+    
+    def _new_child(self, key):
+        return _GaugeChild()
+    
+    def samples(self):
+        for key, child in list(self._children.items()):
+            yield self.name, dict(zip(self.labelnames, key)), child.value
+
+
+class _HistogramChild:
+    def __init__(self, metric: "Histogram", key: Tuple[str, ...]):
+        self._metric = metric
+        self._key = key
+        self._bounds = metric.buckets
+        self.counts = [0] * (len(metric.buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float):
+        if _captured is not None:
+            _captured.append((self._metric.name, self._key, value))
+            return
+        index = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+    
+    @contextmanager
+    def time(self):
+        """Observe the duration of a with-block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+    
+    type = "histogram"
+    
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+    
+    def _new_child(self, key):
+        return _HistogramChild(self, key)
+    
+    def samples(self):
+        for key, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, key))
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield self.name + "_bucket", dict(labels, le=_format_value(bound)), cumulative
+            yield self.name + "_sum", labels, total
+            yield self.name + "_count", labels, cumulative
+
+
+def register_collector(collector: Callable[[], Iterable[Family]]):
+    """Add a callable producing metric families at scrape time (e.g. from stats())"""
+    _collectors.append(collector)
+
+
+def stats_family(
+    name: str,
+    help: str,
+    stats: Dict[str, Dict[str, float]],
+    label: str,
+    key: str,
+    metric_type: str = "gauge"
+) -> Family:
+    """Family with one sample per stats entry, e.g. {"/scan-url": {"active": 2}} -> name{label="/scan-url"} 2"""
+    return name, metric_type, help, [({label: entry}, values[key]) for entry, values in stats.items() if key in values]
+
+
+@contextmanager
+def capture_observations():
+    """Record histogram observations in a list instead of the registry (worker processes)"""
+    global _captured
+    _captured = captured = []
+    try:
+        yield captured
+    finally:
+        _captured = None
+
+
+def replay(observations: Iterable[Tuple[str, Sequence[str], float]]):
+    """Apply observations captured in a worker process"""
+    for name, key, value in observations:
+        metric = _metrics.get(name)
+        if metric is not None:
+            metric.labels(*key).observe(value)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    
+    def family(name: str, metric_type: str, help: str, samples):
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for sample_name, labels, value in samples:
+            lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+    
+    for metric in list(_metrics.values()):
+        family(metric.name, metric.type, metric.help, metric.samples())
+    for collector in _collectors:
+        try:
+            families = list(collector())
+        except Exception as e:
+            print(f"⚠️  Metrics collector failed: {e}")
+            continue
+        for name, metric_type, help, samples in families:
+            suffix = "_total" if metric_type == "counter" else ""
+            family(name, metric_type, help, ((name + suffix, labels, value) for labels, value in samples))
+    return "\n".join(lines) + "\n"
+
+
+# Scan pipeline stages: fetch, parse, scoring, db_write, headless_render, vision
+STAGE_SECONDS = Histogram("scan_stage_seconds", "Time spent per scan pipeline stage", ["stage"])
+
+# One series per rule family (scanner.SCAN_RULES)
+RULE_SECONDS = Histogram("scan_rule_seconds", "Time spent per accessibility rule check", ["rule"])
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Context manager timing one pipeline stage (histogram and trace span)"""
+    with tracing.span(stage), STAGE_SECONDS.labels(stage).time():
+        yield
+
+
+def timed_stage(stage: str):
+    """Decorator timing every call of a (sync or async) function as a pipeline stage"""
+    def decorate(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with stage_timer(stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
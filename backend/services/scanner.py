@@ -5,13 +5,32 @@ Scans HTML/CSS/JS for WCAG 2.2 compliance issues
 
 from bs4 import BeautifulSoup
 import httpx
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
 import re
+import time
+import numpy as np
 from urllib.parse import urljoin, urlparse
 from .contrast_analyzer import ContrastAnalyzer
 from .aria_checker import ARIAChecker
 from .keyboard_nav import KeyboardNavChecker
 from .readability_scorer import ReadabilityScorer
+from .metrics import RULE_SECONDS, stage_timer, timed_stage
+from .tracing import span
+
+# Rule families in scan order; readability (the slowest check) runs last so
+# streaming clients see the structural issues first
+SCAN_RULES = (
+    "alt_text",
+    "contrast",
+    "aria",
+    "keyboard",
+    "semantic_html",
+    "form_labels",
+    "headings",
+    "focus_indicators",
+    "language",
+    "readability",
+)
 
 
 class AccessibilityScanner:
@@ -23,59 +42,82 @@ class AccessibilityScanner:
         self.keyboard_nav = KeyboardNavChecker()
         self.readability_scorer = ReadabilityScorer()
     
-    async def fetch_website(self, url: str) -> Tuple[str, str, str]:
+    async def fetch_website(
+        self,
+        url: str,
+        client: Optional[httpx.AsyncClient] = None
+    ) -> Tuple[str, str, str]:
         """
         Fetch website content (HTML, CSS, JS)
         
         Args:
             url: Website URL to fetch
+            client: Shared HTTP client (connection pooling across scans);
+                a short-lived client is used when omitted
             
         Returns:
             Tuple of (html_content, css_content, js_content)
         """
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                html_content = response.text
-                
-                # Parse HTML to extract CSS and JS
-                soup = BeautifulSoup(html_content, 'lxml')
-                
-                # Extract CSS
-                css_links = [link.get('href') for link in soup.find_all('link', rel='stylesheet')]
-                css_content = ""
-                for css_link in css_links:
-                    if css_link:
-                        css_url = urljoin(url, css_link)
-                        try:
-                            css_resp = await client.get(css_url, timeout=10.0)
-                            css_content += css_resp.text + "\n"
-                        except:
-                            pass
-                
-                # Extract inline styles
-                for style_tag in soup.find_all('style'):
-                    if style_tag.string:
-                        css_content += style_tag.string + "\n"
-                
-                # Extract JS
-                js_content = ""
-                for script in soup.find_all('script'):
-                    if script.get('src'):
-                        js_url = urljoin(url, script.get('src'))
-                        try:
-                            js_resp = await client.get(js_url, timeout=10.0)
-                            js_content += js_resp.text + "\n"
-                        except:
-                            pass
-                    elif script.string:
-                        js_content += script.string + "\n"
-                
-                return html_content, css_content, js_content
+            with stage_timer("fetch"):
+                if client is None:
+                    async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
+                        return await self._fetch_with(client, url)
+                return await self._fetch_with(client, url)
         except Exception as e:
             raise Exception(f"Failed to fetch website: {str(e)}")
     
+    async def _fetch_with(self, client: httpx.AsyncClient, url: str) -> Tuple[str, str, str]:
+        """Fetch a page and its stylesheets and scripts with the given client"""
+        with span("fetch.document", url=url) as document_span:
+            response = await client.get(url)
+            document_span.set("status", response.status_code)
+            response.raise_for_status()
+            html_content = response.text
+            document_span.set("bytes", len(response.content))
+        
+        # Parse HTML to extract CSS and JS
+        with span("fetch.parse"):
+            soup = BeautifulSoup(html_content, 'lxml')
+        
+        # Extract CSS
+        css_links = [link.get('href') for link in soup.find_all('link', rel='stylesheet')]
+        css_content = ""
+        for css_link in css_links:
+            if css_link:
+                css_url = urljoin(url, css_link)
+                try:
+                    with span("fetch.css", url=css_url) as resource_span:
+                        css_resp = await client.get(css_url, timeout=10.0)
+                        resource_span.set("status", css_resp.status_code)
+                        resource_span.set("bytes", len(css_resp.content))
+                    css_content += css_resp.text + "\n"
+                except:
+                    pass
+        
+        # Extract inline styles
+        for style_tag in soup.find_all('style'):
+            if style_tag.string:
+                css_content += style_tag.string + "\n"
+        
+        # Extract JS
+        js_content = ""
+        for script in soup.find_all('script'):
+            if script.get('src'):
+                js_url = urljoin(url, script.get('src'))
+                try:
+                    with span("fetch.js", url=js_url) as resource_span:
+                        js_resp = await client.get(js_url, timeout=10.0)
+                        resource_span.set("status", js_resp.status_code)
+                        resource_span.set("bytes", len(js_resp.content))
+                    js_content += js_resp.text + "\n"
+                except:
+                    pass
+            elif script.string:
+                js_content += script.string + "\n"
+        
+        return html_content, css_content, js_content
+    
     async def scan_comprehensive(
         self,
         html: str,
@@ -96,40 +138,52 @@ class AccessibilityScanner:
             List of accessibility issues found
         """
         issues = []
-        soup = BeautifulSoup(html, 'lxml')
-        
-        # 1. Check for missing alt text
-        issues.extend(await self._check_missing_alt_text(soup, source_url))
-        
-        # 2. Check color contrast
-        issues.extend(await self._check_contrast(soup, css, source_url))
-        
-        # 3. Check ARIA attributes
-        issues.extend(await self._check_aria(soup, source_url))
-        
-        # 4. Check keyboard navigation
-        issues.extend(await self._check_keyboard_navigation(soup, js, source_url))
-        
-        # 5. Check semantic HTML
-        issues.extend(await self._check_semantic_html(soup, source_url))
-        
-        # 6. Check form labels
-        issues.extend(await self._check_form_labels(soup, source_url))
-        
-        # 7. Check heading hierarchy
-        issues.extend(await self._check_heading_hierarchy(soup, source_url))
-        
-        # 8. Check text readability
-        issues.extend(await self._check_readability(soup, source_url))
-        
-        # 9. Check focus indicators
-        issues.extend(await self._check_focus_indicators(css, source_url))
-        
-        # 10. Check language attribute
-        issues.extend(await self._check_language_attribute(soup, source_url))
-        
+        async for _, rule_issues in self.scan_rules(html, css, js, source_url):
+            issues.extend(rule_issues)
         return issues
     
+    async def scan_rules(
+        self,
+        html: str,
+        css: str,
+        js: str,
+        source_url: str
+    ) -> AsyncIterator[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Run the checks one rule family at a time, in SCAN_RULES order
+        
+        Args:
+            html: HTML content
+            css: CSS content
+            js: JavaScript content
+            source_url: Source URL or identifier
+            
+        Yields:
+            Tuple of (rule family, issues found by it) as soon as each check completes
+        """
+        with stage_timer("parse"):
+            soup = BeautifulSoup(html, 'lxml')
+        checks = {
+            "alt_text": lambda: self._check_missing_alt_text(soup, source_url),
+            "contrast": lambda: self._check_contrast(soup, css, source_url),
+            "aria": lambda: self._check_aria(soup, source_url),
+            "keyboard": lambda: self._check_keyboard_navigation(soup, js, source_url),
+            "semantic_html": lambda: self._check_semantic_html(soup, source_url),
+            "form_labels": lambda: self._check_form_labels(soup, source_url),
+            "headings": lambda: self._check_heading_hierarchy(soup, source_url),
+            "focus_indicators": lambda: self._check_focus_indicators(css, source_url),
+            "language": lambda: self._check_language_attribute(soup, source_url),
+            "readability": lambda: self._check_readability(soup, source_url),
+        }
+        for rule in SCAN_RULES:
+            # Time the check only, not the consumer between yields
+            start = time.perf_counter()
+            with span("rule." + rule) as rule_span:
+                rule_issues = await checks[rule]()
+                rule_span.set("issues", len(rule_issues))
+            RULE_SECONDS.labels(rule).observe(time.perf_counter() - start)
+            yield rule, rule_issues
+    
     async def _check_missing_alt_text(
         self,
         soup: BeautifulSoup,
@@ -186,6 +240,11 @@ class AccessibilityScanner:
         # Extract text elements and their styles
         text_elements = soup.find_all(['p', 'span', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'a', 'button', 'label'])
         
+        # Stylesheet is indexed once; computed styles are cached per element
+        resolver = self.contrast_analyzer.style_resolver(css)
+        
+        # Collect every candidate first so all pairs are evaluated in one batch
+        candidates = []
         for element in text_elements:
             # Skip if element has no visible text
             text = element.get_text(strip=True)
@@ -194,34 +253,53 @@ class AccessibilityScanner:
             
             # Check inline styles and CSS for color
             inline_style = element.get('style', '')
-            bg_color, text_color = self.contrast_analyzer.extract_colors(inline_style, css, element)
+            bg_color, text_color = self.contrast_analyzer.extract_colors(inline_style, css, element, resolver)
             
             if bg_color and text_color:
-                ratio = self.contrast_analyzer.calculate_contrast_ratio(text_color, bg_color)
-                
-                # Check WCAG requirements
-                is_large_text = self.contrast_analyzer.is_large_text(element)
-                required_ratio_aa = 3.0 if is_large_text else 4.5
-                required_ratio_aaa = 4.5 if is_large_text else 7.0
-                
-                if ratio < required_ratio_aa:
-                    issues.append({
-                        "id": f"contrast-{len(issues)}",
-                        "type": "contrast_ratio",
-                        "severity": "high",
-                        "wcag_level": "AA",
-                        "wcag_rule": "1.4.3",
-                        "element": str(element)[:200],
-                        "selector": self._generate_selector(element),
-                        "message": f"Color contrast ratio {ratio:.2f}:1 is below WCAG AA standard ({required_ratio_aa}:1)",
-                        "description": f"Text color ({text_color}) and background color ({bg_color}) have insufficient contrast for readability.",
-                        "current_ratio": ratio,
-                        "required_ratio": required_ratio_aa,
-                        "text_color": text_color,
-                        "bg_color": bg_color,
-                        "fix_suggestion": "Adjust colors to meet contrast requirements",
-                        "source_url": source_url
-                    })
+                candidates.append((element, text_color, bg_color))
+        
+        if not candidates:
+            return issues
+        
+        # Custom properties come from the same stylesheet index
+        fg_rgb, bg_rgb, valid = self.contrast_analyzer.resolve_color_pairs(
+            ((c[1], c[2]) for c in candidates),
+            resolver.index.variables
+        )
+        large_text = np.fromiter(
+            (self.contrast_analyzer.is_large_text(c[0], resolver) for c in candidates),
+            dtype=bool,
+            count=len(candidates)
+        )
+        
+        result = self.contrast_analyzer.calculate_contrast_ratios(fg_rgb, bg_rgb, large_text)
+        
+        # Unparseable colors count as the lowest possible ratio
+        ratios = np.where(valid, result["ratios"], 1.0)
+        failing = np.flatnonzero(ratios < result["required_aa"])
+        
+        for index in failing:
+            element, text_color, bg_color = candidates[index]
+            ratio = float(ratios[index])
+            required_ratio_aa = float(result["required_aa"][index])
+            
+            issues.append({
+                "id": f"contrast-{len(issues)}",
+                "type": "contrast_ratio",
+                "severity": "high",
+                "wcag_level": "AA",
+                "wcag_rule": "1.4.3",
+                "element": str(element)[:200],
+                "selector": self._generate_selector(element),
+                "message": f"Color contrast ratio {ratio:.2f}:1 is below WCAG AA standard ({required_ratio_aa}:1)",
+                "description": f"Text color ({text_color}) and background color ({bg_color}) have insufficient contrast for readability.",
+                "current_ratio": ratio,
+                "required_ratio": required_ratio_aa,
+                "text_color": text_color,
+                "bg_color": bg_color,
+                "fix_suggestion": "Adjust colors to meet contrast requirements",
+                "source_url": source_url
+            })
         
         return issues
     
@@ -604,6 +682,7 @@ class AccessibilityScanner:
         except:
             return "unknown"
     
+    @timed_stage("scoring")
     def calculate_accessibility_score(self, issues: List[Dict[str, Any]]) -> float:
         """Calculate accessibility score (0-100)"""
         if not issues:
@@ -0,0 +1,158 @@
+"""
+Tracing
+Per-request trace spans (fetch, parse, rules, scoring, save) for Server-Timing and trace export
+"""
+
+import itertools
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+_trace: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+_parent: ContextVar[Optional[int]] = ContextVar("trace_parent", default=None)
+
+
+class Span:
+    """One timed operation within a trace"""
+    
+    __slots__ = ("id", "parent", "name", "start_ms", "duration_ms", "attributes")
+    
+    def __init__(self, span_id: int, parent: Optional[int], name: str, attributes: Dict[str, Any]):
+        self.id = span_id
+        self.parent = parent
+        self.name = name
+        self.start_ms = 0.0
+        self.duration_ms = 0.0
+        self.attributes = attributes
+    
+    def set(self, key: str, value: Any):
+        """Attach an attribute (status code, issue count, ...)"""
+        self.attributes[key] = value
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "parent": self.parent,
+            "name": self.name,
+            "start_ms": round(self.start_ms, 3),
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes
+        }
+
+
+class _NoopSpan:
+    """Returned by span() outside a trace; attributes are discarded"""
+    
+    def set(self, key: str, value: Any):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """Spans recorded while handling one request (or one pooled scan)"""
+    
+    def __init__(self, name: str):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.started_at = time.time()
+        self.origin = time.perf_counter()
+        self.spans: List[Span] = []
+        self._ids = itertools.count(1)
+    
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.origin) * 1000
+    
+    def graft(self, spans: List[Dict[str, Any]], started_at: float):
+        """
+        Add spans recorded by another trace (a scan worker process)
+        
+        Args:
+            spans: Span dicts from Trace.to_dict()["spans"]
+            started_at: Wall-clock start of the other trace, to align offsets
+        """
+        offset_ms = (started_at - self.started_at) * 1000
+        ids = {}
+        for data in sorted(spans, key=lambda item: item["id"]):
+            span = Span(next(self._ids), ids.get(data["parent"], _parent.get()), data["name"], data["attributes"])
+            span.start_ms = data["start_ms"] + offset_ms
+            span.duration_ms = data["duration_ms"]
+            ids[data["id"]] = span.id
+            self.spans.append(span)
+    
+    def server_timing(self) -> str:
+        """
+        Server-Timing header value: total duration per span name, in first-seen order
+        
+        Repeated spans (sub-resource fetches) are summed, with the count in desc.
+        """
+        totals: Dict[str, List[float]] = {}
+        for span in sorted(self.spans, key=lambda item: item.start_ms):
+            entry = totals.setdefault(span.name, [0.0, 0])
+            entry[0] += span.duration_ms
+            entry[1] += 1
+        parts = [f"total;dur={self.elapsed_ms():.1f}"]
+        for name, (duration, count) in totals.items():
+            part = f"{name};dur={duration:.1f}"
+            if count > 1:
+                part += f';desc="{count} calls"'
+            parts.append(part)
+        return ", ".join(parts)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round(self.elapsed_ms(), 3),
+            "spans": [span.to_dict() for span in sorted(self.spans, key=lambda item: item.start_ms)]
+        }
+
+
+def current_trace() -> Optional[Trace]:
+    """The trace of the running request, if any"""
+    return _trace.get()
+
+
+@contextmanager
+def start_trace(name: str) -> Iterator[Trace]:
+    """Record spans of everything run inside the with-block (and tasks it creates)"""
+    trace = Trace(name)
+    trace_token = _trace.set(trace)
+    parent_token = _parent.set(None)
+    try:
+        yield trace
+    finally:
+        _parent.reset(parent_token)
+        _trace.reset(trace_token)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """
+    Time a with-block as a span of the current trace
+    
+    Outside a trace this costs one context variable lookup.
+    """
+    trace = _trace.get()
+    if trace is None:
+        yield _NOOP_SPAN
+        return
+    
+    record = Span(next(trace._ids), _parent.get(), name, attributes)
+    token = _parent.set(record.id)
+    start = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record.attributes["error"] = type(e).__name__
+        raise
+    finally:
+        end = time.perf_counter()
+        _parent.reset(token)
+        record.start_ms = (start - trace.origin) * 1000
+        record.duration_ms = (end - start) * 1000
+        trace.spans.append(record)
@@ -10,7 +10,8 @@ import base64
 from io import BytesIO
 from typing import List, Dict, Any, Optional, Tuple
 from colorthief import ColorThief
-import webcolors
+from .color_utils import rgb_contrast_ratio
+from .metrics import timed_stage
 
 
 class VisionAnalyzer:
@@ -20,6 +21,7 @@ class VisionAnalyzer:
         self.contrast_threshold_aa = 4.5  # WCAG AA
         self.contrast_threshold_aaa = 7.0  # WCAG AAA
     
+    @timed_stage("vision")
     def analyze_screenshot(
         self,
         screenshot_b64: str,
@@ -222,27 +224,7 @@ class VisionAnalyzer:
         Returns:
             Contrast ratio (1.0 to 21.0)
         """
-        def get_luminance(color):
-            """Calculate relative luminance"""
-            r, g, b = color
-            r = r / 255.0
-            g = g / 255.0
-            b = b / 255.0
-            
-            # Apply gamma correction
-            r = r / 12.92 if r <= 0.03928 else ((r + 0.055) / 1.055) ** 2.4
-            g = g / 12.92 if g <= 0.03928 else ((g + 0.055) / 1.055) ** 2.4
-            b = b / 12.92 if b <= 0.03928 else ((b + 0.055) / 1.055) ** 2.4
-            
-            return 0.2126 * r + 0.7152 * g + 0.0722 * b
-        
-        lum1 = get_luminance(color1)
-        lum2 = get_luminance(color2)
-        
-        lighter = max(lum1, lum2)
-        darker = min(lum1, lum2)
-        
-        return (lighter + 0.05) / (darker + 0.05)
+        return rgb_contrast_ratio(color1, color2)
     
     def extract_colors_from_image(self, image_b64: str, count: int = 5) -> List[Tuple[int, int, int]]:
         """Extract dominant colors from image"""
@@ -3,13 +3,25 @@ Simple Backend Server
 Minimal version that works even if some services have import errors
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from pydantic import BaseModel, HttpUrl
 from typing import List, Dict, Any, Optional
 import uvicorn
 import sys
-from database import db, DB_PATH
+import time
+from database import async_db, DB_PATH
+from scan_jobs import ScanJobQueue, make_scan_runner
+from bulk_scan import BULK_DEFAULT_CONCURRENCY, BULK_MAX_ITEMS, bulk_scan_events, shutdown_cpu_pool
+from single_flight import SingleFlight, scan_key
+from fast_json import scan_response
+from admission import AdmissionMiddleware, default_limits
+from compression import CompressionMiddleware
+from server_metrics import MetricsMiddleware, register_server_metrics
+from server_tracing import TracingMiddleware
+from services import metrics
+from scan_stream import scan_events, stream_format, streaming_scan_response
 
 app = FastAPI(
     title="AI Web Accessibility Validator & Auto-Fixer",
@@ -17,6 +29,11 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Admission control for the scan/fix endpoints; added first so it runs
+# inside CORSMiddleware and 429 responses keep their CORS headers
+admission_limits = default_limits()
+app.add_middleware(AdmissionMiddleware, limits=admission_limits)
+
 # CORS middleware for frontend communication
 app.add_middleware(
     CORSMiddleware,
@@ -26,12 +43,43 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON responses (scan results) for clients that accept it
+app.add_middleware(CompressionMiddleware)
+
+# Server-Timing header on every response; with TRACE_EXPORT=1 in the
+# environment, send "X-Trace: 1" to also export the full trace to traces.jsonl
+app.add_middleware(TracingMiddleware)
+
+# Request counts and latency for /metrics; outermost, so 429s and errors are counted too
+app.add_middleware(MetricsMiddleware)
+
+@app.on_event("startup")
+async def start_scan_jobs():
+    """Start the scan worker processes, then the job workers (resuming persisted jobs)"""
+    import asyncio
+    if hasattr(scanner, "shutdown"):
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, scanner.start)
+            print(f"✅ Scan process pool started ({scanner.processes} workers)")
+        except Exception as e:
+            print(f"⚠️  Scan process pool unavailable, scanning in-process: {e}")
+    await job_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown_database():
+    """Stop scan job workers, flush pending database writes and close pooled connections"""
+    await job_queue.stop()
+    shutdown_cpu_pool()
+    if hasattr(scanner, "shutdown"):
+        scanner.shutdown()
+    async_db.close()
+
 # Simple scanner implementation (fallback if imports fail)
 class SimpleScanner:
     """Simple scanner that works without all dependencies"""
     
-    async def fetch_website(self, url: str):
-        """Fetch website content"""
+    async def fetch_website(self, url: str, client=None):
+        """Fetch website content (with a shared httpx.AsyncClient if given)"""
         import httpx
         
         # Ensure URL has protocol
@@ -39,6 +87,10 @@ class SimpleScanner:
             url = 'https://' + url
         
         try:
+            if client is not None:
+                response = await client.get(url)
+                response.raise_for_status()
+                return response.text, "", ""
             async with httpx.AsyncClient(
                 timeout=httpx.Timeout(30.0, connect=10.0),
                 follow_redirects=True,
@@ -428,12 +480,20 @@ class SimpleScanner:
 scanner = None
 try:
     from services.scanner import AccessibilityScanner
-    scanner = AccessibilityScanner()
+    from scan_pool import PooledScanner
+    scanner = PooledScanner(AccessibilityScanner())
     print("✅ Using full AccessibilityScanner")
 except Exception as e:
     print(f"⚠️  Using SimpleScanner (full scanner unavailable: {e})")
     scanner = SimpleScanner()
 
+# Background scan jobs (see scan_jobs.py)
+job_queue = ScanJobQueue(async_db, {
+    "scan-url": make_scan_runner(scanner, async_db.save_report, limit=admission_limits["scan-url"])
+})
+scan_flights = SingleFlight()
+register_server_metrics(async_db, job_queue, lambda: scanner, admission_limits, scan_flights)
+
 # Request/Response models
 class ScanURLRequest(BaseModel):
     url: str  # Changed from HttpUrl to str for simpler validation
@@ -443,6 +503,18 @@ class ScanHTMLRequest(BaseModel):
     css: Optional[str] = None
     js: Optional[str] = None
 
+class BulkDocument(BaseModel):
+    html: str
+    css: Optional[str] = None
+    js: Optional[str] = None
+    id: Optional[str] = None
+
+class BulkScanRequest(BaseModel):
+    urls: List[str] = []
+    documents: List[BulkDocument] = []
+    concurrency: int = BULK_DEFAULT_CONCURRENCY
+    include_issues: bool = True
+
 class ScanResponse(BaseModel):
     success: bool
     url: Optional[str] = None
@@ -459,9 +531,107 @@ async def root():
         "status": "running"
     }
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus metrics: request counts, stage latencies, pools, queues and caches"""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "accessibility-validator"}
+    return {
+        "status": "healthy",
+        "service": "accessibility-validator",
+        "scan_coalescing": scan_flights.stats(),
+        "admission": {name: limit.stats() for name, limit in admission_limits.items()}
+    }
+
+async def run_url_scan(url: str) -> Dict[str, Any]:
+    """Fetch, scan, score and save a URL (shared by coalesced /scan-url requests)"""
+    import traceback
+    start = time.perf_counter()
+    # Fetch and parse the website
+    try:
+        html_content, css_content, js_content = await scanner.fetch_website(url)
+        print(f"✅ Fetched website content ({len(html_content)} chars, {len(css_content)} CSS chars, {len(js_content)} JS chars)")
+        
+        # Debug: Check if HTML is valid
+        if len(html_content) < 100:
+            print(f"⚠️  Warning: HTML content seems very short ({len(html_content)} chars)")
+    
+    except Exception as fetch_error:
+        error_msg = str(fetch_error)
+        print(f"❌ Fetch error: {error_msg}")
+        print(f"   Traceback: {traceback.format_exc()}")
+        if "timeout" in error_msg.lower():
+            raise HTTPException(status_code=408, detail=f"Request timeout: {error_msg}")
+        elif "connection" in error_msg.lower() or "refused" in error_msg.lower():
+            raise HTTPException(status_code=503, detail=f"Cannot connect to website: {error_msg}")
+        else:
+            raise HTTPException(status_code=400, detail=f"Failed to fetch website: {error_msg}")
+    
+    # Run comprehensive accessibility scan
+    try:
+        print(f"🔍 Running accessibility scan...")
+        issues = await scanner.scan_comprehensive(html_content, css_content, js_content, url)
+        
+        # Ensure issues is a list
+        if not isinstance(issues, list):
+            print(f"⚠️  Warning: Scanner returned non-list: {type(issues)}")
+            issues = []
+        
+        print(f"✅ Scan completed: {len(issues)} issues found")
+        if len(issues) > 0:
+            issue_types = set(i.get('type', 'unknown') for i in issues)
+            print(f"   Issue types found: {', '.join(sorted(issue_types))}")
+            # Show first few issues for debugging
+            for i, issue in enumerate(issues[:3]):
+                print(f"   Issue {i+1}: {issue.get('type', 'unknown')} - {issue.get('message', 'No message')[:50]}")
+        else:
+            print(f"   ⚠️  No issues detected")
+            print(f"   Debug: HTML length={len(html_content)}, CSS length={len(css_content)}")
+            # Try to understand why no issues were found
+            from bs4 import BeautifulSoup
+            test_soup = BeautifulSoup(html_content, 'lxml')
+            img_count = len(test_soup.find_all('img'))
+            input_count = len(test_soup.find_all(['input', 'select', 'textarea']))
+            heading_count = len(test_soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']))
+            html_tag = test_soup.find('html')
+            has_lang = html_tag and html_tag.get('lang')
+            print(f"   Debug: Found {img_count} images, {input_count} form inputs, {heading_count} headings, lang={has_lang}")
+    
+    except Exception as scan_error:
+        print(f"⚠️  Scan error: {scan_error}")
+        print(f"   Traceback: {traceback.format_exc()}")
+        issues = []
+    
+    # Calculate score and WCAG level
+    try:
+        score = scanner.calculate_accessibility_score(issues)
+        wcag_level = scanner.determine_wcag_level(issues)
+        print(f"📊 Score: {score}, WCAG Level: {wcag_level}")
+    except Exception as score_error:
+        print(f"⚠️  Score calculation error: {score_error}")
+        score = 100.0 if len(issues) == 0 else 50.0
+        wcag_level = "Unknown"
+    
+    # Save report to database
+    try:
+        report_id = await async_db.save_report(
+            url=url,
+            score=score,
+            wcag_level=wcag_level,
+            total_issues=len(issues),
+            issues=issues,
+            scan_duration=round(time.perf_counter() - start, 3),
+            html_content=html_content,
+            css_content=css_content
+        )
+        print(f"💾 Report saved to database (ID: {report_id})")
+    except Exception as db_error:
+        print(f"⚠️  Failed to save report to database: {db_error}")
+        # Continue even if database save fails
+    
+    return {"url": url, "issues": issues, "wcag_level": wcag_level, "score": score}
 
 @app.post("/scan-url", response_model=ScanResponse)
 async def scan_url(request: ScanURLRequest):
@@ -495,95 +665,9 @@ async def scan_url(request: ScanURLRequest):
         
         print(f"🌐 Scanning URL: {url}")
         
-        # Fetch and parse the website
-        try:
-            html_content, css_content, js_content = await scanner.fetch_website(url)
-            print(f"✅ Fetched website content ({len(html_content)} chars, {len(css_content)} CSS chars, {len(js_content)} JS chars)")
-            
-            # Debug: Check if HTML is valid
-            if len(html_content) < 100:
-                print(f"⚠️  Warning: HTML content seems very short ({len(html_content)} chars)")
-            
-        except Exception as fetch_error:
-            error_msg = str(fetch_error)
-            print(f"❌ Fetch error: {error_msg}")
-            print(f"   Traceback: {traceback.format_exc()}")
-            if "timeout" in error_msg.lower():
-                raise HTTPException(status_code=408, detail=f"Request timeout: {error_msg}")
-            elif "connection" in error_msg.lower() or "refused" in error_msg.lower():
-                raise HTTPException(status_code=503, detail=f"Cannot connect to website: {error_msg}")
-            else:
-                raise HTTPException(status_code=400, detail=f"Failed to fetch website: {error_msg}")
-        
-        # Run comprehensive accessibility scan
-        try:
-            print(f"🔍 Running accessibility scan...")
-            issues = await scanner.scan_comprehensive(html_content, css_content, js_content, url)
-            
-            # Ensure issues is a list
-            if not isinstance(issues, list):
-                print(f"⚠️  Warning: Scanner returned non-list: {type(issues)}")
-                issues = []
-            
-            print(f"✅ Scan completed: {len(issues)} issues found")
-            if len(issues) > 0:
-                issue_types = set(i.get('type', 'unknown') for i in issues)
-                print(f"   Issue types found: {', '.join(sorted(issue_types))}")
-                # Show first few issues for debugging
-                for i, issue in enumerate(issues[:3]):
-                    print(f"   Issue {i+1}: {issue.get('type', 'unknown')} - {issue.get('message', 'No message')[:50]}")
-            else:
-                print(f"   ⚠️  No issues detected")
-                print(f"   Debug: HTML length={len(html_content)}, CSS length={len(css_content)}")
-                # Try to understand why no issues were found
-                from bs4 import BeautifulSoup
-                test_soup = BeautifulSoup(html_content, 'lxml')
-                img_count = len(test_soup.find_all('img'))
-                input_count = len(test_soup.find_all(['input', 'select', 'textarea']))
-                heading_count = len(test_soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']))
-                html_tag = test_soup.find('html')
-                has_lang = html_tag and html_tag.get('lang')
-                print(f"   Debug: Found {img_count} images, {input_count} form inputs, {heading_count} headings, lang={has_lang}")
-                
-        except Exception as scan_error:
-            print(f"⚠️  Scan error: {scan_error}")
-            print(f"   Traceback: {traceback.format_exc()}")
-            issues = []
-        
-        # Calculate score and WCAG level
-        try:
-            score = scanner.calculate_accessibility_score(issues)
-            wcag_level = scanner.determine_wcag_level(issues)
-            print(f"📊 Score: {score}, WCAG Level: {wcag_level}")
-        except Exception as score_error:
-            print(f"⚠️  Score calculation error: {score_error}")
-            score = 100.0 if len(issues) == 0 else 50.0
-            wcag_level = "Unknown"
-        
-        # Save report to database
-        try:
-            report_id = db.save_report(
-                url=url,
-                score=score,
-                wcag_level=wcag_level,
-                total_issues=len(issues),
-                issues=issues,
-                scan_duration=None,  # Could add timing if needed
-                html_content=html_content[:10000] if html_content else None
-            )
-            print(f"💾 Report saved to database (ID: {report_id})")
-        except Exception as db_error:
-            print(f"⚠️  Failed to save report to database: {db_error}")
-            # Continue even if database save fails
-        
-        return ScanResponse(
-            success=True,
-            url=url,
-            issues=issues,
-            total_issues=len(issues),
-            wcag_level=wcag_level,
-            score=score
-        )
+        # Identical concurrent requests share one fetch, scan and saved report
+        result = await scan_flights.run(scan_key(url), lambda: run_url_scan(url))
+        return scan_response(**result)
     except HTTPException:
         raise
     except Exception as e:
@@ -595,6 +679,7 @@ async def scan_url(request: ScanURLRequest):
 @app.post("/scan-html", response_model=ScanResponse)
 async def scan_html(request: ScanHTMLRequest):
     """Scan raw HTML/CSS/JS for accessibility issues"""
+    start = time.perf_counter()
     try:
         # Run comprehensive accessibility scan
         issues = await scanner.scan_comprehensive(
@@ -610,29 +695,158 @@ async def scan_html(request: ScanHTMLRequest):
         
         # Save report to database
         try:
-            report_id = db.save_report(
+            report_id = await async_db.save_report(
                 url="uploaded-content",
                 score=score,
                 wcag_level=wcag_level,
                 total_issues=len(issues),
                 issues=issues,
-                scan_duration=None,
-                html_content=request.html[:10000] if request.html else None
+                scan_duration=round(time.perf_counter() - start, 3),
+                html_content=request.html,
+                css_content=request.css
             )
             print(f"💾 Report saved to database (ID: {report_id})")
         except Exception as db_error:
             print(f"⚠️  Failed to save report to database: {db_error}")
         
-        return ScanResponse(
-            success=True,
-            issues=issues,
-            total_issues=len(issues),
-            wcag_level=wcag_level,
-            score=score
-        )
+        return scan_response(issues, wcag_level, score)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error scanning HTML: {str(e)}")
 
+@app.post("/scan-url/stream")
+async def scan_url_stream(
+    request: ScanURLRequest,
+    format: Optional[str] = None,
+    accept: Optional[str] = Header(None)
+):
+    """
+    Scan a website URL, streaming each rule family's issues as it completes
+    
+    Sends Server-Sent Events by default, or NDJSON with format=ndjson /
+    Accept: application/x-ndjson. Events: fetched, rule (one per rule
+    family), then score; error ends the stream early.
+    """
+    from urllib.parse import urlparse
+    
+    try:
+        fmt = stream_format(format, accept)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    url = request.url.strip()
+    if not url:
+        raise HTTPException(status_code=400, detail="URL cannot be empty")
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    if not urlparse(url).netloc:
+        raise HTTPException(status_code=400, detail="Invalid URL format")
+    
+    print(f"🌐 Streaming scan of URL: {url}")
+    return streaming_scan_response(scan_events(scanner, url, save_report=async_db.save_report), fmt)
+
+@app.post("/scan-html/stream")
+async def scan_html_stream(
+    request: ScanHTMLRequest,
+    format: Optional[str] = None,
+    accept: Optional[str] = Header(None)
+):
+    """Scan raw HTML/CSS/JS, streaming each rule family's issues as it completes (see /scan-url/stream)"""
+    try:
+        fmt = stream_format(format, accept)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    events = scan_events(
+        scanner,
+        "uploaded-content",
+        html=request.html,
+        css=request.css or "",
+        js=request.js or "",
+        save_report=async_db.save_report
+    )
+    return streaming_scan_response(events, fmt)
+
+@app.post("/scan-bulk")
+async def scan_bulk(
+    request: BulkScanRequest,
+    format: Optional[str] = None,
+    accept: Optional[str] = Header(None)
+):
+    """
+    Scan many URLs and/or HTML documents, streaming each result as it completes
+    
+    Events: item (per scanned item), error (per failed item), then summary.
+    Same SSE / NDJSON negotiation as /scan-url/stream.
+    """
+    try:
+        fmt = stream_format(format, accept)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    items = [{"url": url} for url in request.urls] + [doc.dict() for doc in request.documents]
+    if not items:
+        raise HTTPException(status_code=400, detail="Provide at least one URL or document")
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_ITEMS} items per request")
+    
+    print(f"📦 Bulk scan of {len(items)} items (concurrency {request.concurrency})")
+    events = bulk_scan_events(
+        scanner,
+        items,
+        concurrency=request.concurrency,
+        include_issues=request.include_issues,
+        save_report=async_db.save_report,
+        limits=admission_limits
+    )
+    return streaming_scan_response(events, fmt)
+
+@app.post("/jobs/scan-url", status_code=202)
+async def create_scan_job(request: ScanURLRequest):
+    """Queue a URL scan; poll GET /jobs/{job_id} for progress and the result"""
+    import asyncio
+    from urllib.parse import urlparse
+    
+    url = request.url.strip()
+    if not url:
+        raise HTTPException(status_code=400, detail="URL cannot be empty")
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    if not urlparse(url).netloc:
+        raise HTTPException(status_code=400, detail="Invalid URL format")
+    
+    try:
+        job = await job_queue.submit("scan-url", {"url": url})
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Scan queue is full, try again later", headers={"Retry-After": "10"})
+    print(f"🕒 Queued scan job {job['id']} for {url}")
+    return {"success": True, "job": job}
+
+@app.get("/jobs")
+async def list_scan_jobs(status: Optional[str] = None, limit: int = 50):
+    """List recent scan jobs (without results)"""
+    try:
+        jobs = await async_db.list_jobs(status=status, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"success": True, "jobs": jobs, "total": len(jobs), "queue": job_queue.stats()}
+
+@app.get("/jobs/{job_id}")
+async def get_scan_job(job_id: str, version: Optional[int] = None, wait: float = 0):
+    """
+    Get a scan job's status, stage progress and (once succeeded) result
+    
+    Long-poll by passing the last seen version and a wait time in seconds.
+    """
+    job = await job_queue.get(job_id, version=version, wait=wait)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"success": True, "job": job}
+
+@app.delete("/jobs/{job_id}")
+async def cancel_scan_job(job_id: str):
+    """Cancel a queued or running scan job"""
+    job = await job_queue.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"success": True, "job": job}
+
 @app.get("/wcag-rules")
 async def get_wcag_rules():
     """Get list of all WCAG 2.2 rules that are being checked"""
@@ -712,7 +926,7 @@ async def auto_fix_issue(request: FixRequest):
             print(f"❌ Error generating fix: {e}")
             print(f"   Traceback: {traceback.format_exc()}")
             raise HTTPException(status_code=500, detail=f"Error generating fix: {str(e)}")
-            
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -936,33 +1150,154 @@ async def get_reports(
     offset: int = 0,
     domain: Optional[str] = None,
     order_by: str = "scan_date",
-    order_dir: str = "DESC"
+    order_dir: str = "DESC",
+    cursor: Optional[str] = None
 ):
-    """Get all historical scan reports"""
+    """Get historical scan report summaries (pass next_cursor back as cursor for the next page)"""
     try:
-        reports = db.get_all_reports(
+        page = await async_db.get_reports_page(
             limit=limit,
-            offset=offset,
+            cursor=cursor,
             domain=domain,
             order_by=order_by,
-            order_dir=order_dir
+            order_dir=order_dir,
+            offset=offset
         )
         return {
             "success": True,
-            "reports": reports,
-            "total": len(reports)
+            "reports": page["reports"],
+            "total": len(page["reports"]),
+            "next_cursor": page["next_cursor"]
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         import traceback
         print(f"❌ Error fetching reports: {e}")
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error fetching reports: {str(e)}")
 
+@app.get("/reports/search")
+async def search_reports(q: str, limit: int = 50, offset: int = 0):
+    """Search reports by domain, URL or issue message"""
+    try:
+        reports = await async_db.search_reports(q, limit=limit, offset=offset)
+        return {
+            "success": True,
+            "query": q,
+            "reports": reports,
+            "total": len(reports)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching reports: {str(e)}")
+
+# Search and statistics routes are registered before /reports/{report_id} so they are not captured by it
+@app.get("/reports/statistics")
+async def get_statistics():
+    """Get database statistics"""
+    try:
+        stats = await async_db.get_statistics()
+        return {
+            "success": True,
+            "statistics": stats
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching statistics: {str(e)}")
+
+@app.get("/reports/statistics/domains")
+async def get_domain_statistics(limit: int = 50):
+    """Get per-domain report counts and average scores"""
+    try:
+        domains = await async_db.get_domain_statistics(limit=limit)
+        return {
+            "success": True,
+            "domains": domains
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching statistics: {str(e)}")
+
+@app.get("/reports/statistics/daily")
+async def get_daily_statistics(days: int = 30):
+    """Get per-day report counts and average scores"""
+    try:
+        daily = await async_db.get_daily_statistics(days=days)
+        return {
+            "success": True,
+            "days": daily
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching statistics: {str(e)}")
+
+@app.post("/reports/statistics/rebuild")
+async def rebuild_statistics():
+    """Recompute statistics rollups from the stored reports"""
+    try:
+        stats = await async_db.rebuild_rollups()
+        return {
+            "success": True,
+            "statistics": stats
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rebuilding statistics: {str(e)}")
+
+@app.get("/reports/statistics/storage")
+async def get_storage_statistics():
+    """Get blob store usage and database size"""
+    try:
+        stats = await async_db.get_storage_statistics()
+        return {
+            "success": True,
+            "storage": stats
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching statistics: {str(e)}")
+
+@app.get("/reports/export")
+async def export_reports(
+    table: str = "reports",
+    format: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    domain: Optional[str] = None
+):
+    """Download reports or issue rows as a Parquet (default), Arrow or CSV file"""
+    import os
+    import shutil
+    import tempfile
+    from export import DEFAULT_EXPORT_FORMAT, export_table
+    from fastapi.responses import FileResponse
+    from starlette.background import BackgroundTask
+    from starlette.concurrency import run_in_threadpool
+    
+    format = format or DEFAULT_EXPORT_FORMAT
+    tmp_dir = tempfile.mkdtemp(prefix="export-")
+    path = os.path.join(tmp_dir, f"{table}.{format}")
+    try:
+        result = await run_in_threadpool(
+            export_table, async_db.database, table, path,
+            export_format=format, since=since, until=until, domain=domain
+        )
+    except (ValueError, RuntimeError) as e:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        print(f"❌ Error exporting {table}: {e}")
+        raise HTTPException(status_code=500, detail=f"Error exporting {table}: {str(e)}")
+    
+    print(f"💾 Exported {result['rows']} {table} rows in {result['seconds']}s ({result['rows_per_second']:,} rows/s)")
+    return FileResponse(
+        path,
+        filename=os.path.basename(path),
+        headers={"X-Export-Rows": str(result["rows"]), "X-Export-Seconds": str(result["seconds"])},
+        background=BackgroundTask(shutil.rmtree, tmp_dir, ignore_errors=True)
+    )
+
 @app.get("/reports/{report_id}")
 async def get_report(report_id: int):
     """Get a specific report by ID"""
     try:
-        report = db.get_report(report_id)
+        report = await async_db.get_report(report_id)
         if not report:
             raise HTTPException(status_code=404, detail="Report not found")
         return {
@@ -974,11 +1309,52 @@ async def get_report(report_id: int):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching report: {str(e)}")
 
+@app.get("/reports/{report_id}/snapshot")
+async def get_report_snapshot(report_id: int):
+    """Get the full HTML/CSS a report was scanned from"""
+    try:
+        snapshot = await async_db.get_report_snapshot(report_id)
+        if snapshot is None:
+            raise HTTPException(status_code=404, detail="Report not found")
+        return {
+            "success": True,
+            "report_id": report_id,
+            "html": snapshot["html"],
+            "css": snapshot["css"]
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching snapshot: {str(e)}")
+
+@app.get("/trends")
+async def get_score_trend(
+    url: str,
+    resolution: str = "auto",
+    since: Optional[str] = None,
+    until: Optional[str] = None
+):
+    """Get the score history of a URL (raw, hourly or daily points)"""
+    try:
+        trend = await async_db.get_score_trend(url, resolution=resolution, since=since, until=until)
+        return {
+            "success": True,
+            "url": url,
+            "resolution": trend["resolution"],
+            "points": trend["points"],
+            "total": len(trend["points"]),
+            "truncated": trend["truncated"]
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching trend: {str(e)}")
+
 @app.get("/reports/url/{url:path}")
 async def get_reports_by_url(url: str, limit: int = 10):
     """Get all reports for a specific URL"""
     try:
-        reports = db.get_reports_by_url(url, limit=limit)
+        reports = await async_db.get_reports_by_url(url, limit=limit)
         return {
             "success": True,
             "reports": reports,
@@ -991,7 +1367,7 @@ async def get_reports_by_url(url: str, limit: int = 10):
 async def delete_report(report_id: int):
     """Delete a report by ID"""
     try:
-        deleted = db.delete_report(report_id)
+        deleted = await async_db.delete_report(report_id)
         if not deleted:
             raise HTTPException(status_code=404, detail="Report not found")
         return {
@@ -1003,17 +1379,101 @@ async def delete_report(report_id: int):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deleting report: {str(e)}")
 
-@app.get("/reports/statistics")
-async def get_statistics():
-    """Get database statistics"""
+# Cross-report issue queries
+@app.get("/issues")
+async def search_issues(
+    type: Optional[str] = None,
+    severity: Optional[str] = None,
+    wcag_rule: Optional[str] = None,
+    wcag_level: Optional[str] = None,
+    domain: Optional[str] = None,
+    limit: int = 100,
+    offset: int = 0
+):
+    """Search issues across all stored reports"""
     try:
-        stats = db.get_statistics()
+        issues = await async_db.find_issues(
+            issue_type=type,
+            severity=severity,
+            wcag_rule=wcag_rule,
+            wcag_level=wcag_level,
+            domain=domain,
+            limit=limit,
+            offset=offset
+        )
         return {
             "success": True,
-            "statistics": stats
+            "issues": issues,
+            "total": len(issues)
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching statistics: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error searching issues: {str(e)}")
+
+@app.get("/issues/reports")
+async def get_reports_with_issue(
+    type: Optional[str] = None,
+    wcag_rule: Optional[str] = None,
+    severity: Optional[str] = None,
+    limit: int = 100
+):
+    """Get reports that contain a matching issue"""
+    try:
+        reports = await async_db.get_reports_with_issue(
+            issue_type=type,
+            wcag_rule=wcag_rule,
+            severity=severity,
+            limit=limit
+        )
+        return {
+            "success": True,
+            "reports": reports,
+            "total": len(reports)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching reports: {str(e)}")
+
+@app.get("/issues/summary")
+async def get_issue_summary(
+    group_by: str = "type",
+    type: Optional[str] = None,
+    severity: Optional[str] = None,
+    wcag_rule: Optional[str] = None,
+    domain: Optional[str] = None,
+    limit: int = 100
+):
+    """Count issues grouped by type, severity, WCAG rule, level, domain or URL"""
+    try:
+        counts = await async_db.count_issues(
+            group_by=group_by,
+            issue_type=type,
+            severity=severity,
+            wcag_rule=wcag_rule,
+            domain=domain,
+            limit=limit
+        )
+        return {
+            "success": True,
+            "group_by": group_by,
+            "counts": counts
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error counting issues: {str(e)}")
+
+@app.get("/issues/{fingerprint}/history")
+async def get_issue_history(fingerprint: str, limit: int = 50):
+    """Get the reports in which the same issue was found"""
+    try:
+        reports = await async_db.get_issue_history(fingerprint, limit=limit)
+        return {
+            "success": True,
+            "fingerprint": fingerprint,
+            "reports": reports,
+            "total": len(reports)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching issue history: {str(e)}")
 
 @app.post("/test-scanner")
 async def test_scanner():
@@ -0,0 +1,126 @@
+"""
+Scan request coalescing
+Concurrent identical scans share one in-flight fetch and scan (single flight)
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Seconds a finished scan keeps answering identical requests
+SCAN_COALESCE_GRACE_SECONDS = 5.0
+
+# Finished results kept for the grace window (oldest evicted first)
+SCAN_COALESCE_MAX_ENTRIES = 1000
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def scan_key(url: str, **options) -> str:
+    """
+    Coalescing key for a URL scan
+    
+    Scheme and host are lowercased, default ports, fragments and a bare
+    trailing slash are dropped and query parameters are sorted, so
+    spellings of the same page share a key. Options that change the scan
+    result (e.g. which rules run) must be passed as keyword arguments.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path if parts.path not in ("", "/") else ""
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    normalized = urlunsplit((scheme, host, path, query, ""))
+    if not options:
+        return normalized
+    return f"{normalized} {json.dumps(options, sort_keys=True, default=str)}"
+
+
+class SingleFlight:
+    """
+    Runs at most one coroutine per key at a time
+    
+    Callers arriving while a key is in flight await the same task instead of
+    starting their own; after it succeeds the result keeps being returned for
+    grace_seconds. Failures are shared with the callers already waiting but
+    never cached. A caller that disconnects does not cancel the shared work.
+    """
+    
+    def __init__(
+        self,
+        grace_seconds: float = SCAN_COALESCE_GRACE_SECONDS,
+        max_entries: int = SCAN_COALESCE_MAX_ENTRIES
+    ):
+        """
+        Args:
+            grace_seconds: Seconds a result is reused after completion (0 disables)
+            max_entries: Finished results kept at once
+        """
+        self.grace_seconds = grace_seconds
+        self.max_entries = max_entries
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._recent: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.leaders = 0
+        self.coalesced = 0
+        self.grace_hits = 0
+        self.failures = 0
+    
+    async def run(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return func()'s result, sharing it with identical concurrent calls
+        
+        Args:
+            key: Coalescing key (see scan_key)
+            func: Coroutine function doing the work; only the first caller's runs
+        
+        Returns:
+            The (shared) result; treat it as read-only
+        """
+        recent = self._recent.get(key)
+        if recent is not None:
+            if time.monotonic() < recent[0]:
+                self.grace_hits += 1
+                return recent[1]
+            del self._recent[key]
+        
+        task = self._in_flight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.create_task(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        # shield: one caller going away must not cancel the others' scan
+        return await asyncio.shield(task)
+    
+    def _finish(self, key: str, task: asyncio.Task):
+        self._in_flight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            self.failures += 1
+            return
+        if self.grace_seconds > 0:
+            self._recent[key] = (time.monotonic() + self.grace_seconds, task.result())
+            self._recent.move_to_end(key)
+            while len(self._recent) > self.max_entries:
+                self._recent.popitem(last=False)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Coalescing counters; coalesce_ratio is the share of requests that did not run a scan"""
+        now = time.monotonic()
+        requests = self.leaders + self.coalesced + self.grace_hits
+        return {
+            "requests": requests,
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "grace_hits": self.grace_hits,
+            "failures": self.failures,
+            "in_flight": len(self._in_flight),
+            "cached": sum(1 for expires, _ in self._recent.values() if expires > now),
+            "coalesce_ratio": round((self.coalesced + self.grace_hits) / requests, 4) if requests else 0.0
+        }
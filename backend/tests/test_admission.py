@@ -0,0 +1,86 @@
+"""
+Admission control tests
+"""
+
+import asyncio
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from admission import AdmissionLimit, AdmissionMiddleware, Overloaded, default_limits
+from bulk_scan import bulk_scan_events
+
+
+def test_streaming_endpoints_share_the_limit_of_their_plain_endpoint():
+    limits = default_limits()
+    limits["scan-html"] = AdmissionLimit(1, 0)
+    asyncio.run(limits["scan-html"].acquire("interactive"))
+    
+    async def ok(request):
+        return PlainTextResponse("ok")
+    
+    app = Starlette(routes=[Route(path, ok, methods=["POST"]) for path in ("/scan-html", "/scan-html/stream", "/other")])
+    app.add_middleware(AdmissionMiddleware, limits=limits)
+    client = TestClient(app)
+    
+    assert client.post("/scan-html").status_code == 429
+    assert client.post("/scan-html/stream").status_code == 429
+    assert client.post("/other").status_code == 200
+
+
+def test_waiting_slot_retries_after_rejection():
+    limit = AdmissionLimit(1, 0)
+    
+    async def run():
+        await limit.acquire("interactive")
+        with pytest.raises(Overloaded):
+            async with limit.slot("bulk"):
+                pass
+        
+        slot = limit.slot("bulk", wait=True)
+        waiting = asyncio.create_task(slot.__aenter__())
+        await asyncio.sleep(0.1)
+        assert not waiting.done()
+        limit.release(0.01)
+        await asyncio.wait_for(waiting, timeout=5)
+        assert limit.active == 1
+    
+    asyncio.run(run())
+    assert limit.counts["bulk"]["admitted"] == 1
+
+
+class FakeScanner:
+    """Records how many items were scanned at once"""
+    
+    def __init__(self, limit: AdmissionLimit):
+        self.limit = limit
+        self.peak = 0
+    
+    async def scan_comprehensive(self, html, css, js, source):
+        self.peak = max(self.peak, self.limit.active)
+        return []
+    
+    def calculate_accessibility_score(self, issues):
+        return 100.0
+    
+    def determine_wcag_level(self, issues):
+        return "AAA"
+
+
+def test_bulk_items_hold_scan_slots_at_bulk_priority():
+    limits = default_limits()
+    limit = limits["scan-html"] = AdmissionLimit(2, 1)
+    scanner = FakeScanner(limit)
+    items = [{"html": f"<p>{i}</p>"} for i in range(10)]
+    
+    async def run():
+        return [event async for event, _ in bulk_scan_events(scanner, items, concurrency=8, limits=limits)]
+    
+    events = asyncio.run(run())
+    assert events.count("item") == 10
+    assert scanner.peak <= 2
+    assert limit.active == 0
+    assert limit.counts["bulk"]["admitted"] == 10
@@ -0,0 +1,71 @@
+"""
+Batch fix tests
+"""
+
+import asyncio
+import copy
+
+from batch_fix import batch_fix, batch_fix_events
+from services.auto_fixer import AutoFixer
+
+SNIPPET = '<div style="color:#777;background:#888" onclick="go()">Open</div>'
+
+
+def test_fixes_on_a_shared_snippet_do_not_leak_between_issue_types():
+    fixer = AutoFixer()
+    issue_types = ["contrast_ratio", "keyboard_navigation", "missing_aria_label"]
+    issues = [{"issue_id": str(i), "issue_type": issue_type, "original_code": SNIPPET} for i, issue_type in enumerate(issue_types)]
+    
+    fixes = asyncio.run(batch_fix(fixer, issues))
+    
+    for issue_type, fix in zip(issue_types, fixes):
+        alone = asyncio.run(fixer.generate_fix(issue_type, "div", SNIPPET, "solo"))
+        assert fix["success"]
+        assert fix["fixed_code"] == alone["fixed_code"], issue_type
+    assert "#777" in fixes[2]["fixed_code"]
+
+
+def test_results_keep_input_order():
+    fixer = AutoFixer()
+    issues = [
+        {"issue_id": "a", "issue_type": "missing_aria_label", "original_code": "<button></button>"},
+        {"issue_id": "b", "issue_type": "keyboard_navigation", "original_code": SNIPPET},
+        {"issue_id": "c", "issue_type": "missing_aria_label", "original_code": "<button></button>"},
+    ]
+    
+    fixes = asyncio.run(batch_fix(fixer, issues))
+    
+    assert [fix["issue_id"] for fix in fixes] == ["a", "b", "c"]
+
+
+class CountingFixer(AutoFixer):
+    def __init__(self):
+        super().__init__()
+        self.parses = 0
+    
+    def parse_snippet(self, original_code):
+        self.parses += 1
+        return super().parse_snippet(original_code)
+
+
+def test_each_snippet_is_parsed_once_and_copied_only_when_shared(monkeypatch):
+    copies = []
+    real_copy = copy.copy
+    monkeypatch.setattr(copy, "copy", lambda value: copies.append(value) or real_copy(value))
+    fixer = CountingFixer()
+    issues = [
+        {"issue_id": "1", "issue_type": "missing_aria_label", "original_code": "<button></button>"},
+        {"issue_id": "2", "issue_type": "missing_aria_label", "original_code": "<button></button>"},
+        {"issue_id": "3", "issue_type": "missing_aria_label", "original_code": SNIPPET},
+        {"issue_id": "4", "issue_type": "keyboard_navigation", "original_code": SNIPPET},
+        {"issue_id": "5", "issue_type": "contrast_ratio", "original_code": SNIPPET},
+    ]
+    
+    async def run():
+        return [data async for event, data in batch_fix_events(fixer, issues)]
+    
+    events = asyncio.run(run())
+    
+    assert fixer.parses == events[-1]["parsed_snippets"] == 2
+    # Three groups share SNIPPET: two copies; the button group has one group and no copy
+    assert len(copies) == 2
@@ -0,0 +1,85 @@
+"""
+CSS cascade tests
+"""
+
+import time
+
+import pytest
+from bs4 import BeautifulSoup
+
+from services.css_cascade import StyleSheetIndex, _SelectorParser, _SiblingIndex
+
+
+def colors(css: str, html: str, selector: str):
+    """Text color of every element matching a soup CSS selector"""
+    soup = BeautifulSoup(html, "lxml")
+    resolver = StyleSheetIndex(css).resolver()
+    return [resolver.computed_style(element).text_color_string() for element in soup.select(selector)]
+
+
+def matches(selector: str, html: str, target: str) -> bool:
+    soup = BeautifulSoup(html, "lxml")
+    return _SelectorParser(selector).parse().matches(soup.select_one(target), _SiblingIndex())
+
+
+@pytest.mark.parametrize("selector, expected", [
+    ("li", True),
+    ("ul > li.b", True),
+    ("div li", True),
+    ("section li", False),
+    ("li:first-child", False),
+    ("li:last-child", False),
+    ("li.a + li", True),
+    ("li.c + li", False),
+    ("li.a ~ li.b", True),
+    ("li.c ~ li.b", False),
+    ("li:not(.a)", True),
+    ("li[data-x^=fo]", True),
+    ("li[data-x=bar]", False),
+])
+def test_selector_matching(selector, expected):
+    html = '<div><ul><li class="a">1</li><li class="b" data-x="foo">2</li><li class="c">3</li></ul></div>'
+    assert matches(selector, html, "li.b") is expected
+
+
+def test_specificity_order_and_important():
+    css = "p { color: #111111 } .x { color: #222222 } #y { color: #333333 } p.z { color: #444444 !important }"
+    html = '<p>a</p><p class="x">b</p><p class="x" id="y">c</p><p class="z" id="y">d</p>'
+    assert colors(css, html, "p") == ["#111111", "#222222", "#333333", "#444444"]
+
+
+def test_inline_style_wins_and_color_is_inherited():
+    css = "div { color: #111111 } .x { color: #222222 }"
+    html = '<div><span>a</span><span class="x" style="color: #333333">b</span></div>'
+    assert colors(css, html, "span") == ["#111111", "#333333"]
+
+
+def test_structural_pseudo_classes():
+    css = "li:first-child { color: #111111 } li:last-child { color: #222222 } li:only-child { color: #333333 }"
+    html = "<ul><li>1</li><li>2</li><li>3</li></ul><ol><li>only</li></ol>"
+    assert colors(css, html, "li") == ["#111111", "#000000", "#222222", "#333333"]
+
+
+def test_sibling_combinators():
+    css = "li + li { color: #111111 } h2 ~ li { color: #222222 }"
+    html = "<ul><li>1</li><li>2</li><h2>t</h2><li>3</li></ul>"
+    assert colors(css, html, "li") == ["#000000", "#111111", "#222222"]
+
+
+def test_memo_separates_elements_in_different_sibling_contexts():
+    # The two inner <li> share tag, classes and parent style; only the
+    # previous sibling of their <ul> tells them apart
+    css = "h2 + ul li { color: #111111 }"
+    html = "<div><h2>t</h2><ul><li>a</li></ul><p>x</p><ul><li>b</li></ul></div>"
+    assert colors(css, html, "li") == ["#111111", "#000000"]
+
+
+@pytest.mark.parametrize("css", ["li:first-child { color: #111 }", "li + li { color: #111 }", "h2 ~ li { color: #111 }"])
+def test_wide_sibling_lists_resolve_in_linear_time(css):
+    soup = BeautifulSoup("<ul>" + "<li>x</li>" * 4000 + "</ul>", "lxml")
+    resolver = StyleSheetIndex(css).resolver()
+    start = time.perf_counter()
+    for element in soup.find_all("li"):
+        resolver.computed_style(element)
+    # Quadratic matching took several seconds here
+    assert time.perf_counter() - start < 1.0
@@ -0,0 +1,112 @@
+"""
+Database report writer tests
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from database import REPORT_ID_BLOCK_SIZE, AsyncDatabase, Database, ReportWriteFailed, ReportWriter
+
+ISSUES = [{"type": "missing_alt_text", "severity": "high", "message": "Image without alt"}]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "reports.db")
+
+
+def save(writer: ReportWriter, url: str) -> int:
+    return writer.submit(writer.database.prepare_report(url, 80.0, "AA", len(ISSUES), ISSUES))
+
+
+def test_two_writers_on_one_file_get_distinct_ids(db_path):
+    first, second = Database(db_path), Database(db_path)
+    first_writer, second_writer = ReportWriter(first), ReportWriter(second)
+    
+    ids = {}
+    for i in range(REPORT_ID_BLOCK_SIZE + 5):
+        ids[save(first_writer, f"https://a.example/{i}")] = f"https://a.example/{i}"
+        ids[save(second_writer, f"https://b.example/{i}")] = f"https://b.example/{i}"
+    first_writer.close()
+    second_writer.close()
+    
+    assert len(ids) == 2 * (REPORT_ID_BLOCK_SIZE + 5)
+    assert first_writer.reports_failed == second_writer.reports_failed == 0
+    for report_id, url in ids.items():
+        assert first.get_report(report_id)["url"] == url
+
+
+def test_plain_autoincrement_inserts_do_not_reuse_reserved_ids(db_path):
+    database = Database(db_path)
+    reserved = database.prepare_report("https://a.example", 90.0, "AA", 0, [])["id"]
+    
+    with database._write() as cursor:
+        cursor.execute("""
+            INSERT INTO reports (url, domain, score, wcag_level, total_issues, issues_json)
+            VALUES ('https://b.example', 'b.example', 50, 'A', 0, '[]')
+        """)
+        plain = cursor.lastrowid
+    
+    assert plain > reserved + REPORT_ID_BLOCK_SIZE - 1
+
+
+def test_failed_write_is_reported_on_read(db_path):
+    database = Database(db_path)
+    async_db = AsyncDatabase(database)
+    report = database.prepare_report("https://a.example", 90.0, "AA", 1, ISSUES)
+    report["score"] = None  # violates NOT NULL
+    
+    async def run():
+        async_db.writer.submit(report)
+        with pytest.raises(ReportWriteFailed):
+            await async_db.get_report(report["id"])
+    
+    try:
+        asyncio.run(run())
+    finally:
+        async_db.close()
+    assert async_db.writer.reports_failed == 1
+
+
+def test_reports_submitted_while_closing_are_written(db_path):
+    database = Database(db_path)
+    writer = ReportWriter(database, max_queue_size=4)
+    ids = []
+    
+    def submit_many():
+        for i in range(50):
+            ids.append(save(writer, f"https://a.example/{i}"))
+    
+    thread = threading.Thread(target=submit_many)
+    thread.start()
+    writer.close()
+    thread.join(timeout=10)
+    
+    assert not thread.is_alive()
+    assert writer.flush(timeout=1)
+    assert all(database.get_report(report_id) for report_id in ids)
+
+
+@pytest.mark.parametrize("order_dir", ["ASC", "DESC"])
+def test_pages_continue_past_null_sort_values(db_path, order_dir):
+    database = Database(db_path)
+    with database._write() as cursor:
+        for i in range(7):
+            cursor.execute("""
+                INSERT INTO reports (url, domain, score, wcag_level, total_issues, issues_json)
+                VALUES (?, ?, 50, 'A', 0, '[]')
+            """, (f"https://{i}.example", None if i % 2 else f"{i}.example"))
+    
+    seen = []
+    cursor = None
+    while True:
+        page = database.get_reports_page(limit=2, cursor=cursor, order_by="domain", order_dir=order_dir)
+        seen.extend(report["url"] for report in page["reports"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    
+    assert sorted(seen) == sorted(f"https://{i}.example" for i in range(7))
+    assert len(seen) == 7
@@ -0,0 +1,45 @@
+"""
+Analytics export tests
+"""
+
+import csv
+
+import pyarrow.parquet as pq
+
+from database import Database, ReportWriter
+from export import DEFAULT_EXPORT_FORMAT, export_table
+
+ISSUES = [{"type": "missing_alt_text", "severity": "high", "message": "Image without alt"}]
+
+
+def make_database(path: str) -> Database:
+    database = Database(path)
+    writer = ReportWriter(database)
+    for i in range(3):
+        writer.submit(database.prepare_report(f"https://a.example/{i}", 80.0 + i, "AA", len(ISSUES), ISSUES))
+    writer.close()
+    return database
+
+
+def test_default_export_is_parquet(tmp_path):
+    database = make_database(str(tmp_path / "reports.db"))
+    path = str(tmp_path / "reports.parquet")
+    
+    result = export_table(database, "reports", path)
+    
+    assert DEFAULT_EXPORT_FORMAT == result["format"] == "parquet"
+    table = pq.read_table(path)
+    assert table.num_rows == result["rows"] == 3
+    assert table.column("score").to_pylist() == [80.0, 81.0, 82.0]
+
+
+def test_csv_export_on_request(tmp_path):
+    database = make_database(str(tmp_path / "reports.db"))
+    path = str(tmp_path / "issues.csv")
+    
+    result = export_table(database, "issues", path, export_format="csv")
+    
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert result["rows"] == len(rows) == 3
+    assert {row["type"] for row in rows} == {"missing_alt_text"}
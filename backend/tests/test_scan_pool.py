@@ -0,0 +1,52 @@
+"""
+Scan process pool tests
+"""
+
+import asyncio
+import os
+import signal
+
+from scan_pool import PooledScanner
+from services.scanner import AccessibilityScanner
+
+LARGE_HTML = "<html><body>" + "<div><img src='a.png'><p style='color:#777'>text</p></div>" * 800 + "</body></html>"
+
+
+def worker_pids(pool: PooledScanner):
+    return set(pool._executor._processes)
+
+
+def test_workers_are_not_forked_from_the_server_process():
+    pool = PooledScanner(AccessibilityScanner(), processes=2, inline_max_chars=0)
+    pool.start()
+    try:
+        assert len(worker_pids(pool)) == 2
+        for pid in worker_pids(pool):
+            with open(f"/proc/{pid}/stat") as f:
+                parent = int(f.read().rsplit(")", 1)[1].split()[1])
+            assert parent != os.getpid()
+    finally:
+        pool.shutdown()
+
+
+def test_killed_workers_are_replaced_with_a_new_pool():
+    pool = PooledScanner(AccessibilityScanner(), processes=2, inline_max_chars=0)
+    pool.start()
+    expected = asyncio.run(pool.scanner.scan_comprehensive(LARGE_HTML, "", "", "https://a.example"))
+    
+    async def run():
+        broken = pool._executor
+        for pid in worker_pids(pool):
+            os.kill(pid, signal.SIGKILL)
+        results = await asyncio.gather(*[
+            pool.scan_comprehensive(LARGE_HTML, "", "", "https://a.example") for _ in range(4)
+        ])
+        return broken, results
+    
+    try:
+        broken, results = asyncio.run(run())
+        assert pool._executor is not broken
+        assert len(worker_pids(pool)) == 2
+        assert all(len(issues) == len(expected) for issues in results)
+    finally:
+        pool.shutdown()
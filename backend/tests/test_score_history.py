@@ -0,0 +1,40 @@
+"""
+Score history tests
+"""
+
+import sqlite3
+
+import pytest
+
+from score_history import ScoreHistory
+
+
+@pytest.fixture
+def history_cursor():
+    cursor = sqlite3.connect(":memory:").cursor()
+    ScoreHistory.create_schema(cursor)
+    history = ScoreHistory()
+    history.record(cursor, [
+        {"report_id": hour, "url": "https://a.example", "ts": f"2026-10-01 {hour:02d}:00:00", "score": float(hour)}
+        for hour in range(10)
+    ])
+    return history, cursor
+
+
+@pytest.mark.parametrize("resolution", ["raw", "hour"])
+def test_truncated_trend_keeps_the_most_recent_points(history_cursor, resolution):
+    history, cursor = history_cursor
+    
+    trend = history.trend(cursor, "https://a.example", resolution=resolution, max_points=3)
+    
+    assert [point["score"] for point in trend["points"]] == [7.0, 8.0, 9.0]
+    assert trend["truncated"]
+
+
+def test_trend_within_budget_is_not_truncated(history_cursor):
+    history, cursor = history_cursor
+    
+    trend = history.trend(cursor, "https://a.example", resolution="raw", max_points=10)
+    
+    assert [point["score"] for point in trend["points"]] == [float(hour) for hour in range(10)]
+    assert not trend["truncated"]
@@ -0,0 +1,64 @@
+"""
+Server tracing tests
+"""
+
+import json
+import threading
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from server_tracing import JSONLinesExporter, TracingMiddleware
+
+
+class RecordingExporter(JSONLinesExporter):
+    """Remembers which thread wrote each trace"""
+    
+    def __init__(self, path):
+        super().__init__(path)
+        self.threads = []
+    
+    def export(self, record):
+        self.threads.append(threading.get_ident())
+        super().export(record)
+
+
+def client(exporter=None):
+    async def ok(request):
+        return PlainTextResponse("ok")
+    
+    app = Starlette(routes=[Route("/", ok)])
+    app.add_middleware(TracingMiddleware, exporter=exporter)
+    return TestClient(app)
+
+
+def test_trace_header_is_ignored_unless_export_is_enabled():
+    response = client().get("/", headers={"X-Trace": "1"})
+    assert "Server-Timing" in response.headers
+    assert "X-Trace-Id" not in response.headers
+
+
+def test_requested_traces_are_written_off_the_event_loop(tmp_path):
+    exporter = RecordingExporter(tmp_path / "traces.jsonl")
+    with client(exporter) as test_client:
+        loop_thread = test_client.portal.call(threading.get_ident)
+        trace_id = test_client.get("/", headers={"X-Trace": "1"}).headers["X-Trace-Id"]
+        assert "X-Trace-Id" not in test_client.get("/").headers
+    
+    lines = (tmp_path / "traces.jsonl").read_text().splitlines()
+    assert [json.loads(line)["trace_id"] for line in lines] == [trace_id]
+    assert exporter.threads and loop_thread not in exporter.threads
+
+
+def test_trace_file_is_rotated_at_max_bytes(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    exporter = JSONLinesExporter(path, max_bytes=200)
+    for i in range(20):
+        exporter.export({"trace_id": str(i), "padding": "x" * 40})
+    
+    assert path.stat().st_size <= 200
+    assert (tmp_path / "traces.jsonl.1").stat().st_size <= 200
+    assert exporter.rotations > 0
+    assert json.loads(path.read_text().splitlines()[-1])["trace_id"] == "19"
@@ -42,6 +42,7 @@ document.addEventListener('DOMContentLoaded', () => {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          'X-Request-Priority': 'interactive',
         },
         body: JSON.stringify({
           html: pageContent.html,